@@ -0,0 +1,22 @@
+"""Credit Scoring API (FastAPI)"""
+
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Początek importu pakietu - profil startu mierzy import osobno od wczytania modelu
+IMPORT_STARTED = time.perf_counter()
+
+# Komunikaty o modelu, rozgrzewce i workerach (stderr; uvicorn nie konfiguruje loggera "app")
+logger = logging.getLogger("app")
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+
+# Kod wspólny z treningiem (src/ai_credit_scoring) także bez `pip install -e .`
+_SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+if _SRC_DIR.is_dir() and str(_SRC_DIR) not in sys.path:
+    sys.path.append(str(_SRC_DIR))
@@ -0,0 +1,163 @@
+"""
+Kontrola przyjmowania żądań (admission control) dla endpointów oceny.
+
+Najwyżej `max_concurrent` żądań jest obsługiwanych jednocześnie, a kolejne
+czekają w ograniczonej kolejce FIFO (`max_queue`, najdłużej `queue_timeout`
+sekund). Gdy kolejka jest pełna albo czas oczekiwania minie, żądanie jest
+od razu odrzucane odpowiedzią 429 z nagłówkiem `Retry-After` - przy
+przeciążeniu część klientów dostaje szybką odmowę, zamiast wszystkim rosło
+opóźnienie aż do przekroczenia timeoutu.
+
+Stan jest zmieniany wyłącznie w pętli zdarzeń (middleware ASGI), więc nie
+wymaga blokad; zwolnione miejsce przechodzi bezpośrednio na pierwszego
+oczekującego.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from collections import deque
+
+from app.metrics import ADMISSION_ACTIVE, ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTED
+
+
+class AdmissionController:
+    """Limit współbieżności z ograniczoną kolejką oczekujących"""
+
+    def __init__(self, max_concurrent: int, max_queue: int = 0, queue_timeout: float = 0.0):
+        self.max_concurrent = int(max_concurrent)
+        self.max_queue = max(int(max_queue), 0)
+        self.queue_timeout = float(queue_timeout)
+        self.active = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._waiters = deque()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_concurrent > 0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _publish(self) -> None:
+        ADMISSION_ACTIVE.set(self.active)
+        ADMISSION_QUEUE_DEPTH.set(len(self._waiters))
+
+    def _reject(self, reason: str) -> str:
+        self.rejected += 1
+        ADMISSION_REJECTED.inc(reason)
+        return reason
+
+    async def acquire(self) -> str | None:
+        """
+        Zajęcie miejsca: None po przyjęciu, w przeciwnym razie powód odmowy
+        ("queue_full" albo "timeout"). Po przyjęciu wymagane `release()`.
+        """
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            self._publish()
+            return None
+        if len(self._waiters) >= self.max_queue:
+            return self._reject("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._publish()
+        try:
+            # asyncio.wait nie anuluje waitera - po timeoucie sprawdzamy, czy
+            # miejsce nie zostało przekazane w tej samej iteracji pętli
+            await asyncio.wait((waiter,), timeout=self.queue_timeout or None)
+        except asyncio.CancelledError:
+            # klient rozłączył się w kolejce - oddajemy ewentualnie przekazane miejsce
+            if waiter.done():
+                self.release()
+            else:
+                self._remove(waiter)
+            raise
+        if waiter.done():
+            self.admitted += 1
+            return None
+        self._remove(waiter)
+        return self._reject("timeout")
+
+    def _remove(self, waiter) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+        waiter.cancel()
+        self._publish()
+
+    def release(self) -> None:
+        """Zwolnienie miejsca - przekazanie pierwszemu oczekującemu albo zmniejszenie licznika"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._publish()
+                return
+        self.active -= 1
+        self._publish()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "queue_timeout": self.queue_timeout,
+            "active": self.active,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+
+class AdmissionMiddleware:
+    """
+    Middleware ASGI stosujące `AdmissionController` do wybranych ścieżek.
+
+    Miejsce jest zajmowane przed odczytem ciała żądania i zwalniane po
+    wysłaniu całej odpowiedzi (także strumieniowej). Wyłączony kontroler
+    (`max_concurrent <= 0`) przepuszcza wszystkie żądania.
+    """
+
+    def __init__(self, app, controller: AdmissionController, paths, retry_after: int = 1):
+        self.app = app
+        self.controller = controller
+        self.paths = frozenset(paths)
+        self.retry_after = max(int(retry_after), 0)
+
+    async def __call__(self, scope, receive, send):
+        controller = self.controller
+        if scope["type"] != "http" or not controller.enabled or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        reason = await controller.acquire()
+        if reason is not None:
+            await self._send_rejection(send, reason)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release()
+
+    async def _send_rejection(self, send, reason: str) -> None:
+        body = json.dumps(
+            {"detail": "Serwer przeciążony - spróbuj ponownie później", "reason": reason},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
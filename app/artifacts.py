@@ -0,0 +1,31 @@
+"""
+Wczytywanie plików modelu dla API i procesów roboczych.
+
+Model jest wczytywany przez pickle. Współdzielenie pamięci modelu między
+workerami zapewnia tryb pre-fork (app/serve.py): drzewa sklearn
+(`Tree.__setstate__`) kopiują tablice węzłów do własnej pamięci, więc
+mapowanie pliku z `mmap_mode` nie dawało współdzielonych stron.
+"""
+
+import hashlib
+import pickle
+import warnings
+from pathlib import Path
+
+
+def load_model_file(path):
+    """Model z pliku pickle"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        with open(Path(path), "rb") as f:
+            return pickle.load(f)
+
+
+def file_digest(*paths):
+    """SHA-256 treści plików liczony strumieniowo (bez wczytania całości do pamięci)"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest
@@ -0,0 +1,142 @@
+"""
+Mikro-batching współbieżnych żądań /predict.
+
+Żądania, które przyjdą w krótkim oknie czasowym (np. 2 ms) albo do
+osiągnięcia limitu wierszy, są oceniane jednym wektorowym wywołaniem
+modelu w puli wątków, a każdy wywołujący dostaje własny wynik.
+
+`score_fn` zwraca parę (wyniki, czasy etapów paczki). Wątek puli nie ma
+kontekstu żądań, więc czasy etapów są przekazywane `record_stages`
+w kontekście każdego oczekującego żądania (Server-Timing, histogramy).
+"""
+
+import asyncio
+
+
+class BatcherStopped(RuntimeError):
+    """Dyspozytor zatrzymany, zanim rekord trafił do paczki"""
+
+
+class MicroBatcher:
+    """Asynchroniczny dyspozytor zbierający rekordy w paczki dla `score_fn`"""
+
+    def __init__(self, score_fn, max_batch_size: int = 64, max_wait_ms: float = 2.0,
+                 max_concurrent_batches: int = 2, executor=None, record_stages=None):
+        self.score_fn = score_fn
+        self.record_stages = record_stages
+        self.max_batch_size = max(int(max_batch_size), 1)
+        self.max_wait = max(float(max_wait_ms), 0.0) / 1000
+        self.max_concurrent_batches = max(int(max_concurrent_batches), 1)
+        self.executor = executor
+        self.batches = 0
+        self.items = 0
+        self._loop = None
+        self._queue = None
+        self._worker = None
+        self._slots = None
+        # referencje do paczek w toku - inaczej zadanie może zebrać GC
+        self._dispatches = set()
+
+    def _ensure_started(self) -> None:
+        """Uruchomienie pętli zbierającej w bieżącej pętli zdarzeń (leniwie)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._worker is not None and not self._worker.done():
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+        self._worker = loop.create_task(self._collect())
+
+    async def submit(self, item):
+        """Dodaje rekord do najbliższej paczki i czeka na jego wynik"""
+        self._ensure_started()
+        future = self._loop.create_future()
+        self._queue.put_nowait((item, future))
+        result, stages = await future
+        if self.record_stages is not None:
+            self.record_stages(stages)
+        return result
+
+    async def stop(self) -> None:
+        """
+        Zatrzymanie zbierania: rekordy czekające w kolejce dostają `BatcherStopped`,
+        a paczki już przekazane do oceny są kończone.
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+        if self._queue is not None:
+            pending = []
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+            self._fail(pending)
+        if self._dispatches:
+            await asyncio.gather(*self._dispatches, return_exceptions=True)
+
+    @staticmethod
+    def _fail(batch: list) -> None:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(BatcherStopped("Mikro-batching zatrzymany"))
+
+    async def _collect(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            try:
+                deadline = loop.time() + self.max_wait
+                while len(batch) < self.max_batch_size:
+                    # najpierw to, co już czeka w kolejce - bez dodatkowego oczekiwania
+                    if not self._queue.empty():
+                        batch.append(self._queue.get_nowait())
+                        continue
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+
+                await self._slots.acquire()
+            except asyncio.CancelledError:
+                # zebrana, ale nieprzekazana paczka nie może zostać bez odpowiedzi
+                self._fail(batch)
+                raise
+            task = loop.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch: list) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            items = [item for item, _ in batch]
+            try:
+                results, stages = await loop.run_in_executor(self.executor, self.score_fn, items)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+            self.batches += 1
+            self.items += len(items)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result((result, stages))
+        finally:
+            self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": True,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+        }
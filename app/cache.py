@@ -0,0 +1,82 @@
+"""
+Cache predykcji API - LRU ograniczony liczbą wpisów i czasem życia (TTL).
+
+Klucz to krotka zwalidowanych wartości `CreditInput` w stałej kolejności pól,
+więc rekordy różniące się tylko zapisem w JSON (np. 50000 vs 50000.0)
+trafiają w ten sam wpis. Cache jest czyszczony przy zmianie wersji modelu
+(odcisk pliku modelu i artefaktu preprocessingu).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """Wątkowo bezpieczny cache LRU z TTL; max_entries=0 wyłącza cache"""
+
+    def __init__(self, max_entries: int = 0, ttl_seconds: float = 300.0, clock=time.monotonic):
+        self.max_entries = max(int(max_entries), 0)
+        self.ttl_seconds = float(ttl_seconds)
+        self.clock = clock
+        self.token = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def key(data) -> tuple:
+        """Kanoniczny klucz: wartości pól modelu pydantic w kolejności deklaracji"""
+        return tuple(getattr(data, name) for name in type(data).model_fields)
+
+    def get(self, key: tuple):
+        """Zwraca zapamiętaną wartość albo None (brak / wpis przeterminowany)"""
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: tuple, value) -> None:
+        if not self.enabled:
+            return
+        expires_at = self.clock() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def reset(self, token=None) -> None:
+        """Czyści cache, jeśli zmienił się token modelu/artefaktu"""
+        with self._lock:
+            if token is not None and token == self.token:
+                return
+            self.token = token
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,131 @@
+"""
+Kolumnowa walidacja danych wejściowych zgodna z `CreditInput`.
+
+Zakresy (`ge`/`le`), typy całkowite i dozwolone kategorie (`Literal`) są
+odczytywane z modelu pydantic, a sprawdzane wektorowo dla całych kolumn -
+bez tworzenia obiektu pydantic dla każdego wiersza.
+
+Format binarny `/predict/columnar` to paczka NumPy `.npz`: jedna
+jednowymiarowa tablica na pole `CreditInput` (kolejność dowolna, nazwy
+jak pola), wszystkie tej samej długości. Odpowiedź ma ten sam format.
+"""
+
+from __future__ import annotations
+
+import io
+from typing import Literal, get_args, get_origin
+
+import numpy as np
+
+
+def field_specs(model_cls) -> dict[str, dict]:
+    """Ograniczenia pól modelu pydantic w postaci słownika per kolumna"""
+    specs = {}
+    for name, field in model_cls.model_fields.items():
+        spec = {"kind": "float", "ge": None, "le": None, "choices": None}
+        if get_origin(field.annotation) is Literal:
+            spec["kind"] = "category"
+            spec["choices"] = list(get_args(field.annotation))
+        elif field.annotation is int:
+            spec["kind"] = "int"
+        for constraint in field.metadata:
+            for bound in ("ge", "le"):
+                if getattr(constraint, bound, None) is not None:
+                    spec[bound] = getattr(constraint, bound)
+        specs[name] = spec
+    return specs
+
+
+def validate_columns(
+    columns: dict,
+    n_rows: int,
+    specs: dict[str, dict],
+    impute: dict | None = None,
+) -> tuple[dict[str, np.ndarray], np.ndarray]:
+    """
+    Walidacja i konwersja kolumn.
+
+    Zwraca (kolumny po konwersji, tablicę błędów). Dla poprawnego wiersza
+    błąd jest pustym napisem; zapamiętywany jest pierwszy błąd w wierszu.
+    Brakujące wartości (NaN/None) są uzupełniane z `impute`, jeśli podano.
+    """
+    import pandas as pd
+
+    impute = impute or {}
+    errors = np.full(n_rows, "", dtype=object)
+
+    def flag(mask: np.ndarray, message: str) -> None:
+        errors[mask & (errors == "")] = message
+
+    out = {}
+    for name, spec in specs.items():
+        if name not in columns:
+            flag(np.ones(n_rows, dtype=bool), f"{name}: brak kolumny")
+            continue
+
+        raw = pd.Series(columns[name])
+        missing = raw.isna().to_numpy()
+        if spec["kind"] == "category":
+            values = np.array(raw, dtype=object)
+            if name in impute:
+                values[missing] = impute[name]
+            else:
+                flag(missing, f"{name}: brak wartości")
+            flag(~np.isin(values, spec["choices"]), f"{name}: dozwolone wartości {spec['choices']}")
+        else:
+            values = np.array(pd.to_numeric(raw, errors="coerce"), dtype=float)
+            flag(np.isnan(values) & ~missing, f"{name}: wartość nie jest liczbą")
+            if name in impute:
+                values[missing] = impute[name]
+            else:
+                flag(missing, f"{name}: brak wartości")
+            if spec["kind"] == "int":
+                flag(np.isfinite(values) & (values != np.floor(values)),
+                     f"{name}: wartość nie jest liczbą całkowitą")
+            if spec["ge"] is not None:
+                flag(values < spec["ge"], f"{name}: wartość < {spec['ge']}")
+            if spec["le"] is not None:
+                flag(values > spec["le"], f"{name}: wartość > {spec['le']}")
+            flag(np.isinf(values), f"{name}: wartość nieskończona")
+        out[name] = values
+
+    return out, errors
+
+
+# Typ treści paczki kolumnowej (np.savez)
+NPZ_CONTENT_TYPE = "application/x-npz"
+
+
+def read_npz(body: bytes, max_rows: int | None = None) -> tuple[dict[str, np.ndarray], int]:
+    """
+    Paczka `.npz` -> (kolumny, liczba wierszy).
+
+    Obiekty Pythona (pickle) nie są wczytywane. ValueError - niepoprawna
+    paczka, kolumny różnej długości albo przekroczony limit wierszy.
+    """
+    try:
+        with np.load(io.BytesIO(body), allow_pickle=False) as bundle:
+            columns = {name: bundle[name] for name in bundle.files}
+    except Exception as e:
+        raise ValueError(f"niepoprawna paczka .npz: {e}")
+
+    lengths = set()
+    for name, values in columns.items():
+        if values.ndim != 1:
+            raise ValueError(f"{name}: oczekiwano tablicy jednowymiarowej")
+        if values.dtype.kind == "S":
+            columns[name] = np.char.decode(values, "utf-8")
+        lengths.add(len(values))
+    if len(lengths) > 1:
+        raise ValueError(f"kolumny mają różne długości: {sorted(lengths)}")
+    n_rows = lengths.pop() if lengths else 0
+    if max_rows is not None and n_rows > max_rows:
+        raise ValueError(f"za dużo wierszy: {n_rows} > {max_rows}")
+    return columns, n_rows
+
+
+def write_npz(arrays: dict[str, np.ndarray]) -> bytes:
+    """Kolumny -> paczka `.npz` (bez kompresji - szybszy zapis i odczyt)"""
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    return buffer.getvalue()
@@ -0,0 +1,88 @@
+"""
+Wyjaśnienia decyzji modelu (reason codes) dla endpointu /explain.
+
+Explainer jest budowany raz dla wczytanej wersji modelu i trzymany razem
+z nią (`ModelVersion.explainer`). Wkłady cech liczone są jednym wywołaniem
+dla całej macierzy cech, a top-k cech per wiersz wybierane wektorowo.
+
+- modele drzewiaste: `shap.TreeExplainer` (wkłady w skali prawdopodobieństwa
+  klasy 1, zależnie od modelu - w skali log-odds),
+- modele liniowe (`coef_`): dokładne wkłady `coef * x` w skali log-odds
+  (cechy są wystandaryzowane, więc punktem odniesienia jest średnia z treningu).
+"""
+
+import threading
+
+import numpy as np
+
+
+class ExplainerUnavailable(RuntimeError):
+    """Model nie obsługuje wyjaśnień (brak shap albo nieobsługiwany typ modelu)"""
+
+
+class ReasonCodes:
+    """Explainer jednej wersji modelu i wybór najważniejszych cech"""
+
+    def __init__(self, kind: str, feature_names: list[str], contributions_fn):
+        self.kind = kind
+        self.feature_names = np.asarray(feature_names, dtype=object)
+        self._contributions = contributions_fn
+
+    @classmethod
+    def build(cls, model, feature_names: list[str]) -> "ReasonCodes":
+        """Explainer dla modelu; ExplainerUnavailable gdy model nie jest obsługiwany"""
+        if hasattr(model, "estimators_") or hasattr(model, "tree_") or hasattr(model, "get_booster"):
+            try:
+                import shap
+            except ImportError:
+                raise ExplainerUnavailable("Brak biblioteki shap (pip install shap)")
+            explainer = shap.TreeExplainer(model)
+
+            def tree_contributions(X: np.ndarray) -> np.ndarray:
+                values = explainer.shap_values(X, check_additivity=False)
+                if isinstance(values, list):
+                    values = values[-1]
+                values = np.asarray(values)
+                return values[:, :, -1] if values.ndim == 3 else values
+
+            return cls("tree_shap", feature_names, tree_contributions)
+
+        coef = getattr(model, "coef_", None)
+        if coef is not None:
+            weights = np.asarray(coef, dtype=float)[-1]
+            return cls("linear", feature_names, lambda X: X * weights)
+
+        raise ExplainerUnavailable(f"Wyjaśnienia nie są obsługiwane dla {type(model).__name__}")
+
+    def contributions(self, X: np.ndarray) -> np.ndarray:
+        """Wkłady cech (n_wierszy, n_cech) dla całej macierzy jednym wywołaniem"""
+        return self._contributions(np.asarray(X, dtype=float))
+
+    def top_k(self, X: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """(indeksy cech, wkłady) k cech o największym |wkładzie| dla każdego wiersza"""
+        values = self.contributions(X)
+        k = min(max(int(k), 1), values.shape[1])
+        # argpartition wybiera k największych bez pełnego sortowania, potem sortowanie k
+        top = np.argpartition(-np.abs(values), k - 1, axis=1)[:, :k]
+        top_values = np.take_along_axis(values, top, axis=1)
+        order = np.argsort(-np.abs(top_values), axis=1)
+        return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_values, order, axis=1)
+
+
+_build_lock = threading.Lock()
+
+
+def explainer_for(version) -> ReasonCodes:
+    """Explainer wersji modelu - budowany przy pierwszym użyciu i zapamiętany w wersji"""
+    if version.explainer is None:
+        with _build_lock:
+            if version.explainer is None:
+                model = version.model
+                if hasattr(model, "feature_names_in_"):
+                    names = [str(c) for c in model.feature_names_in_]
+                elif version.fast_path is not None:
+                    names = version.fast_path.names
+                else:
+                    names = list(version.feature_columns)
+                version.explainer = ReasonCodes.build(model, names)
+    return version.explainer
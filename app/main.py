@@ -5,17 +5,64 @@ This API provides predictions for credit risk assessment using a trained ML mode
 It includes full preprocessing integration to transform raw user inputs.
 """
 
+import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import Response
 from pydantic import BaseModel, Field
-from typing import Literal
-import pickle
-import pandas as pd
+from typing import TYPE_CHECKING, Literal, Optional
+import json
+import os
+import random
+import secrets
+import threading
+import time
+import warnings
 import numpy as np
-from sklearn.preprocessing import StandardScaler
 from pathlib import Path
 
+from ai_credit_scoring.binning import AGE_BINS, assign_bin, assign_bins
+from app import IMPORT_STARTED, logger
+from app.admission import AdmissionController, AdmissionMiddleware
+from app.artifacts import file_digest, load_model_file
+from app.batching import MicroBatcher
+from app.cache import PredictionCache
+from app.columnar import NPZ_CONTENT_TYPE, field_specs, read_npz, validate_columns, write_npz
+from app.explain import ExplainerUnavailable, explainer_for
+from app.metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    IMPORT_SECONDS,
+    MODEL_LOAD_SECONDS,
+    STAGE_SECONDS,
+    WARMUP_OVER_BUDGET,
+    WARMUP_SINGLE_P99_SECONDS,
+    MetricsMiddleware,
+    observe_since_request_start,
+    render as render_metrics,
+)
+from app.parallelism import InferenceParallelism
+from app.registry import ModelRegistry, ModelVersion
+from app.serialization import JSON_CONTENT_TYPE, dumps, encode_ndjson, prediction_rows
+from app.shadow import ShadowScorer
+from app.tracing import REQUEST_ID_HEADER, TraceWriter, TracingMiddleware
+from app.streaming import (
+    STREAM_FORMATS,
+    RequestStreamingResponse,
+    iter_record_chunks,
+    stream_format,
+)
+from app.warmup import Readiness, measure_warmup, synthetic_record
+from app.workers import InferencePool, PoolSaturated
+
+# pandas i sklearn.preprocessing są importowane dopiero przy pierwszym użyciu
+# (ścieżka DataFrame, strumienie, fallback scalera) - FastPath ich nie potrzebuje
+if TYPE_CHECKING:
+    import pandas as pd
+    from sklearn.preprocessing import StandardScaler
+
 # === Ścieżki do plików ===
 BASE_DIR = Path(__file__).resolve().parent.parent
 MODEL_PATHS = [
@@ -24,66 +71,514 @@ MODEL_PATHS = [
     BASE_DIR / "data" / "06_models" / "custom_model.pkl",
     BASE_DIR / "data" / "06_models" / "baseline_model.pkl",
 ]
+PREPROCESSOR_PATH = BASE_DIR / "data" / "06_models" / "preprocessor.json"
+# Fallback: dopasowanie scalera na danych po cleaningu (brak artefaktu)
 CLEAN_DATA_PATH = BASE_DIR / "data" / "02_intermediate" / "clean_data.csv"
 
-# === Zmienne globalne ===
+# === Zmienne globalne (odzwierciedlają aktywną wersję z rejestru) ===
 model = None
 scaler = None
 feature_columns = None
 model_path_used = None
+preprocessor = None
+preprocessor_path_used = None
+fast_path = None
 
+# Mikro-batching /predict (MICRO_BATCH_WAIT_MS=0 - wyłączony)
+MICRO_BATCH_WAIT_MS = float(os.getenv("MICRO_BATCH_WAIT_MS", "0"))
+MICRO_BATCH_MAX_SIZE = int(os.getenv("MICRO_BATCH_MAX_SIZE", "64"))
 
-def load_model_and_scaler():
-    """Wczytanie modelu i dopasowanie scalera"""
-    global model, scaler, feature_columns, model_path_used
-    
-    # Próba wczytania modelu z różnych ścieżek (fallback)
-    import warnings
+# Liczba wierszy w jednej paczce /predict/stream
+STREAM_CHUNK_ROWS = int(os.getenv("STREAM_CHUNK_ROWS", "5000"))
+
+# Maksymalna liczba wierszy w jednej paczce /predict/columnar
+COLUMNAR_MAX_ROWS = int(os.getenv("COLUMNAR_MAX_ROWS", "1000000"))
+
+# Pula procesów inferencji (INFERENCE_WORKERS=0 - model w procesie API)
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "0"))
+INFERENCE_QUEUE_DEPTH = int(os.getenv("INFERENCE_QUEUE_DEPTH", "0")) or None
+inference_pool = None
+
+# Wątki joblib modeli zespołowych (n_jobs z treningu jest nadpisywane): pojedyncze
+# rekordy i małe wsady liczone szeregowo, wsady od PARALLEL_INFERENCE_MIN_ROWS
+# wierszy na PARALLEL_INFERENCE_THREADS wątkach (-1 = wszystkie rdzenie, 0 - nigdy)
+PARALLEL_INFERENCE_MIN_ROWS = int(os.getenv("PARALLEL_INFERENCE_MIN_ROWS", "5000"))
+PARALLEL_INFERENCE_THREADS = int(os.getenv("PARALLEL_INFERENCE_THREADS", "-1"))
+
+# Rejestr wersji modelu i hot reload
+MODEL_REGISTRY_SIZE = int(os.getenv("MODEL_REGISTRY_SIZE", "3"))
+# Co ile sekund sprawdzać zmiany plików modelu (0 - obserwacja wyłączona)
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "0"))
+# Maksymalny czas oczekiwania na żądania w toku przed zamknięciem puli starej wersji
+MODEL_DRAIN_TIMEOUT = float(os.getenv("MODEL_DRAIN_TIMEOUT", "30"))
+# Token endpointów /admin/* (brak - endpointy wyłączone)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+# Liczba procesów API (serwer pre-fork / uvicorn --workers). Żądanie /admin/*
+# trafia do jednego z nich, więc przy kilku procesach przełączanie wersji
+# jest wyłączone - nowy model wdraża się restartem serwera
+WORKER_PROCESSES = int(os.getenv("WEB_CONCURRENCY", "1"))
+registry = ModelRegistry(max_versions=MODEL_REGISTRY_SIZE)
+reload_lock = threading.Lock()
+
+# Ocena w cieniu challengerem (brak SHADOW_MODEL_PATH - wyłączona)
+SHADOW_MODEL_PATH = os.getenv("SHADOW_MODEL_PATH", "")
+SHADOW_LOG_PATH = Path(os.getenv(
+    "SHADOW_LOG_PATH", BASE_DIR / "data" / "07_model_output" / "shadow_scores.jsonl"
+))
+SHADOW_QUEUE_SIZE = int(os.getenv("SHADOW_QUEUE_SIZE", "10000"))
+shadow_scorer = None
+
+# Próbka żądań oceny (TRACE_SAMPLE_RATE, 0 - wyłączona) z czasami etapów zapisywana
+# do rotowanego pliku NDJSON: TRACE_MAX_BYTES na plik, TRACE_BACKUPS starszych plików
+trace_writer = TraceWriter(
+    Path(os.getenv(
+        "TRACE_LOG_PATH", BASE_DIR / "data" / "08_reporting" / "request_traces.jsonl"
+    )),
+    sample_rate=float(os.getenv("TRACE_SAMPLE_RATE", "0.01")),
+    max_bytes=int(os.getenv("TRACE_MAX_BYTES", "10000000")),
+    backups=int(os.getenv("TRACE_BACKUPS", "5")),
+)
+
+# Rozgrzewka przy starcie: WARMUP_ROUNDS predykcji pojedynczych i jedna wsadowa;
+# przy p99 pojedynczej predykcji ponad budżetem /ready zwraca 503 (over_budget),
+# a pomiar jest ponawiany co WARMUP_RETRY_SECONDS (podwajane do WARMUP_RETRY_MAX_SECONDS)
+WARMUP_ROUNDS = int(os.getenv("WARMUP_ROUNDS", "50"))
+WARMUP_BATCH_SIZE = int(os.getenv("WARMUP_BATCH_SIZE", "256"))
+WARMUP_LATENCY_BUDGET_MS = float(os.getenv("WARMUP_LATENCY_BUDGET_MS", "100"))
+WARMUP_ATTEMPTS = int(os.getenv("WARMUP_ATTEMPTS", "3"))
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "5"))
+WARMUP_RETRY_MAX_SECONDS = float(os.getenv("WARMUP_RETRY_MAX_SECONDS", "60"))
+readiness = Readiness()
+# ustawiane przy zamykaniu API - przerywa ponawianie rozgrzewki
+warmup_stop = threading.Event()
+
+# Domyślna liczba cech zwracanych przez /explain (parametr top_k)
+EXPLAIN_TOP_K = int(os.getenv("EXPLAIN_TOP_K", "3"))
+
+# Kontrola przyjmowania żądań oceny (ADMISSION_MAX_CONCURRENT=0 - wyłączona)
+admission = AdmissionController(
+    max_concurrent=int(os.getenv("ADMISSION_MAX_CONCURRENT", "0")),
+    max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", "64")),
+    queue_timeout=float(os.getenv("ADMISSION_QUEUE_TIMEOUT_MS", "1000")) / 1000,
+)
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "1"))
+ADMISSION_PATHS = (
+    "/predict", "/predict/batch", "/predict/stream", "/predict/columnar",
+    "/explain", "/explain/batch",
+)
+
+# Kompresja gzip odpowiedzi od GZIP_MIN_BYTES bajtów, gdy klient wysyła
+# Accept-Encoding: gzip (GZIP_MIN_BYTES=0 - wyłączona)
+GZIP_MIN_BYTES = int(os.getenv("GZIP_MIN_BYTES", "4096"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "5"))
+
+# Opcjonalny cache predykcji (PREDICTION_CACHE_SIZE=0 - wyłączony)
+prediction_cache = PredictionCache(
+    max_entries=int(os.getenv("PREDICTION_CACHE_SIZE", "0")),
+    ttl_seconds=float(os.getenv("PREDICTION_CACHE_TTL", "300")),
+)
+
+# FastPath przekazuje do modelu tablicę NumPy (bez nazw kolumn) - kolejność
+# cech jest zgodna z feature_names_in_, więc ostrzeżenie sklearn jest zbędne
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+# Maksymalna liczba rekordów w jednym żądaniu /predict/batch
+MAX_BATCH_SIZE = 10_000
+
+# Progi interpretacji ryzyka (niski < 0.3 <= średni < 0.7 <= wysoki)
+RISK_THRESHOLDS = (0.3, 0.7)
+RISK_LABELS = np.array(["niski", "średni", "wysoki"], dtype=object)
+
+# Domyślne biny (gdy brak artefaktu preprocessingu) - format jak w preprocessor.json
+DEFAULT_BINS = {
+    "person_age_bin": AGE_BINS,
+    "person_income_bin": {
+        "source": "person_income",
+        "edges": [4000.0, 35000.0, 49000.0, 63000.0, 86000.0, 138000.0, 140250.0],
+        "labels": [
+            "(3999.999, 35000.0]",
+            "(35000.0, 49000.0]",
+            "(49000.0, 63000.0]",
+            "(63000.0, 86000.0]",
+            "(86000.0, 138000.0]",
+            "(138000.0, 140250.0]",
+        ],
+    },
+}
+
+
+def scaler_from_artifact(spec: dict) -> "StandardScaler":
+    """Odtworzenie dopasowanego StandardScalera ze średnich i skal z artefaktu"""
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler()
+    scaler.mean_ = np.asarray(spec["mean"], dtype=float)
+    scaler.scale_ = np.asarray(spec["scale"], dtype=float)
+    scaler.var_ = scaler.scale_ ** 2
+    scaler.n_features_in_ = len(spec["columns"])
+    scaler.feature_names_in_ = np.asarray(spec["columns"], dtype=object)
+    return scaler
+
+
+def find_model_path() -> Path:
+    """Pierwszy istniejący plik z MODEL_PATHS"""
     for model_path in MODEL_PATHS:
         if model_path.exists():
+            return model_path
+    raise RuntimeError("Nie można wczytać żadnego modelu")
+
+
+def load_model_version(model_path: Optional[Path] = None,
+                       preprocessor_path: Optional[Path] = None,
+                       role: str = "champion") -> ModelVersion:
+    """
+    Wczytanie modelu i artefaktu preprocessingu jako nowej wersji (bez aktywacji).
+
+    Bez podanych ścieżek model jest szukany w MODEL_PATHS (fallback), a artefakt
+    w PREPROCESSOR_PATH. Identyfikator wersji to odcisk treści obu plików.
+    Czas wczytania trafia do metryki z etykietą `role` (champion / challenger).
+    """
+    started = time.perf_counter()
+    model = None
+    candidates = [model_path] if model_path is not None else MODEL_PATHS
+
+    # Próba wczytania modelu z różnych ścieżek (fallback)
+    for candidate in candidates:
+        if candidate.exists():
             try:
-                with warnings.catch_warnings():
-                    warnings.simplefilter("ignore")
-                    with open(model_path, "rb") as f:
-                        model = pickle.load(f)
-                model_path_used = model_path
-                print(f"✅ Model wczytany z: {model_path.name}")
+                model = load_model_file(candidate)
+                fingerprint = file_digest(candidate)
+                model_path = candidate
+                logger.info(f"✅ Model wczytany z: {candidate.name}")
                 break
             except Exception as e:
-                print(f"⚠️ Nie można wczytać {model_path.name}: {e}")
+                logger.warning(f"⚠️ Nie można wczytać {candidate.name}: {e}")
                 continue
     
     if model is None:
-        raise RuntimeError(f"Nie można wczytać żadnego modelu")
-    
-    # Wczytanie danych do dopasowania scalera
-    if not CLEAN_DATA_PATH.exists():
-        raise RuntimeError(f"Dane do scalera nie znalezione: {CLEAN_DATA_PATH}")
+        raise RuntimeError("Nie można wczytać żadnego modelu")
     
-    clean_data = pd.read_csv(CLEAN_DATA_PATH)
-    
-    # Kolumny numeryczne do skalowania (bez target i ID)
-    exclude_cols = {"loan_status", "_row_id"}
-    num_cols = clean_data.select_dtypes(include=[np.number]).columns.tolist()
-    num_cols = [c for c in num_cols if c not in exclude_cols]
-    
-    # Dopasowanie scalera
-    scaler = StandardScaler()
-    scaler.fit(clean_data[num_cols])
+    # Artefakt z preprocessingu: imputacja, clipping, biny i parametry scalera
+    preprocessor_path = preprocessor_path or PREPROCESSOR_PATH
+    if preprocessor_path.exists():
+        preprocessor_bytes = preprocessor_path.read_bytes()
+        preprocessor = json.loads(preprocessor_bytes)
+        fingerprint.update(preprocessor_bytes)
+        scaler = scaler_from_artifact(preprocessor["scaler"])
+        feature_columns = list(preprocessor["scaler"]["columns"])
+        logger.info(f"✅ Artefakt preprocessingu wczytany z: {preprocessor_path.name}")
+    else:
+        # Wczytanie danych do dopasowania scalera
+        if not CLEAN_DATA_PATH.exists():
+            raise RuntimeError(
+                f"Brak artefaktu {preprocessor_path} i danych do scalera: {CLEAN_DATA_PATH}"
+            )
+        logger.warning(f"⚠️ Brak {preprocessor_path.name} - dopasowanie scalera na {CLEAN_DATA_PATH.name}")
+        
+        import pandas as pd
+        from sklearn.preprocessing import StandardScaler
+
+        clean_data = pd.read_csv(CLEAN_DATA_PATH)
+        
+        # Kolumny numeryczne do skalowania (bez target i ID)
+        exclude_cols = {"loan_status", "_row_id"}
+        num_cols = clean_data.select_dtypes(include=[np.number]).columns.tolist()
+        num_cols = [c for c in num_cols if c not in exclude_cols]
+        
+        # Dopasowanie scalera
+        scaler = StandardScaler()
+        scaler.fit(clean_data[num_cols])
+        
+        # Zapamiętanie kolejności cech
+        feature_columns = num_cols
+        preprocessor = None
+        preprocessor_path = None
     
-    # Zapamiętanie kolejności cech
-    feature_columns = num_cols
+    logger.info(f"✅ Model wczytany: {type(model).__name__}")
+    logger.info(f"✅ Scaler gotowy dla {len(feature_columns)} cech numerycznych")
+
+    # n_jobs=-1 zapisane w modelu uruchamiałoby wątki joblib przy każdej predykcji
+    parallelism = InferenceParallelism(
+        model, threads=PARALLEL_INFERENCE_THREADS, min_rows=PARALLEL_INFERENCE_MIN_ROWS
+    )
     
-    print(f"✅ Model wczytany: {type(model).__name__}")
-    print(f"✅ Scaler dopasowany na {len(feature_columns)} cechach numerycznych")
+    fast_path = FastPath.build(model, scaler, feature_columns, preprocessor, parallelism)
+    if fast_path is None:
+        logger.warning("⚠️ Model wymaga ścieżki DataFrame - szybka ścieżka wyłączona")
+    MODEL_LOAD_SECONDS.set(time.perf_counter() - started, role)
+
+    # Nowy model lub artefakt = nowa wersja (odcisk treści plików)
+    return ModelVersion(
+        version=fingerprint.hexdigest()[:12],
+        model=model,
+        scaler=scaler,
+        feature_columns=feature_columns,
+        preprocessor=preprocessor,
+        model_path=model_path,
+        preprocessor_path=preprocessor_path,
+        fast_path=fast_path,
+        parallelism=parallelism,
+    )
+
+
+def publish_version(version: ModelVersion) -> None:
+    """Ustawienie zmiennych globalnych modułu na aktywną wersję"""
+    global model, scaler, feature_columns, model_path_used
+    global preprocessor, preprocessor_path_used, fast_path, inference_pool
+    model = version.model
+    scaler = version.scaler
+    feature_columns = version.feature_columns
+    model_path_used = version.model_path
+    preprocessor = version.preprocessor
+    preprocessor_path_used = version.preprocessor_path
+    fast_path = version.fast_path
+    inference_pool = version.pool
+
+
+def retire_in_background(version: ModelVersion) -> None:
+    """Zamknięcie puli procesów wersji po zakończeniu jej żądań w toku"""
+    if version.pool is not None:
+        threading.Thread(
+            target=version.retire_pool, args=(MODEL_DRAIN_TIMEOUT,), daemon=True
+        ).start()
+
+
+def activate_version(version: ModelVersion) -> ModelVersion:
+    """
+    Rejestracja i atomowe przełączenie aktywnej wersji.
+
+    Nowe żądania trafiają do nowej wersji, a żądania w toku kończą się na
+    poprzedniej; jej pula procesów jest zamykana dopiero po ich zakończeniu.
+    """
+    version, evicted = registry.add(version)
+    previous = registry.activate(version.version)
+    # Nowa wersja modelu - zapamiętane predykcje są nieaktualne
+    prediction_cache.reset(version.version)
+    publish_version(version)
+    for old in evicted:
+        retire_in_background(old)
+    if previous is not None and previous is not version:
+        retire_in_background(previous)
+        logger.info(f"🔄 Aktywna wersja modelu: {version.version} (poprzednia: {previous.version})")
+    return version
+
+
+def load_model_and_scaler() -> ModelVersion:
+    """Wczytanie i aktywacja modelu oraz artefaktu preprocessingu (albo dopasowanie scalera)"""
+    return activate_version(load_model_version())
+
+
+def warm_up_version(version: ModelVersion) -> dict:
+    """
+    Rozgrzanie wersji przed aktywacją: syntetyczne predykcje i start puli procesów.
+
+    Zwraca opóźnienia rozgrzanej ścieżki (p50 / p99 pojedynczej predykcji, czas wsadu).
+    """
+    rng = random.Random(0)
+    records = [CreditInput(**synthetic_record(INPUT_SPECS, rng)) for _ in range(max(WARMUP_ROUNDS, 1))]
+    report = measure_warmup(
+        lambda record: predict_one(record, version),
+        lambda batch: score_records(batch, version),
+        records,
+        max(WARMUP_BATCH_SIZE, 1),
+    )
+    if "error" not in report:
+        start_inference_pool(version)
+    return report
+
+
+def run_startup_warmup() -> dict:
+    """
+    Rozgrzewka aktywnej wersji przy starcie i ustawienie gotowości (/ready).
+
+    Przy przekroczeniu budżetu opóźnienia rozgrzewka jest powtarzana od razu
+    (WARMUP_ATTEMPTS przebiegów - kolejne są już rozgrzane), a potem w stanie
+    over_budget (/ready: 503) co WARMUP_RETRY_SECONDS z podwajaniem odstępu,
+    aż opóźnienie zmieści się w budżecie albo API zostanie zamknięte.
+    """
+    readiness.set("warming")
+    delay = WARMUP_RETRY_SECONDS
+    attempt = 0
+    while True:
+        attempt += 1
+        version = registry.active
+        report = {
+            "version": version.version,
+            "attempt": attempt,
+            "budget_ms": WARMUP_LATENCY_BUDGET_MS,
+            **warm_up_version(version),
+        }
+        if "error" in report:
+            readiness.set("failed", report)
+            logger.error(f"❌ Rozgrzewka nie powiodła się: {report['error']}")
+            return report
+        WARMUP_SINGLE_P99_SECONDS.set(report["single_p99_ms"] / 1000)
+        if WARMUP_LATENCY_BUDGET_MS <= 0 or report["single_p99_ms"] <= WARMUP_LATENCY_BUDGET_MS:
+            WARMUP_OVER_BUDGET.set(0)
+            readiness.set("ready", report)
+            logger.info(f"✅ Rozgrzewka zakończona: p99 {report['single_p99_ms']} ms, "
+                        f"wsad {report['batch_size']} w {report['batch_ms']} ms")
+            return report
+        if attempt < max(WARMUP_ATTEMPTS, 1):
+            continue
+        WARMUP_OVER_BUDGET.set(1)
+        readiness.set("over_budget", report)
+        logger.warning(f"⚠️ Opóźnienie po rozgrzewce poza budżetem: p99 {report['single_p99_ms']} ms "
+                       f"> {WARMUP_LATENCY_BUDGET_MS} ms - ponowny pomiar za {delay:g} s")
+        if warmup_stop.wait(delay):
+            return report
+        delay = min(delay * 2, WARMUP_RETRY_MAX_SECONDS)
+
+
+def reload_model(model_path: Optional[Path] = None, preprocessor_path: Optional[Path] = None,
+                 activate: bool = True) -> ModelVersion:
+    """
+    Hot reload: wczytanie, rozgrzanie i (opcjonalnie) aktywacja nowej wersji.
+
+    Wykonywane poza pętlą zdarzeń - żądania są obsługiwane przez aktywną wersję
+    aż do przełączenia. Równoległe przeładowania są serializowane. Wersja, której
+    rozgrzewka się nie powiodła, nie trafia do rejestru - aktywna pozostaje poprzednia.
+    """
+    with reload_lock:
+        version = load_model_version(model_path, preprocessor_path)
+        if version.version not in registry:
+            report = warm_up_version(version)
+            if "error" in report:
+                raise RuntimeError(f"Rozgrzewka wersji {version.version} nie powiodła się: "
+                                   f"{report['error']}")
+        if activate:
+            return activate_version(version)
+        # te same pliki - zwracana jest wersja już wczytana i rozgrzana
+        version, evicted = registry.add(version)
+        for old in evicted:
+            retire_in_background(old)
+        return version
+
+
+def model_source_signature() -> tuple:
+    """Znacznik plików modelu i artefaktu (ścieżka, mtime, rozmiar) do obserwacji zmian"""
+    paths = [find_model_path(), PREPROCESSOR_PATH]
+    return tuple(
+        (str(path), path.stat().st_mtime_ns, path.stat().st_size)
+        for path in paths if path.exists()
+    )
+
+
+async def watch_model_files(interval: float) -> None:
+    """Tryb obserwacji: przeładowanie modelu po zmianie plików na dysku"""
+    signature = await run_in_threadpool(model_source_signature)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            current = await run_in_threadpool(model_source_signature)
+            if current == signature:
+                continue
+            # zapis pliku mógł się jeszcze nie zakończyć - kolejna zmiana ponowi próbę
+            signature = current
+            version = await run_in_threadpool(reload_model)
+            logger.info(f"✅ Obserwacja plików: aktywna wersja {version.version}")
+        except Exception as e:
+            logger.warning(f"⚠️ Przeładowanie modelu nie powiodło się: {e}")
+
+
+def start_inference_pool(version: Optional[ModelVersion] = None):
+    """Uruchomienie puli procesów inferencji dla wersji (INFERENCE_WORKERS > 0)"""
+    global inference_pool
+    version = version or registry.active
+    if INFERENCE_WORKERS <= 0 or version is None:
+        return None
+    if version.fast_path is None:
+        logger.warning("⚠️ Pula procesów wymaga szybkiej ścieżki (cechy numeryczne) - wyłączona")
+        return None
+    if version.pool is None:
+        pool = InferencePool(
+            version.model_path, workers=INFERENCE_WORKERS, queue_depth=INFERENCE_QUEUE_DEPTH
+        )
+        pool.warm_up(len(version.fast_path.names))
+        version.pool = pool
+        logger.info(f"✅ Pula inferencji: {pool.workers} procesów")
+    if version is registry.active:
+        inference_pool = version.pool
+    return version.pool
+
+
+def stop_inference_pool(version: Optional[ModelVersion] = None):
+    global inference_pool
+    version = version or registry.active
+    if version is None:
+        return
+    pool, version.pool = version.pool, None
+    if pool is not None:
+        if pool is inference_pool:
+            inference_pool = None
+        pool.shutdown()
+
+
+def start_shadow(model_path: Optional[Path] = None) -> Optional[ShadowScorer]:
+    """
+    Wczytanie challengera i uruchomienie oceny w cieniu (SHADOW_MODEL_PATH).
+
+    Challenger używa tego samego artefaktu preprocessingu co champion i nie
+    trafia do rejestru wersji - nie może obsłużyć żądania.
+    """
+    global shadow_scorer
+    if model_path is None:
+        if not SHADOW_MODEL_PATH:
+            return None
+        model_path = BASE_DIR / SHADOW_MODEL_PATH
+    stop_shadow()
+    challenger = load_model_version(model_path, role="challenger")
+
+    def score_challenger(records: list[CreditInput]) -> np.ndarray:
+        return score_records(records, challenger)[1]
+
+    shadow_scorer = ShadowScorer(
+        score_challenger,
+        SHADOW_LOG_PATH,
+        challenger=challenger.version,
+        queue_size=SHADOW_QUEUE_SIZE,
+    )
+    shadow_scorer.start()
+    logger.info(f"✅ Ocena w cieniu: challenger {model_path.name} ({challenger.version})")
+    return shadow_scorer
+
+
+def stop_shadow() -> None:
+    global shadow_scorer
+    scorer, shadow_scorer = shadow_scorer, None
+    if scorer is not None:
+        scorer.stop()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager - ładowanie modelu przy starcie"""
-    load_model_and_scaler()
+    # w trybie pre-fork (app/serve.py) model wczytał już proces nadrzędny
+    if registry.active is None:
+        load_model_and_scaler()
+    start_inference_pool()
+    start_shadow()
+    trace_writer.start()
+    # rozgrzewka w tle: /health odpowiada od razu, /ready dopiero po rozgrzewce
+    warmup_stop.clear()
+    threading.Thread(target=run_startup_warmup, name="startup-warmup", daemon=True).start()
+    watcher = None
+    if MODEL_WATCH_INTERVAL > 0:
+        watcher = asyncio.create_task(watch_model_files(MODEL_WATCH_INTERVAL))
     yield
-    # Cleanup (opcjonalnie)
+    warmup_stop.set()
+    if watcher is not None:
+        watcher.cancel()
+    if micro_batcher is not None:
+        await micro_batcher.stop()
+    stop_shadow()
+    trace_writer.stop()
+    for version in registry:
+        stop_inference_pool(version)
+
+
+# Nagłówek przypięcia żądania do wersji modelu (i wersji użytej w odpowiedzi)
+MODEL_VERSION_HEADER = "X-Model-Version"
 
 
 # === Konfiguracja aplikacji ===
@@ -94,6 +589,23 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Duże odpowiedzi (wsady, strumienie) kompresowane gzip po negocjacji Accept-Encoding
+if GZIP_MIN_BYTES > 0:
+    app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_BYTES, compresslevel=GZIP_LEVEL)
+
+# X-Request-ID i Server-Timing (czasy etapów) w odpowiedziach endpointów oceny;
+# wewnątrz kontroli przyjmowania - czas oczekiwania w kolejce nie wlicza się do etapów
+app.add_middleware(TracingMiddleware, paths=ADMISSION_PATHS, writer=trace_writer)
+
+# Limit współbieżności endpointów oceny: nadmiar żądań dostaje 429 + Retry-After
+# (dodane przed CORS i metrykami, więc odrzucenia są w nich widoczne)
+app.add_middleware(
+    AdmissionMiddleware,
+    controller=admission,
+    paths=ADMISSION_PATHS,
+    retry_after=ADMISSION_RETRY_AFTER,
+)
+
 # CORS - pozwalamy na połączenia z frontendu Streamlit
 app.add_middleware(
     CORSMiddleware,
@@ -101,8 +613,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[MODEL_VERSION_HEADER, REQUEST_ID_HEADER, "Server-Timing"],
 )
 
+# Metryki Prometheusa: liczba żądań, błędy, czasy obsługi, żądania w toku
+app.add_middleware(MetricsMiddleware)
+
 # === Model danych wejściowych ===
 class CreditInput(BaseModel):
     """Dane wejściowe do predykcji ryzyka kredytowego"""
@@ -146,38 +662,21 @@ class PredictionResponse(BaseModel):
     risk_level: str = Field(..., description="Poziom ryzyka: niski/średni/wysoki")
 
 
+# Ograniczenia pól CreditInput do walidacji kolumnowej (strumienie, dane wsadowe)
+INPUT_SPECS = field_specs(CreditInput)
+
+
 
 
 
 def create_age_bin(age: int) -> str:
-    """Tworzenie binu wiekowego zgodnie z preprocessing pipeline"""
-    if age <= 25:
-        return "18-25"
-    elif age <= 35:
-        return "26-35"
-    elif age <= 45:
-        return "36-45"
-    elif age <= 60:
-        return "46-60"
-    else:
-        return "60+"
+    """Bin wiekowy pojedynczej wartości (domyślne biny, jak w preprocessing pipeline)"""
+    return assign_bin(age, DEFAULT_BINS["person_age_bin"])
 
 
 def create_income_bin(income: float) -> str:
-    """Tworzenie binu dochodowego na podstawie stałych progów"""
-    if income <= 35000:
-        return "(3999.999, 35000.0]"
-    elif income <= 49000:
-        return "(35000.0, 49000.0]"
-    elif income <= 63000:
-        return "(49000.0, 63000.0]"
-    elif income <= 86000:
-        return "(63000.0, 86000.0]"
-    elif income <= 138000:
-        return "(86000.0, 138000.0]"
-    else:
-        return "(138000.0, 140250.0]"
-
+    """Bin dochodowy pojedynczej wartości (domyślne biny)"""
+    return assign_bin(income, DEFAULT_BINS["person_income_bin"])
 
 
 @app.get("/")
@@ -196,89 +695,805 @@ def health():
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+def ready(response: Response):
+    """
+    Gotowość do przyjmowania ruchu: 200 po rozgrzewce w budżecie opóźnienia.
+
+    Wcześniej, przy opóźnieniu poza budżetem i po błędzie rozgrzewki 503 ze
+    stanem (starting, warming, over_budget, failed) - /health pozostaje
+    sprawdzeniem samego procesu.
+    """
+    if not readiness.ready:
+        response.status_code = 503
+    return readiness.info()
+
+
+def prepare_features(df: "pd.DataFrame", version: Optional[ModelVersion] = None) -> "pd.DataFrame":
+    """
+    Przygotowanie macierzy cech dla modelu (wektorowo, dla dowolnej liczby wierszy).
+
+    Przycina wartości skrajne, tworzy biny, skaluje kolumny numeryczne i dopasowuje kolumny
+    do kolejności `model.feature_names_in_`. Domyślnie używa aktywnej wersji modelu.
+    """
+    version = version or registry.active
+    model, scaler, preprocessor = version.model, version.scaler, version.preprocessor
+    df = df.copy()
+    started = time.perf_counter()
+
+    # Clipping wartości skrajnych granicami z treningu (domenowe, potem IQR)
+    if preprocessor is not None:
+        for step in ("domain_clip", "outlier_clip"):
+            for col, (low, high) in preprocessor.get(step, {}).items():
+                if col in df.columns:
+                    df[col] = df[col].clip(lower=low, upper=high)
+
+    # Tworzenie binów z artefaktu (wspólne z treningiem) - skrajne przedziały otwarte
+    bins = preprocessor.get("bins", DEFAULT_BINS) if preprocessor is not None else DEFAULT_BINS
+    for name, spec in bins.items():
+        if spec["source"] in df.columns:
+            df[name] = assign_bins(df[spec["source"]].to_numpy(), spec)
+
+    # Skalowanie kolumn numerycznych
+    features_done = time.perf_counter()
+    num_cols_in_df = [c for c in version.feature_columns if c in df.columns]
+    df[num_cols_in_df] = scaler.transform(df[num_cols_in_df])
+    scaling_done = time.perf_counter()
+
+    # Usunięcie kolumny target jeśli istnieje (nie powinna)
+    if "loan_status" in df.columns:
+        df = df.drop(columns=["loan_status"])
+
+    # Upewnienie się, że mamy wszystkie cechy wymagane przez model
+    if hasattr(model, "feature_names_in_"):
+        # Brakujące kolumny uzupełniamy zerami (_row_id to identyfikator, nie cecha)
+        missing = set(model.feature_names_in_) - set(df.columns) - {"_row_id"}
+        for col in missing:
+            logger.warning(f"⚠️ Dodano brakującą cechę '{col}' z wartością domyślną 0")
+        df = df.reindex(columns=model.feature_names_in_, fill_value=0.0)
+
+    STAGE_SECONDS.observe("features", features_done - started + time.perf_counter() - scaling_done)
+    STAGE_SECONDS.observe("scaling", scaling_done - features_done)
+    return df
+
+
+def risk_levels(probabilities: np.ndarray) -> np.ndarray:
+    """Interpretacja ryzyka: niski / średni / wysoki (wektorowo)"""
+    return RISK_LABELS[np.searchsorted(RISK_THRESHOLDS, probabilities, side="right")]
+
+
+def score_features(X: "pd.DataFrame", version: Optional[ModelVersion] = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Jedno wywołanie modelu dla całej macierzy cech.
+
+    Zwraca (predykcje, prawdopodobieństwa klasy 1). Etykieta wyznaczana jest
+    z `predict_proba`, więc model nie jest wywoływany drugi raz przez `predict`.
+    """
+    version = version or registry.active
+    started = time.perf_counter()
+    with version.parallelism.select(len(X)) as model:
+        if hasattr(model, "predict_proba"):
+            proba = model.predict_proba(X)
+            predictions = model.classes_[np.argmax(proba, axis=1)].astype(int)
+            probabilities = proba[:, 1].astype(float)
+        else:
+            predictions = np.asarray(model.predict(X)).astype(int)
+            probabilities = predictions.astype(float)
+    STAGE_SECONDS.observe("model", time.perf_counter() - started)
+    return predictions, probabilities
+
+
+class FastPath:
+    """
+    Jednowierszowa ścieżka predykcji bez pandas.
+
+    Kolejność cech, granice clippingu i wektory scalera są wyliczane raz
+    przy wczytaniu modelu (w kolejności `model.feature_names_in_`), a każde
+    żądanie wypełnia tylko prealokowany wiersz NumPy i wywołuje model raz.
+    """
+
+    def __init__(self, model, names: list[str], fields: list[tuple[int, str]],
+                 clip_steps: list[tuple[np.ndarray, np.ndarray]],
+                 mean: np.ndarray, scale: np.ndarray,
+                 parallelism: Optional[InferenceParallelism] = None):
+        self.model = model
+        self.parallelism = parallelism
+        self.names = names
+        self.fields = fields
+        self.clip_steps = clip_steps
+        self.mean = mean
+        self.scale = scale
+        self._local = threading.local()
+
+    @classmethod
+    def build(cls, model, scaler, feature_columns, preprocessor,
+              parallelism: Optional[InferenceParallelism] = None) -> "FastPath | None":
+        """Przygotowanie wektorów; None gdy model wymaga cech spoza CreditInput"""
+        if not hasattr(model, "predict_proba"):
+            return None
+        if hasattr(model, "feature_names_in_"):
+            names = [str(c) for c in model.feature_names_in_]
+        else:
+            names = list(feature_columns)
+
+        n = len(names)
+        fields = []
+        for i, name in enumerate(names):
+            if name in CreditInput.model_fields:
+                if CreditInput.model_fields[name].annotation not in (int, float):
+                    return None
+                fields.append((i, name))
+            elif name != "_row_id":
+                # cecha spoza danych wejściowych (np. bin) - tylko ścieżka DataFrame
+                return None
+
+        clip_steps = []
+        for step in ("domain_clip", "outlier_clip"):
+            bounds = (preprocessor or {}).get(step, {})
+            low, high = np.full(n, -np.inf), np.full(n, np.inf)
+            for i, name in enumerate(names):
+                if name in bounds:
+                    low[i], high[i] = bounds[name]
+            clip_steps.append((low, high))
+
+        mean, scale = np.zeros(n), np.ones(n)
+        for j, col in enumerate(feature_columns):
+            if col in names:
+                mean[names.index(col)] = scaler.mean_[j]
+                scale[names.index(col)] = scaler.scale_[j]
+
+        return cls(model, names, fields, clip_steps, mean, scale, parallelism)
+
+    def _row(self) -> np.ndarray:
+        """Prealokowany wiersz (osobny dla każdego wątku puli FastAPI)"""
+        row = getattr(self._local, "row", None)
+        if row is None:
+            row = self._local.row = np.zeros((1, len(self.names)))
+        return row
+
+    def score(self, data: CreditInput) -> tuple[int, float]:
+        """Predykcja i prawdopodobieństwo klasy 1 dla jednego rekordu"""
+        started = time.perf_counter()
+        row = self._row()
+        values = row[0]
+        for i, name in self.fields:
+            values[i] = getattr(data, name)
+        for low, high in self.clip_steps:
+            np.clip(values, low, high, out=values)
+        features_done = time.perf_counter()
+        values -= self.mean
+        values /= self.scale
+        scaling_done = time.perf_counter()
+
+        proba = self.model.predict_proba(row)[0]
+        prediction = int(self.model.classes_[proba.argmax()])
+        model_done = time.perf_counter()
+
+        STAGE_SECONDS.observe("features", features_done - started)
+        STAGE_SECONDS.observe("scaling", scaling_done - features_done)
+        STAGE_SECONDS.observe("model", model_done - scaling_done)
+        return prediction, float(proba[1])
+
+    def features_many(self, records: list[CreditInput]) -> np.ndarray:
+        """Macierz cech (po clippingu i skalowaniu) w kolejności modelu"""
+        columns = {name: [getattr(record, name) for record in records] for _, name in self.fields}
+        return self.features_columns(columns, len(records))
+
+    def features_columns(self, columns: dict, n_rows: int) -> np.ndarray:
+        """Macierz cech z kolumn (nazwa pola CreditInput -> wartości)"""
+        started = time.perf_counter()
+        X = np.zeros((n_rows, len(self.names)))
+        for i, name in self.fields:
+            X[:, i] = columns[name]
+        for low, high in self.clip_steps:
+            np.clip(X, low, high, out=X)
+        features_done = time.perf_counter()
+        X -= self.mean
+        X /= self.scale
+        STAGE_SECONDS.observe("features", features_done - started)
+        STAGE_SECONDS.observe("scaling", time.perf_counter() - features_done)
+        return X
+
+    def labels(self, proba: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """(predykcje, prawdopodobieństwa klasy 1) z wyniku predict_proba"""
+        predictions = self.model.classes_[proba.argmax(axis=1)].astype(int)
+        return predictions, proba[:, 1].astype(float)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Wywołanie modelu z pomiarem etapu `model` (duże wsady na wielu wątkach)"""
+        started = time.perf_counter()
+        if self.parallelism is None:
+            proba = self.model.predict_proba(X)
+        else:
+            with self.parallelism.select(len(X)) as model:
+                proba = model.predict_proba(X)
+        STAGE_SECONDS.observe("model", time.perf_counter() - started)
+        return proba
+
+    def score_many(self, records: list[CreditInput]) -> tuple[np.ndarray, np.ndarray]:
+        """Predykcje i prawdopodobieństwa dla wielu rekordów jednym wywołaniem modelu"""
+        return self.labels(self.predict_proba(self.features_many(records)))
+
+
+def risk_level(probability: float) -> str:
+    """Interpretacja ryzyka dla pojedynczego prawdopodobieństwa"""
+    if probability < RISK_THRESHOLDS[0]:
+        return "niski"
+    elif probability < RISK_THRESHOLDS[1]:
+        return "średni"
+    return "wysoki"
+
+
+def predict_dataframe(data: CreditInput, version: Optional[ModelVersion] = None) -> tuple[int, float]:
+    """Ścieżka predykcji przez DataFrame (fallback dla modeli spoza FastPath)"""
+    import pandas as pd
+
+    df = prepare_features(pd.DataFrame([data.model_dump()]), version)
+    predictions, probabilities = score_features(df, version)
+    return int(predictions[0]), float(probabilities[0])
+
+
+def score_columns(columns: dict, n_rows: int,
+                  version: Optional[ModelVersion] = None) -> tuple[np.ndarray, np.ndarray]:
+    """Wektorowa predykcja dla zwalidowanych kolumn (FastPath albo ścieżka DataFrame)"""
+    version = version or registry.active
+    fast_path, pool = version.fast_path, version.pool
+    if fast_path is not None:
+        X = fast_path.features_columns(columns, n_rows)
+        if pool is not None:
+            started = time.perf_counter()
+            proba = pool.predict_proba(X)
+            STAGE_SECONDS.observe("model", time.perf_counter() - started)
+            return fast_path.labels(proba)
+        return fast_path.labels(fast_path.predict_proba(X))
+    import pandas as pd
+
+    return score_features(prepare_features(pd.DataFrame(columns), version), version)
+
+
+def score_records(records: list[CreditInput],
+                  version: Optional[ModelVersion] = None) -> tuple[np.ndarray, np.ndarray]:
+    """Wektorowa predykcja listy rekordów (FastPath albo ścieżka DataFrame)"""
+    columns = {name: [getattr(record, name) for record in records] for name in CreditInput.model_fields}
+    return score_columns(columns, len(records), version)
+
+
+def build_responses(predictions: np.ndarray, probabilities: np.ndarray) -> list[PredictionResponse]:
+    """Zamiana wyników modelu na obiekty PredictionResponse"""
+    levels = risk_levels(probabilities)
+    return [
+        PredictionResponse(prediction=int(p), probability=round(float(pr), 4), risk_level=str(r))
+        for p, pr, r in zip(predictions, probabilities, levels)
+    ]
+
+
+def predict_one(data: CreditInput, version: Optional[ModelVersion] = None) -> PredictionResponse:
+    """Predykcja pojedynczego rekordu (synchronicznie, w puli wątków)"""
+    version = version or registry.active
+    if version.fast_path is not None:
+        prediction, probability = version.fast_path.score(data)
+    else:
+        prediction, probability = predict_dataframe(data, version)
+    
+    return PredictionResponse(
+        prediction=prediction,
+        probability=round(probability, 4),
+        risk_level=risk_level(probability)
+    )
+
+
+def predict_micro_batch(
+    items: list[tuple[ModelVersion, CreditInput]],
+) -> tuple[list[PredictionResponse], dict]:
+    """
+    Funkcja oceniająca paczkę zebraną przez MicroBatcher.
+
+    Elementy to pary (wersja modelu, rekord) - paczka złożona w trakcie
+    przełączania wersji jest oceniana osobno dla każdej wersji. Zwraca też
+    czasy etapów paczki, dopisywane przez dyspozytora każdemu żądaniu.
+    """
+    responses = [None] * len(items)
+    groups = {}
+    for i, (version, _) in enumerate(items):
+        groups.setdefault(version, []).append(i)
+    with STAGE_SECONDS.shared() as stages:
+        for version, indices in groups.items():
+            scored = build_responses(*score_records([items[i][1] for i in indices], version))
+            for i, response in zip(indices, scored):
+                responses[i] = response
+    return responses, stages
+
+
+micro_batcher = (
+    MicroBatcher(
+        predict_micro_batch,
+        max_batch_size=MICRO_BATCH_MAX_SIZE,
+        max_wait_ms=MICRO_BATCH_WAIT_MS,
+        record_stages=STAGE_SECONDS.record,
+    )
+    if MICRO_BATCH_WAIT_MS > 0
+    else None
+)
+
+
+def acquire_version(pinned: Optional[str] = None) -> ModelVersion:
+    """
+    Wersja modelu do obsługi żądania: aktywna albo przypięta nagłówkiem.
+
+    Wymaga wywołania `release()` po zakończeniu obsługi żądania.
+    """
+    try:
+        return registry.acquire(pinned or None)
+    except KeyError:
+        if pinned:
+            raise HTTPException(status_code=404, detail=f"Nieznana wersja modelu: {pinned}")
+        raise HTTPException(status_code=503, detail="Model lub scaler nie zostały wczytane")
+
+
+def json_response(content, version: ModelVersion, status_code: int = 200) -> Response:
+    """
+    Odpowiedź JSON zakodowana szybkim serializerem (etap `serialization`).
+
+    Zwracana bezpośrednio z endpointu - FastAPI pomija wtedy walidację
+    `response_model` (model służy tylko dokumentacji OpenAPI).
+    """
+    started = time.perf_counter()
+    body = dumps(content)
+    STAGE_SECONDS.observe("serialization", time.perf_counter() - started)
+    return Response(
+        content=body,
+        status_code=status_code,
+        media_type=JSON_CONTENT_TYPE,
+        headers={MODEL_VERSION_HEADER: version.version},
+    )
+
+
 @app.post("/predict", response_model=PredictionResponse)
-def predict(data: CreditInput):
+async def predict(data: CreditInput, request: Request,
+                  model_version: Optional[str] = Header(None, alias=MODEL_VERSION_HEADER)):
     """
     Endpoint do predykcji ryzyka kredytowego.
     
     Przyjmuje surowe dane użytkownika, przetwarza je zgodnie z pipeline'm
-    preprocessingu i zwraca predykcję modelu.
+    preprocessingu i zwraca predykcję modelu. Przy włączonym mikro-batchingu
+    współbieżne żądania są oceniane wspólnym wywołaniem modelu.
+    Nagłówek `X-Model-Version` przypina żądanie do wersji z rejestru.
     """
-    if model is None or scaler is None:
-        raise HTTPException(status_code=503, detail="Model lub scaler nie zostały wczytane")
-    
+    observe_since_request_start(request.scope, "validation")
+    version = acquire_version(model_version)
     try:
-        # Tworzenie DataFrame z danymi wejściowymi
-        input_dict = data.model_dump()
-        
-        # Tworzenie binów (feature engineering)
-        input_dict["person_age_bin"] = create_age_bin(input_dict["person_age"])
-        input_dict["person_income_bin"] = create_income_bin(input_dict["person_income"])
-        
-        # DataFrame
-        df = pd.DataFrame([input_dict])
-        
-        # Skalowanie kolumn numerycznych
-        num_cols_in_df = [c for c in feature_columns if c in df.columns]
-        df[num_cols_in_df] = scaler.transform(df[num_cols_in_df])
-        
-        # Usunięcie kolumny target jeśli istnieje (nie powinna)
-        if "loan_status" in df.columns:
-            df = df.drop(columns=["loan_status"])
-        
-        # Upewnienie się, że mamy wszystkie cechy wymagane przez model
-        if hasattr(model, "feature_names_in_"):
-            # Dla modeli które pamiętają nazwy cech
-            missing = set(model.feature_names_in_) - set(df.columns)
-            
-            # Dodanie brakujących kolumn z wartościami domyślnymi
-            for col in missing:
-                if col == "_row_id":
-                    # _row_id to identyfikator wiersza, nie cecha - dodajemy dummy
-                    df[col] = 0
-                else:
-                    # Inne brakujące kolumny - ustawiamy na 0.0
-                    df[col] = 0.0
-                    print(f"⚠️ Dodano brakującą cechę '{col}' z wartością domyślną 0")
-            
-            df = df[model.feature_names_in_]
-        
-        # Predykcja
-        prediction = int(model.predict(df)[0])
-        
-        # Prawdopodobieństwo (jeśli model to obsługuje)
-        if hasattr(model, "predict_proba"):
-            probability = float(model.predict_proba(df)[0][1])
-        else:
-            probability = float(prediction)
-        
-        # Interpretacja ryzyka
-        if probability < 0.3:
-            risk_level = "niski"
-        elif probability < 0.7:
-            risk_level = "średni"
-        else:
-            risk_level = "wysoki"
-        
-        return PredictionResponse(
-            prediction=prediction,
-            probability=round(probability, 4),
-            risk_level=risk_level
+        cache_key = None
+        if prediction_cache.enabled:
+            cache_key = (version.version, prediction_cache.key(data))
+            cached = prediction_cache.get(cache_key)
+            if cached is not None:
+                return json_response(cached.model_dump(), version)
+
+        pool = version.pool
+        try:
+            if micro_batcher is not None:
+                result = await micro_batcher.submit((version, data))
+            elif pool is not None:
+                # proces API tylko buduje cechy, model liczy proces roboczy
+                X = version.fast_path.features_many([data])
+                started = time.perf_counter()
+                proba = await asyncio.wrap_future(pool.submit(X))
+                STAGE_SECONDS.observe("model", time.perf_counter() - started)
+                result = build_responses(*version.fast_path.labels(proba))[0]
+            else:
+                result = await run_in_threadpool(predict_one, data, version)
+
+        except PoolSaturated as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Błąd przetwarzania: {str(e)}")
+
+        if cache_key is not None:
+            prediction_cache.put(cache_key, result)
+        if shadow_scorer is not None:
+            shadow_scorer.submit([data], version.version, [result.probability])
+        return json_response(result.model_dump(), version)
+    finally:
+        version.release()
+
+
+@app.post("/predict/batch", response_model=list[PredictionResponse])
+def predict_batch(data: list[CreditInput], request: Request,
+                  model_version: Optional[str] = Header(None, alias=MODEL_VERSION_HEADER)):
+    """
+    Wsadowa predykcja ryzyka kredytowego.
+
+    Przygotowanie cech i wywołanie modelu wykonywane są raz dla całej
+    listy rekordów. Kolejność odpowiedzi odpowiada kolejności wejścia.
+    Odpowiedź jest kodowana bezpośrednio z tablic wyników (bez obiektów
+    PredictionResponse dla każdego wiersza).
+    """
+    observe_since_request_start(request.scope, "validation")
+    if len(data) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Za dużo rekordów w żądaniu: {len(data)} > {MAX_BATCH_SIZE}",
         )
-        
+
+    version = acquire_version(model_version)
+    try:
+        if len(data) == 0:
+            return json_response([], version)
+        predictions, probabilities = score_records(data, version)
+        if shadow_scorer is not None:
+            shadow_scorer.submit(data, version.version, probabilities)
+        return json_response(
+            prediction_rows(predictions, probabilities, risk_levels(probabilities)), version
+        )
+
+    except PoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Błąd przetwarzania: {str(e)}")
+    finally:
+        version.release()
+
+
+def score_valid_rows(columns: dict, errors: np.ndarray,
+                     version: Optional[ModelVersion] = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Predykcja wierszy bez błędu walidacji (jedno wywołanie modelu).
+
+    Zwraca (predykcje, prawdopodobieństwa) dla wszystkich wierszy: wiersze
+    z błędem mają -1 i NaN. Błąd modelu jest wpisywany do `errors`.
+    """
+    n_rows = len(errors)
+    predictions = np.full(n_rows, -1, dtype=np.int64)
+    probabilities = np.full(n_rows, np.nan)
+    valid = errors == ""
+    if valid.any():
+        try:
+            predictions[valid], probabilities[valid] = score_columns(
+                {name: values[valid] for name, values in columns.items()}, int(valid.sum()), version
+            )
+        except Exception as e:
+            errors[valid] = f"Błąd przetwarzania: {e}"
+    return predictions, probabilities
+
+
+def score_chunk(chunk: "pd.DataFrame", offset: int, version: Optional[ModelVersion] = None) -> bytes:
+    """
+    Walidacja i predykcja paczki wierszy ze strumienia.
+
+    Zwraca linie NDJSON: wynik predykcji albo opis błędu dla każdego wiersza
+    (numer wiersza liczony od 0 w całym strumieniu).
+    """
+    n_rows = len(chunk)
+    version = version or registry.active
+    started = time.perf_counter()
+    preprocessor = version.preprocessor
+    impute = preprocessor.get("impute") if preprocessor is not None else None
+    columns, errors = validate_columns(
+        {c: chunk[c].to_numpy() for c in chunk.columns}, n_rows, INPUT_SPECS, impute
+    )
+    STAGE_SECONDS.observe("validation", time.perf_counter() - started)
+    if "_error" in chunk.columns:
+        parse_errors = chunk["_error"].notna().to_numpy()
+        errors[parse_errors] = chunk["_error"].to_numpy()[parse_errors]
+
+    predictions, probabilities = score_valid_rows(columns, errors, version)
+    started = time.perf_counter()
+    rows = [None] * n_rows
+    scored = np.flatnonzero(errors == "")
+    results = prediction_rows(predictions[scored], probabilities[scored], risk_levels(probabilities[scored]))
+    for i, result in zip(scored.tolist(), results):
+        rows[i] = {"row": offset + i, **result}
+
+    for i in np.flatnonzero(errors != "").tolist():
+        rows[i] = {"row": offset + i, "error": str(errors[i])}
+    body = encode_ndjson(rows)
+    STAGE_SECONDS.observe("serialization", time.perf_counter() - started)
+    return body
+
+
+@app.post("/predict/stream")
+async def predict_stream(request: Request,
+                         model_version: Optional[str] = Header(None, alias=MODEL_VERSION_HEADER)):
+    """
+    Strumieniowa predykcja dla plików CSV lub NDJSON (np. wyciągi portfela).
+
+    Ciało żądania jest czytane przyrostowo w paczkach po STREAM_CHUNK_ROWS
+    wierszy, a wyniki są odsyłane jako NDJSON jeszcze w trakcie wczytywania.
+    Brakujące wartości są uzupełniane wartościami imputacji z preprocessingu.
+    Cały strumień jest oceniany jedną wersją modelu.
+    """
+    fmt = stream_format(request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Obsługiwane typy treści: {', '.join(STREAM_FORMATS)}",
+        )
+
+    version = acquire_version(model_version)
+
+    async def results():
+        offset = 0
+        try:
+            async for chunk in iter_record_chunks(request.stream(), fmt, STREAM_CHUNK_ROWS):
+                yield await run_in_threadpool(score_chunk, chunk, offset, version)
+                offset += len(chunk)
+        finally:
+            version.release()
+
+    return RequestStreamingResponse(
+        results(),
+        media_type="application/x-ndjson",
+        headers={MODEL_VERSION_HEADER: version.version},
+    )
+
+
+def score_npz(body: bytes, version: ModelVersion) -> bytes:
+    """
+    Predykcja paczki kolumnowej `.npz` (walidacja kolumnowa, bez pydantic per wiersz).
+
+    Odpowiedź: tablice `prediction` (-1 dla błędnych wierszy), `probability`
+    (NaN), `risk_level` i `error` (pusty napis dla poprawnych wierszy).
+    """
+    try:
+        columns, n_rows = read_npz(body, COLUMNAR_MAX_ROWS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    started = time.perf_counter()
+    columns, errors = validate_columns(columns, n_rows, INPUT_SPECS)
+    STAGE_SECONDS.observe("validation", time.perf_counter() - started)
+
+    predictions, probabilities = score_valid_rows(columns, errors, version)
+    levels = np.full(n_rows, "", dtype=object)
+    scored = errors == ""
+    levels[scored] = risk_levels(probabilities[scored])
+    return write_npz({
+        "prediction": predictions.astype(np.int8),
+        "probability": np.round(probabilities, 4),
+        "risk_level": levels.astype(str),
+        "error": errors.astype(str),
+    })
+
+
+@app.post("/predict/columnar")
+async def predict_columnar(request: Request,
+                           model_version: Optional[str] = Header(None, alias=MODEL_VERSION_HEADER)):
+    """
+    Wsadowa predykcja w binarnym formacie kolumnowym (paczka NumPy `.npz`).
+
+    Każde pole `CreditInput` to osobna tablica; zakresy i kategorie są
+    sprawdzane wektorowo dla całych kolumn. Wyniki wracają w tej samej
+    kolejności wierszy jako `.npz`.
+    """
+    content_type = (request.headers.get("content-type") or "").split(";")[0].strip().lower()
+    if content_type != NPZ_CONTENT_TYPE:
+        raise HTTPException(status_code=415, detail=f"Obsługiwany typ treści: {NPZ_CONTENT_TYPE}")
+
+    body = await request.body()
+    version = acquire_version(model_version)
+    try:
+        payload = await run_in_threadpool(score_npz, body, version)
+    finally:
+        version.release()
+    return Response(
+        payload,
+        media_type=NPZ_CONTENT_TYPE,
+        headers={MODEL_VERSION_HEADER: version.version},
+    )
+
+
+class FeatureReason(BaseModel):
+    """Wkład jednej cechy w decyzję modelu"""
+    feature: str = Field(..., description="Nazwa cechy modelu")
+    contribution: float = Field(..., description="Wkład cechy (dodatni - zwiększa ryzyko)")
+    value: Optional[float] = Field(None, description="Wartość wejściowa cechy (przed skalowaniem)")
+
+
+class ExplanationResponse(PredictionResponse):
+    """Predykcja wraz z najważniejszymi cechami (reason codes)"""
+    reasons: list[FeatureReason] = Field(..., description="Cechy o największym |wkładzie|, malejąco")
+
+
+def explain_records(records: list[CreditInput], version: ModelVersion,
+                    top_k: int = EXPLAIN_TOP_K) -> list[dict]:
+    """
+    Predykcje i top-k cech dla listy rekordów (słowniki w formacie ExplanationResponse).
+
+    Macierz cech budowana jest raz, a model i explainer wersji wywoływane są
+    po jednym razie dla wszystkich rekordów.
+    """
+    explainer = explainer_for(version)
+    fast_path = version.fast_path
+    if fast_path is not None:
+        X = fast_path.features_many(records)
+        predictions, probabilities = fast_path.labels(fast_path.predict_proba(X))
+    else:
+        import pandas as pd
+
+        df = prepare_features(pd.DataFrame([record.model_dump() for record in records]), version)
+        predictions, probabilities = score_features(df, version)
+        X = df.to_numpy(dtype=float)
+
+    started = time.perf_counter()
+    indices, contributions = explainer.top_k(X, top_k)
+    STAGE_SECONDS.observe("explain", time.perf_counter() - started)
+
+    names = explainer.feature_names.tolist()
+    numeric = {name for name, field in CreditInput.model_fields.items() if field.annotation in (int, float)}
+    rows = prediction_rows(predictions, probabilities, risk_levels(probabilities))
+    for record, row, row_indices, row_values in zip(
+        records, rows, indices.tolist(), contributions.tolist()
+    ):
+        row["reasons"] = [
+            {
+                "feature": names[i],
+                "contribution": round(value, 6),
+                "value": float(getattr(record, names[i])) if names[i] in numeric else None,
+            }
+            for i, value in zip(row_indices, row_values)
+        ]
+    return rows
+
+
+def run_explain(records: list[CreditInput], model_version: Optional[str],
+                top_k: int) -> tuple[list[dict], ModelVersion]:
+    """Obsługa /explain i /explain/batch na wersji aktywnej albo przypiętej"""
+    version = acquire_version(model_version)
+    try:
+        if len(records) == 0:
+            return [], version
+        return explain_records(records, version, top_k), version
+    except ExplainerUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Błąd przetwarzania: {str(e)}")
+    finally:
+        version.release()
+
+
+@app.post("/explain", response_model=ExplanationResponse)
+def explain(data: CreditInput, request: Request, response: Response,
+            top_k: int = Query(EXPLAIN_TOP_K, ge=1, le=50),
+            model_version: Optional[str] = Header(None, alias=MODEL_VERSION_HEADER)):
+    """
+    Predykcja z wyjaśnieniem (reason codes) dla jednego wniosku.
+
+    Zwraca `top_k` cech o największym bezwzględnym wkładzie w decyzję.
+    Explainer budowany jest raz dla wersji modelu (przy pierwszym wywołaniu).
+    """
+    observe_since_request_start(request.scope, "validation")
+    rows, version = run_explain([data], model_version, top_k)
+    response.headers[MODEL_VERSION_HEADER] = version.version
+    return rows[0]
+
+
+@app.post("/explain/batch", response_model=list[ExplanationResponse])
+def explain_batch(data: list[CreditInput], request: Request,
+                  top_k: int = Query(EXPLAIN_TOP_K, ge=1, le=50),
+                  model_version: Optional[str] = Header(None, alias=MODEL_VERSION_HEADER)):
+    """
+    Wsadowe wyjaśnienia: wkłady cech liczone jednym wywołaniem explainera.
+
+    Kolejność odpowiedzi odpowiada kolejności wejścia.
+    """
+    observe_since_request_start(request.scope, "validation")
+    if len(data) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Za dużo rekordów w żądaniu: {len(data)} > {MAX_BATCH_SIZE}",
+        )
+    return json_response(*run_explain(data, model_version, top_k))
+
+
+class ReloadRequest(BaseModel):
+    """Parametry przeładowania modelu (ścieżki względem katalogu projektu)"""
+    model_path: Optional[str] = Field(None, description="Plik modelu w data/, domyślnie MODEL_PATHS")
+    preprocessor_path: Optional[str] = Field(None, description="Artefakt preprocessingu w data/")
+    activate: bool = Field(True, description="Czy od razu przełączyć API na nową wersję")
+
+
+def require_admin(token: Optional[str]) -> None:
+    """Autoryzacja endpointów /admin/* tokenem z ADMIN_TOKEN (tylko przy jednym procesie API)"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Endpointy administracyjne są wyłączone (brak ADMIN_TOKEN)")
+    if not token or not secrets.compare_digest(token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Niepoprawny token administracyjny")
+    if WORKER_PROCESSES > 1:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Przełączanie wersji niedostępne przy {WORKER_PROCESSES} procesach API "
+                   "(trafiłoby do jednego workera) - nowy model wdraża się restartem serwera",
+        )
+
+
+def resolve_data_path(path: Optional[str]) -> Optional[Path]:
+    """Ścieżka do pliku w katalogu data/ - pliki spoza niego nie są wczytywane"""
+    if path is None:
+        return None
+    data_dir = (BASE_DIR / "data").resolve()
+    resolved = (BASE_DIR / path).resolve()
+    if not resolved.is_relative_to(data_dir):
+        raise HTTPException(status_code=400, detail=f"Ścieżka spoza katalogu data/: {path}")
+    if not resolved.is_file():
+        raise HTTPException(status_code=404, detail=f"Brak pliku: {path}")
+    return resolved
+
+
+def activate_registered(version_id: str) -> ModelVersion:
+    """Aktywacja wersji z rejestru (np. powrót do poprzedniej) po rozgrzaniu puli"""
+    with reload_lock:
+        version = registry.acquire(version_id)
+        try:
+            start_inference_pool(version)
+            return activate_version(version)
+        finally:
+            version.release()
+
+
+@app.post("/admin/reload")
+async def admin_reload(body: Optional[ReloadRequest] = None,
+                       admin_token: Optional[str] = Header(None, alias="X-Admin-Token")):
+    """
+    Hot reload modelu bez przestoju.
+
+    Nowa wersja jest wczytywana i rozgrzewana w tle, a następnie atomowo
+    przełączana. Żądania w toku kończą się na poprzedniej wersji.
+    """
+    require_admin(admin_token)
+    body = body or ReloadRequest()
+    model_path = resolve_data_path(body.model_path)
+    preprocessor_path = resolve_data_path(body.preprocessor_path)
+    try:
+        version = await run_in_threadpool(reload_model, model_path, preprocessor_path, body.activate)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Błąd wczytywania modelu: {str(e)}")
+    return {"active_version": registry.active.version, "loaded": version.info()}
+
+
+@app.post("/admin/activate/{version}")
+async def admin_activate(version: str,
+                         admin_token: Optional[str] = Header(None, alias="X-Admin-Token")):
+    """Przełączenie API na wersję z rejestru (np. powrót do poprzedniej)"""
+    require_admin(admin_token)
+    try:
+        activated = await run_in_threadpool(activate_registered, version)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Nieznana wersja modelu: {version}")
+    return {"active_version": activated.version, "versions": registry.stats()}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Metryki w formacie tekstowym Prometheusa"""
+    return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
 
 
 @app.get("/model-info")
 def model_info():
-    """Informacje o załadowanym modelu"""
-    if model is None:
+    """Informacje o załadowanym modelu (aktywna wersja i wersje w rejestrze)"""
+    active = registry.active
+    if active is None:
         return {"error": "Model nie został wczytany"}
+    model = active.model
     
     info = {
         "model_type": type(model).__name__,
-        "feature_columns": feature_columns if feature_columns else []
+        "model_version": active.version,
+        "feature_columns": active.feature_columns if active.feature_columns else [],
+        "preprocessor": active.preprocessor_path.name if active.preprocessor_path else None,
+        "versions": registry.stats(),
+        "cache": prediction_cache.stats(),
+        "micro_batching": micro_batcher.stats() if micro_batcher else {"enabled": False},
+        "inference_pool": active.pool.stats() if active.pool else {"enabled": False},
+        "inference_threads": active.parallelism.stats() if active.parallelism else None,
+        "shadow": shadow_scorer.stats() if shadow_scorer else {"enabled": False},
+        "admission": admission.stats(),
+        "tracing": trace_writer.stats(),
+        "readiness": readiness.info(),
+        "startup": {
+            "import_seconds": round(IMPORT_SECONDS.value(), 4),
+            "model_load_seconds": round(MODEL_LOAD_SECONDS.value("champion"), 4),
+        },
     }
     
     if hasattr(model, "feature_names_in_"):
@@ -288,3 +1503,7 @@ def model_info():
         info["n_features"] = model.n_features_in_
     
     return info
+
+
+# Czas importu modułu (bez wczytania modelu, które następuje w lifespan)
+IMPORT_SECONDS.set(time.perf_counter() - IMPORT_STARTED)
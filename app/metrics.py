@@ -0,0 +1,325 @@
+"""
+Metryki API w formacie tekstowym Prometheusa (endpoint /metrics).
+
+Liczniki, wskaźniki (gauge) i histogramy o stałych kubełkach są trzymane
+w prealokowanych listach - pomiar to wyszukanie kubełka (`bisect`) i kilka
+inkrementacji pod krótką blokadą, bez alokacji obiektów na żądanie.
+Zależność od `prometheus_client` nie jest potrzebna.
+"""
+
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Granice kubełków czasu (sekundy): od 0.1 ms (FastPath) do 10 s (duże paczki)
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Wspólna część metryk: nazwa, opis, etykiety i blokada"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        (REGISTRY if registry is None else registry).register(self)
+
+    def _key(self, labels) -> tuple:
+        if not self.labelnames:
+            return ()
+        return labels if isinstance(labels, tuple) else (labels,)
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        header = f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.kind}\n"
+        return header + "".join(line + "\n" for line in self.samples())
+
+
+class Counter(Metric):
+    """Licznik monotoniczny (np. liczba żądań per ścieżka i status)"""
+
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values = {}
+
+    def inc(self, labels=(), amount: float = 1) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, labels=()) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    """Wartość chwilowa (żądania w toku, czas wczytania modelu)"""
+
+    kind = "gauge"
+
+    def dec(self, labels=(), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+    def set(self, value: float, labels=()) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    """
+    Histogram o stałych granicach kubełków.
+
+    Liczniki kubełków są przechowywane niekumulatywnie w prealokowanej
+    liście i sumowane dopiero przy renderowaniu.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: tuple = LATENCY_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._muted = threading.local()
+
+    def mute_current_thread(self) -> None:
+        """Pomiary z bieżącego wątku są pomijane (np. wątek oceny w tle)"""
+        self._muted.active = True
+
+    def _get_series(self, key: tuple) -> list:
+        series = self._series.get(key)
+        if series is None:
+            # [liczniki kubełków (+Inf na końcu), suma, liczba pomiarów]
+            series = self._series.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0, 0])
+        return series
+
+    def observe(self, labels, value: float) -> None:
+        if getattr(self._muted, "active", False):
+            return
+        series = self._get_series(self._key(labels))
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, labels=()) -> int:
+        series = self._series.get(self._key(labels))
+        return series[2] if series is not None else 0
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted((key, ([*s[0]], s[1], s[2])) for key, s in self._series.items())
+        lines = []
+        for key, (counts, total, n) in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {n}")
+        return lines
+
+
+# Czasy etapów bieżącego żądania (słownik etap -> sekundy) ustawiany przez
+# TracingMiddleware; kontekst jest kopiowany do puli wątków FastAPI, więc
+# pomiary z endpointów synchronicznych trafiają do tego samego słownika
+REQUEST_STAGES = contextvars.ContextVar("request_stages", default=None)
+
+# Etapy mierzone wspólnie dla kilku żądań (paczka mikro-batchingu w wątku
+# puli, bez kontekstu żądania) - zbierane tu i dopisywane każdemu żądaniu
+SHARED_STAGES = contextvars.ContextVar("shared_stages", default=None)
+
+
+class StageHistogram(Histogram):
+    """Histogram etapów predykcji sumujący też etapy bieżącego żądania (Server-Timing)"""
+
+    def observe(self, labels, value: float) -> None:
+        if getattr(self._muted, "active", False):
+            return
+        shared = SHARED_STAGES.get()
+        if shared is not None:
+            shared[labels] = shared.get(labels, 0.0) + value
+            return
+        super().observe(labels, value)
+        stages = REQUEST_STAGES.get()
+        if stages is not None:
+            stages[labels] = stages.get(labels, 0.0) + value
+
+    @contextmanager
+    def shared(self):
+        """Etapy z bloku trafiają tylko do zwracanego słownika (do `record` w żądaniach)"""
+        stages = {}
+        token = SHARED_STAGES.set(stages)
+        try:
+            yield stages
+        finally:
+            SHARED_STAGES.reset(token)
+
+    def record(self, stages: dict) -> None:
+        """Etapy zmierzone wspólnie (`shared`) jako pomiary bieżącego żądania"""
+        for stage, seconds in stages.items():
+            self.observe(stage, seconds)
+
+
+class Registry:
+    """Zbiór metryk renderowany razem przez /metrics"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric: Metric) -> None:
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        return "".join(metric.render() for metric in self._metrics)
+
+
+REGISTRY = Registry()
+
+REQUESTS = Counter(
+    "credit_api_requests_total", "Liczba obsłużonych żądań HTTP", ("path", "status")
+)
+ERRORS = Counter(
+    "credit_api_request_errors_total", "Liczba żądań zakończonych błędem (status >= 400)",
+    ("path", "status"),
+)
+REQUEST_SECONDS = Histogram(
+    "credit_api_request_duration_seconds", "Czas obsługi żądania HTTP", ("path",)
+)
+STAGE_SECONDS = StageHistogram(
+    "credit_api_stage_duration_seconds",
+    "Czas etapów predykcji: validation, features, scaling, model, explain, serialization",
+    ("stage",),
+)
+IN_FLIGHT = Gauge(
+    "credit_api_requests_in_flight", "Liczba żądań w trakcie obsługi", ("path",)
+)
+SHADOW_RECORDS = Counter(
+    "credit_api_shadow_records_total",
+    "Rekordy oceny w cieniu (challenger): scored, dropped, failed",
+    ("result",),
+)
+IMPORT_SECONDS = Gauge(
+    "credit_api_import_seconds", "Czas importu modułów API (bez wczytania modelu)"
+)
+MODEL_LOAD_SECONDS = Gauge(
+    "credit_api_model_load_seconds",
+    "Czas ostatniego wczytania modelu i artefaktu preprocessingu: champion, challenger",
+    ("role",),
+)
+WARMUP_SINGLE_P99_SECONDS = Gauge(
+    "credit_api_warmup_single_p99_seconds", "p99 pojedynczej predykcji w ostatniej rozgrzewce"
+)
+WARMUP_OVER_BUDGET = Gauge(
+    "credit_api_warmup_over_budget",
+    "1, gdy opóźnienie po rozgrzewce przekroczyło WARMUP_LATENCY_BUDGET_MS, inaczej 0",
+)
+ADMISSION_ACTIVE = Gauge(
+    "credit_api_admission_active", "Żądania oceny przyjęte przez kontrolę przyjmowania"
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "credit_api_admission_queue_depth", "Żądania oceny czekające w kolejce przyjęć"
+)
+ADMISSION_REJECTED = Counter(
+    "credit_api_admission_rejected_total",
+    "Żądania odrzucone odpowiedzią 429: queue_full, timeout",
+    ("reason",),
+)
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI zliczające żądania, błędy, czas obsługi i żądania w toku.
+
+    Zapisuje w `scope["state"]["request_start"]` moment przyjęcia żądania, aby
+    endpoint mógł zmierzyć etap `validation` (odczyt ciała i walidacja pydantic
+    wykonywane przez FastAPI przed wywołaniem funkcji endpointu).
+    Nieznane ścieżki trafiają pod etykietę "other" (ograniczona kardynalność).
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._paths = None
+
+    def _label(self, scope) -> str:
+        if self._paths is None:
+            self._paths = {getattr(route, "path", None) for route in scope["app"].routes}
+        path = scope["path"]
+        return path if path in self._paths else "other"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        scope.setdefault("state", {})["request_start"] = start
+        path = self._label(scope)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc(path)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            IN_FLIGHT.dec(path)
+            REQUESTS.inc((path, status))
+            if status >= 400:
+                ERRORS.inc((path, status))
+            REQUEST_SECONDS.observe(path, time.perf_counter() - start)
+
+
+def observe_since_request_start(scope, stage: str) -> None:
+    """Pomiar etapu od przyjęcia żądania przez middleware do teraz"""
+    start = scope.get("state", {}).get("request_start")
+    if start is not None:
+        STAGE_SECONDS.observe(stage, time.perf_counter() - start)
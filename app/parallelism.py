@@ -0,0 +1,75 @@
+"""
+Równoległość inferencji modeli zespołowych (n_jobs) w procesie API.
+
+Modele z treningu (`RandomForestClassifier(n_jobs=-1)`) zapisują `n_jobs`
+w pliku modelu, więc każde `predict_proba` - także dla jednego wiersza -
+uruchamiałoby wątki joblib na wszystkich rdzeniach, podczas gdy pula wątków
+FastAPI obsługuje równolegle wiele żądań. Wynik: nadsubskrypcja rdzeni
+i narzut tworzenia wątków większy od samej predykcji.
+
+Model aktywny w API liczy więc szeregowo (`n_jobs=1`), a tylko wsady od
+`min_rows` wierszy używają płytkiej kopii modelu z `n_jobs=threads` (drzewa
+i tablice są współdzielone, kopia zmienia wyłącznie `n_jobs`). Jednocześnie
+równolegle liczy najwyżej jeden wsad - kolejne duże wsady liczą szeregowo,
+zamiast mnożyć wątki.
+"""
+
+import copy
+import threading
+from contextlib import contextmanager
+
+
+def serial_model(model):
+    """Wyłączenie wątków joblib w modelu (w miejscu); zwraca ten sam model"""
+    if hasattr(model, "n_jobs"):
+        model.n_jobs = 1
+    return model
+
+
+def parallel_copy(model, threads: int):
+    """Płytka kopia modelu z `n_jobs=threads` albo None, gdy model nie ma `n_jobs`"""
+    if not hasattr(model, "n_jobs"):
+        return None
+    parallel = copy.copy(model)
+    parallel.n_jobs = threads
+    return parallel
+
+
+class InferenceParallelism:
+    """Wybór modelu szeregowego albo równoległego według liczby wierszy"""
+
+    def __init__(self, model, threads: int = -1, min_rows: int = 0):
+        self.threads = int(threads)
+        self.min_rows = max(int(min_rows), 0)
+        # n_jobs z pliku modelu (przed wyłączeniem) - do informacji w /model-info
+        self.trained_n_jobs = getattr(model, "n_jobs", None)
+        self.serial = serial_model(model)
+        self.parallel = None
+        if self.min_rows > 0 and self.threads not in (0, 1):
+            self.parallel = parallel_copy(model, self.threads)
+        self.serial_calls = 0
+        self.parallel_calls = 0
+        self._slot = threading.Lock()
+
+    @contextmanager
+    def select(self, n_rows: int):
+        """Model do wywołania dla `n_rows` wierszy (równoległy tylko dla dużych wsadów)"""
+        if self.parallel is not None and n_rows >= self.min_rows and self._slot.acquire(blocking=False):
+            self.parallel_calls += 1
+            try:
+                yield self.parallel
+            finally:
+                self._slot.release()
+            return
+        self.serial_calls += 1
+        yield self.serial
+
+    def stats(self) -> dict:
+        return {
+            "trained_n_jobs": self.trained_n_jobs,
+            "parallel_enabled": self.parallel is not None,
+            "threads": self.threads,
+            "min_rows": self.min_rows,
+            "serial_calls": self.serial_calls,
+            "parallel_calls": self.parallel_calls,
+        }
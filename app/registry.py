@@ -0,0 +1,139 @@
+"""
+Rejestr wersji modelu API (hot reload bez przestojów).
+
+`ModelVersion` to komplet wczytany razem: model, artefakt preprocessingu,
+scaler, szybka ścieżka i opcjonalna pula procesów. Wersją jest odcisk treści
+plików (`model_version` w /model-info), więc ponowne wczytanie tych samych plików nie tworzy
+nowej wersji. Żądanie pobiera wersję raz (`acquire`) i kończy się na niej
+nawet wtedy, gdy w międzyczasie aktywowano inną.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class ModelVersion:
+    """Jedna wczytana wersja modelu wraz z licznikiem żądań w toku"""
+
+    def __init__(self, version: str, model, scaler, feature_columns, preprocessor,
+                 model_path, preprocessor_path=None, fast_path=None, parallelism=None):
+        self.version = version
+        self.model = model
+        self.scaler = scaler
+        self.feature_columns = feature_columns
+        self.preprocessor = preprocessor
+        self.model_path = model_path
+        self.preprocessor_path = preprocessor_path
+        self.fast_path = fast_path
+        # wybór modelu szeregowego / równoległego (app/parallelism.py)
+        self.parallelism = parallelism
+        self.pool = None
+        # explainer reason codes (app/explain.py) - budowany przy pierwszym /explain
+        self.explainer = None
+        self.loaded_at = time.time()
+        self.in_flight = 0
+        self._idle = threading.Condition()
+
+    def release(self) -> None:
+        with self._idle:
+            self.in_flight -= 1
+            if self.in_flight == 0:
+                self._idle.notify_all()
+
+    def drain(self, timeout: float | None = None) -> bool:
+        """Czeka, aż zakończą się żądania obsługiwane tą wersją"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self.in_flight == 0, timeout)
+
+    def retire_pool(self, timeout: float | None = None) -> None:
+        """Odłącza pulę procesów i zamyka ją po zakończeniu żądań w toku"""
+        pool, self.pool = self.pool, None
+        if pool is not None:
+            self.drain(timeout)
+            pool.shutdown()
+
+    def info(self) -> dict:
+        return {
+            "version": self.version,
+            "model_type": type(self.model).__name__,
+            "model_path": self.model_path.name if self.model_path else None,
+            "preprocessor": self.preprocessor_path.name if self.preprocessor_path else None,
+            "loaded_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.loaded_at)),
+            "fast_path": self.fast_path is not None,
+            "inference_pool": self.pool is not None,
+            "explainer": self.explainer.kind if self.explainer is not None else None,
+            "in_flight": self.in_flight,
+        }
+
+
+class ModelRegistry:
+    """
+    Wczytane wersje modelu i atomowo przełączana wersja aktywna.
+
+    Przechowuje do `max_versions` wersji (aktywna nigdy nie jest usuwana),
+    aby można było przypiąć żądanie do wersji albo szybko wrócić do poprzedniej.
+    """
+
+    def __init__(self, max_versions: int = 3):
+        self.max_versions = max(int(max_versions), 1)
+        self.active = None
+        self._versions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, version: str) -> bool:
+        return version in self._versions
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._versions.values()))
+
+    def add(self, version: ModelVersion) -> tuple[ModelVersion, list[ModelVersion]]:
+        """
+        Rejestruje wersję; zwraca (wersja w rejestrze, wersje usunięte z rejestru).
+
+        Jeśli wersja o tym samym identyfikatorze już istnieje, zwracana jest istniejąca.
+        """
+        with self._lock:
+            existing = self._versions.get(version.version)
+            if existing is not None:
+                return existing, []
+            self._versions[version.version] = version
+            evicted = []
+            for key in list(self._versions):
+                if len(self._versions) <= self.max_versions:
+                    break
+                if self._versions[key] is not self.active and key != version.version:
+                    evicted.append(self._versions.pop(key))
+            return version, evicted
+
+    def activate(self, version: str) -> ModelVersion | None:
+        """Przełącza wersję aktywną; zwraca poprzednią aktywną"""
+        with self._lock:
+            if version not in self._versions:
+                raise KeyError(version)
+            previous, self.active = self.active, self._versions[version]
+            return previous
+
+    def acquire(self, version: str | None = None) -> ModelVersion:
+        """
+        Wersja do obsługi żądania (aktywna albo przypięta) z licznikiem w toku.
+
+        Po zakończeniu żądania należy wywołać `release()` na zwróconej wersji.
+        KeyError - nieznana wersja albo brak wczytanego modelu.
+        """
+        with self._lock:
+            selected = self.active if version is None else self._versions.get(version)
+            if selected is None:
+                raise KeyError(version)
+            with selected._idle:
+                selected.in_flight += 1
+            return selected
+
+    def stats(self) -> list[dict]:
+        with self._lock:
+            versions = list(self._versions.values())
+            active = self.active
+        return [{**v.info(), "active": v is active} for v in versions]
@@ -0,0 +1,46 @@
+"""
+Szybka serializacja JSON dużych odpowiedzi (wsady, strumienie).
+
+Wyniki są budowane bezpośrednio z tablic NumPy jako listy słowników i kodowane
+jednym wywołaniem `orjson.dumps` - bez obiektu pydantic i walidacji
+`response_model` dla każdego wiersza. Bez `orjson` kodowanie wykonuje
+standardowy moduł `json` (ten sam wynik, wolniej).
+"""
+
+import json
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # opcjonalna zależność - fallback na json
+    orjson = None
+
+JSON_CONTENT_TYPE = "application/json"
+
+
+def dumps(obj) -> bytes:
+    """JSON jako bajty UTF-8 (orjson albo json)"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def prediction_rows(predictions: np.ndarray, probabilities: np.ndarray,
+                    levels: np.ndarray) -> list[dict]:
+    """Słowniki w formacie PredictionResponse (prawdopodobieństwo zaokrąglone do 4 miejsc)"""
+    return [
+        {"prediction": p, "probability": round(pr, 4), "risk_level": r}
+        for p, pr, r in zip(
+            np.asarray(predictions).astype(int).tolist(),
+            np.asarray(probabilities, dtype=float).tolist(),
+            np.asarray(levels).tolist(),
+        )
+    ]
+
+
+def encode_ndjson(rows: list[dict]) -> bytes:
+    """Linie NDJSON (każda zakończona znakiem nowej linii)"""
+    if not rows:
+        return b""
+    return b"\n".join(dumps(row) for row in rows) + b"\n"
@@ -0,0 +1,143 @@
+"""
+Serwer pre-fork: model wczytany raz w procesie nadrzędnym, współdzielony przez workery.
+
+`uvicorn --workers N` uruchamia N niezależnych procesów (spawn) i każdy
+z nich osobno importuje API i wczytuje model do prywatnej pamięci. Tutaj
+proces nadrzędny importuje `app.main`, wczytuje i rozgrzewa aktywną wersję
+modelu, zamraża obiekty przed GC (`gc.freeze`) i dopiero wtedy tworzy
+workery przez `fork()`. Strony z modelem są współdzielone copy-on-write -
+workery tylko je czytają, więc nie są kopiowane. Workery nasłuchują na
+wspólnym gnieździe otwartym przez proces nadrzędny.
+
+Proces nadrzędny nie obsługuje żądań: pilnuje workerów (restart po awarii)
+i przekazuje im SIGTERM / SIGINT. Przy kilku workerach `/admin/reload`
+i `/admin/activate` zwracają 409 - żądanie trafiłoby tylko do jednego
+workera i workery odpowiadałyby różnymi wersjami. Nowy model wdraża się
+restartem serwera (proces nadrzędny wczytuje go przed fork).
+
+Uruchomienie (Linux / macOS):
+    python -m app.serve --workers 4 --port 8000
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+
+from app import logger
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Credit Scoring API - serwer pre-fork")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "1")),
+                        help="Liczba workerów (domyślnie WEB_CONCURRENCY albo 1)")
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    return parser.parse_args(argv)
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    """Gniazdo nasłuchujące współdzielone przez wszystkie workery"""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def preload(workers: int = 1) -> None:
+    """Import API i wczytanie modelu w procesie nadrzędnym (przed fork)"""
+    import app.main as api
+
+    # dziedziczone przez workery - wyłącza /admin/* przy kilku procesach
+    api.WORKER_PROCESSES = workers
+    version = api.load_model_and_scaler()
+    # rozgrzanie: pierwsza predykcja dotyka stron modelu i leniwie tworzonych struktur
+    example = api.CreditInput(**api.CreditInput.model_json_schema()["examples"][0])
+    api.predict_one(example, version)
+    logger.info(f"✅ Model wczytany w procesie nadrzędnym (pid {os.getpid()}): {version.version}")
+
+
+def run_worker(sock: socket.socket, args: argparse.Namespace) -> None:
+    """Pętla uvicorn w procesie potomnym na odziedziczonym gnieździe"""
+    import uvicorn
+
+    import app.main as api
+
+    # nadrzędny proces obsługiwał sygnały po swojemu - uvicorn instaluje własne
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    config = uvicorn.Config(api.app, log_level=args.log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def spawn(sock: socket.socket, args: argparse.Namespace) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            run_worker(sock, args)
+        except BaseException:
+            code = 1
+            traceback.print_exc()
+        finally:
+            os._exit(code)
+    return pid
+
+
+def main(argv=None) -> None:
+    if not hasattr(os, "fork"):
+        sys.exit("Tryb pre-fork wymaga os.fork() (Linux / macOS) - użyj uvicorn app.main:app")
+
+    args = parse_args(argv)
+    started = time.perf_counter()
+    preload(max(args.workers, 1))
+    sock = bind_socket(args.host, args.port)
+
+    # obiekty wczytane dotąd trafiają do generacji stałej - przebiegi GC w workerach
+    # nie zapisują ich nagłówków, więc strony modelu pozostają współdzielone
+    gc.collect()
+    gc.freeze()
+
+    workers = {spawn(sock, args) for _ in range(max(args.workers, 1))}
+    logger.info(f"✅ Uruchomiono {len(workers)} workerów w {time.perf_counter() - started:.2f} s "
+                f"(http://{args.host}:{args.port})")
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        workers.discard(pid)
+        if not stopping:
+            logger.warning(f"⚠️ Worker {pid} zakończył się (status {status}) - uruchamianie nowego")
+            time.sleep(1)
+            workers.add(spawn(sock, args))
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
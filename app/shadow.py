@@ -0,0 +1,120 @@
+"""
+Ocena w cieniu (champion / challenger) na ruchu produkcyjnym.
+
+Endpoint zwraca od razu wynik championa, a rekord trafia do ograniczonej
+kolejki. Wątek w tle zbiera rekordy w paczki, ocenia je challengerem jednym
+wywołaniem modelu i dopisuje oba prawdopodobieństwa do lokalnego pliku NDJSON.
+Wstawienie do kolejki nigdy nie czeka - przy pełnej kolejce rekord jest
+pomijany (licznik `dropped`), więc ocena w cieniu nie wydłuża żądań.
+"""
+
+from __future__ import annotations
+
+import json
+import queue
+import threading
+import time
+from pathlib import Path
+
+from app import logger
+from app.metrics import SHADOW_RECORDS, STAGE_SECONDS
+
+_STOP = object()
+
+
+class ShadowScorer:
+    """Wątek oceniający rekordy challengerem i zapisujący porównanie do logu"""
+
+    def __init__(self, score_fn, log_path, challenger: str, queue_size: int = 10_000,
+                 max_batch_size: int = 256):
+        self.score_fn = score_fn
+        self.log_path = Path(log_path)
+        self.challenger = challenger
+        self.max_batch_size = max(int(max_batch_size), 1)
+        self.scored = 0
+        self.dropped = 0
+        self.failed = 0
+        self._queue = queue.Queue(maxsize=max(int(queue_size), 1))
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name="shadow-scorer", daemon=True)
+            self._thread.start()
+
+    def submit(self, records: list, champion: str, probabilities) -> None:
+        """Zleca ocenę rekordów challengerem (bez czekania; nadmiar jest pomijany)"""
+        now = time.time()
+        for record, probability in zip(records, probabilities):
+            try:
+                self._queue.put_nowait((now, record, champion, float(probability)))
+            except queue.Full:
+                self.dropped += 1
+                SHADOW_RECORDS.inc("dropped")
+
+    def stop(self, timeout: float | None = 10.0) -> None:
+        """Dokończenie rekordów z kolejki i zatrzymanie wątku"""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        # czasy etapów challengera nie trafiają do histogramów championa
+        STAGE_SECONDS.mute_current_thread()
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            while len(batch) < self.max_batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._process(batch)
+                    return
+                batch.append(item)
+            self._process(batch)
+
+    def _process(self, batch: list) -> None:
+        try:
+            probabilities = self.score_fn([record for _, record, _, _ in batch])
+        except Exception as e:
+            self.failed += len(batch)
+            SHADOW_RECORDS.inc("failed", len(batch))
+            logger.warning(f"⚠️ Ocena w cieniu nie powiodła się: {e}")
+            return
+
+        lines = [
+            json.dumps({
+                "ts": round(ts, 3),
+                "champion": champion,
+                "challenger": self.challenger,
+                "champion_probability": round(champion_probability, 4),
+                "challenger_probability": round(float(probability), 4),
+            })
+            for (ts, _, champion, champion_probability), probability in zip(batch, probabilities)
+        ]
+        # plik tylko dopisywany (append-only) - jedna linia JSON na rekord
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        self.scored += len(batch)
+        SHADOW_RECORDS.inc("scored", len(batch))
+
+    def stats(self) -> dict:
+        return {
+            "enabled": True,
+            "challenger": self.challenger,
+            "log_path": self.log_path.name,
+            "queued": self._queue.qsize(),
+            "scored": self.scored,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
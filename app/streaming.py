@@ -0,0 +1,143 @@
+"""
+Parsowanie strumienia CSV / NDJSON w paczkach o stałej liczbie wierszy.
+
+Dane są czytane przyrostowo z ciała żądania, więc pamięć zależy od
+rozmiaru paczki, a nie od rozmiaru przesyłanego pliku. Parsowanie paczki
+(`pd.read_csv`, `json.loads`) odbywa się w puli wątków - pętla zdarzeń
+obsługuje w tym czasie inne żądania.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from typing import TYPE_CHECKING
+
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Obsługiwane typy treści -> format
+STREAM_FORMATS = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/json-lines": "ndjson",
+}
+
+
+def stream_format(content_type: str | None) -> str | None:
+    """Format strumienia na podstawie nagłówka Content-Type (None = nieobsługiwany)"""
+    if not content_type:
+        return None
+    return STREAM_FORMATS.get(content_type.split(";")[0].strip().lower())
+
+
+def _csv_line_error(line: bytes, n_fields: int) -> str | None:
+    """Opis błędu pojedynczej linii CSV (None = linia poprawna)"""
+    try:
+        fields = next(csv.reader([line.decode("utf-8", errors="replace")], strict=True))
+    except csv.Error as e:
+        return f"niepoprawna linia CSV: {e}"
+    if len(fields) != n_fields:
+        return f"niepoprawna linia CSV: oczekiwano {n_fields} pól, jest {len(fields)}"
+    return None
+
+
+def _parse_csv(lines: list[bytes], header: bytes) -> "pd.DataFrame":
+    """
+    Paczka linii CSV -> DataFrame.
+
+    Gdy paczka nie daje się sparsować, linie są sprawdzane pojedynczo: błędne
+    dostają opis w kolumnie `_error`, a pozostałe są parsowane razem.
+    """
+    import pandas as pd
+
+    try:
+        return pd.read_csv(io.BytesIO(b"\n".join([header, *lines])))
+    except pd.errors.ParserError as e:
+        chunk_error = f"niepoprawna paczka CSV: {e}"
+
+    n_fields = len(next(csv.reader([header.decode("utf-8", errors="replace")])))
+    errors = [_csv_line_error(line, n_fields) for line in lines]
+    good = [i for i, error in enumerate(errors) if error is None]
+    try:
+        frame = pd.read_csv(io.BytesIO(b"\n".join([header, *(lines[i] for i in good)])))
+        frame.index = good
+        frame = frame.reindex(range(len(lines)))
+    except pd.errors.ParserError:
+        # błędu nie da się przypisać do linii - opis trafia do każdego wiersza paczki
+        frame = pd.DataFrame(index=range(len(lines)))
+        errors = [chunk_error] * len(lines)
+    frame["_error"] = errors
+    return frame
+
+
+def _parse(lines: list[bytes], fmt: str, header: bytes | None) -> "pd.DataFrame":
+    """Paczka linii -> DataFrame; niepoprawne linie mają opis w kolumnie `_error`"""
+    import pandas as pd
+
+    if fmt == "csv":
+        return _parse_csv(lines, header)
+
+    records = []
+    for line in lines:
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("oczekiwano obiektu JSON")
+        except ValueError as e:
+            record = {"_error": f"niepoprawna linia NDJSON: {e}"}
+        records.append(record)
+    return pd.DataFrame.from_records(records)
+
+
+async def iter_record_chunks(stream, fmt: str, chunk_rows: int):
+    """Asynchroniczny generator DataFrame'ów po maksymalnie `chunk_rows` wierszy (parsowanych w puli wątków)"""
+    buffer = b""
+    header = None
+    lines: list[bytes] = []
+
+    async for piece in stream:
+        buffer += piece
+        *complete, buffer = buffer.split(b"\n")
+        for raw_line in complete:
+            line = raw_line.rstrip(b"\r")
+            if not line.strip():
+                continue
+            if fmt == "csv" and header is None:
+                header = line
+                continue
+            lines.append(line)
+            if len(lines) >= chunk_rows:
+                yield await run_in_threadpool(_parse, lines, fmt, header)
+                lines = []
+
+    tail = buffer.rstrip(b"\r")
+    if tail.strip():
+        if fmt == "csv" and header is None:
+            header = tail
+        else:
+            lines.append(tail)
+    if lines:
+        yield await run_in_threadpool(_parse, lines, fmt, header)
+
+
+class RequestStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse, której generator sam czyta ciało żądania.
+
+    Domyślna implementacja (ASGI < 2.4) równolegle nasłuchuje na `receive()`
+    w oczekiwaniu na rozłączenie klienta i przechwytuje przy tym kolejne
+    fragmenty ciała. Tutaj `receive()` wywołuje tylko `request.stream()`,
+    który sam zgłasza `ClientDisconnect`, gdy klient się rozłączy.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
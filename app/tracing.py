@@ -0,0 +1,191 @@
+"""
+Czasy etapów i identyfikator żądania w odpowiedziach endpointów oceny.
+
+Każda odpowiedź endpointu oceny dostaje nagłówki:
+
+- `X-Request-ID` - identyfikator przekazany przez klienta albo nowy (uuid4),
+- `Server-Timing` - czasy etapów żądania w ms (validation, features, scaling,
+  model, explain, serialization) oraz `total` od przyjęcia żądania do wysłania
+  nagłówków odpowiedzi.
+
+Etapy są sumowane przez `STAGE_SECONDS` do słownika bieżącego żądania
+(`REQUEST_STAGES`). Próbka żądań (`sample_rate`) trafia do rotowanego pliku
+NDJSON - jedna płaska linia na żądanie, do wczytania przez
+`pandas.read_json(path, lines=True)`. Zapis odbywa się w wątku w tle, a przy
+pełnej kolejce ślad jest pomijany, więc nie wydłuża żądań.
+
+Odpowiedzi strumieniowe wysyłają nagłówki przed oceną pierwszej paczki, więc
+ich `Server-Timing` obejmuje tylko etapy sprzed startu odpowiedzi; pełne
+czasy trafiają do pliku śladów.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import random
+import re
+import time
+import uuid
+from logging.handlers import QueueListener, RotatingFileHandler
+from pathlib import Path
+
+from app.metrics import REQUEST_STAGES
+
+REQUEST_ID_HEADER = "X-Request-ID"
+# Kolejność etapów w nagłówku i w pliku śladów
+STAGE_ORDER = ("validation", "features", "scaling", "model", "explain", "serialization")
+# Identyfikator od klienta przyjmujemy tylko w bezpiecznej postaci (bez wstrzykiwania nagłówków)
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+
+def request_id_from(headers) -> str:
+    """Identyfikator z nagłówka X-Request-ID (surowe nagłówki ASGI) albo nowy"""
+    for name, value in headers:
+        if name == b"x-request-id":
+            candidate = value.decode("latin-1")
+            if _REQUEST_ID_PATTERN.match(candidate):
+                return candidate
+            break
+    return uuid.uuid4().hex
+
+
+def ordered_stages(stages: dict) -> list[tuple[str, float]]:
+    """Etapy w stałej kolejności; nieznane etapy na końcu"""
+    known = [(name, stages[name]) for name in STAGE_ORDER if name in stages]
+    return known + sorted((k, v) for k, v in stages.items() if k not in STAGE_ORDER)
+
+
+def server_timing(stages: dict, total: float | None = None) -> str:
+    """Wartość nagłówka Server-Timing (czasy w sekundach -> `dur` w ms)"""
+    parts = [f"{name};dur={seconds * 1000:.3f}" for name, seconds in ordered_stages(stages)]
+    if total is not None:
+        parts.append(f"total;dur={total * 1000:.3f}")
+    return ", ".join(parts)
+
+
+class TraceWriter:
+    """Próbkowany zapis czasów żądań do rotowanego pliku NDJSON (wątek w tle)"""
+
+    def __init__(self, log_path, sample_rate: float = 0.0, max_bytes: int = 10_000_000,
+                 backups: int = 5, queue_size: int = 10_000):
+        self.log_path = Path(log_path)
+        self.sample_rate = min(max(float(sample_rate), 0.0), 1.0)
+        self.max_bytes = max(int(max_bytes), 0)
+        self.backups = max(int(backups), 0)
+        self.written = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max(int(queue_size), 1))
+        self._listener = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    def sampled(self) -> bool:
+        return self.enabled and random.random() < self.sample_rate
+
+    def start(self) -> None:
+        if self._listener is None and self.enabled:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(
+                self.log_path, maxBytes=self.max_bytes, backupCount=self.backups,
+                encoding="utf-8", delay=True,
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._listener = QueueListener(self._queue, handler)
+            self._listener.start()
+
+    def stop(self) -> None:
+        """Zapis śladów z kolejki i zamknięcie pliku"""
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+
+    def write(self, trace: dict) -> None:
+        """Dodaje ślad do kolejki zapisu (bez czekania; nadmiar jest pomijany)"""
+        try:
+            self._queue.put_nowait(logging.makeLogRecord({"msg": json.dumps(trace)}))
+        except queue.Full:
+            self.dropped += 1
+            return
+        self.written += 1
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "log_path": self.log_path.name,
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+        }
+
+
+class TracingMiddleware:
+    """
+    Middleware ASGI dodające X-Request-ID i Server-Timing do wybranych ścieżek.
+
+    Ustawia `REQUEST_STAGES` na słownik bieżącego żądania - kontekst jest
+    kopiowany do puli wątków, więc etapy mierzone w endpointach synchronicznych
+    trafiają do tego samego słownika. Identyfikator żądania jest dostępny
+    w `scope["state"]["request_id"]`, a `request_start` jest przesuwany na
+    moment przyjęcia żądania przez kontrolę przyjmowania.
+    """
+
+    def __init__(self, app, paths, writer: TraceWriter | None = None):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.writer = writer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        request_id = request_id_from(scope.get("headers", ()))
+        state = scope.setdefault("state", {})
+        state["request_id"] = request_id
+        # etap `validation` liczony od przyjęcia żądania, bez oczekiwania w kolejce
+        state["request_start"] = start
+        stages = {}
+        token = REQUEST_STAGES.set(stages)
+        status = 500
+        model_version = None
+
+        async def send_with_timing(message):
+            nonlocal status, model_version
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", ()))
+                for name, value in headers:
+                    if name.lower() == b"x-model-version":
+                        model_version = value.decode("latin-1")
+                headers.append((b"x-request-id", request_id.encode("latin-1")))
+                timing = server_timing(stages, time.perf_counter() - start)
+                headers.append((b"server-timing", timing.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            REQUEST_STAGES.reset(token)
+            writer = self.writer
+            if writer is not None and writer.sampled():
+                trace = {
+                    "ts": round(time.time(), 3),
+                    "request_id": request_id,
+                    "path": scope["path"],
+                    "status": status,
+                    "model_version": model_version,
+                    "total_ms": round((time.perf_counter() - start) * 1000, 3),
+                }
+                for name in STAGE_ORDER:
+                    seconds = stages.get(name)
+                    trace[f"{name}_ms"] = round(seconds * 1000, 3) if seconds is not None else None
+                writer.write(trace)
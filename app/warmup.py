@@ -0,0 +1,113 @@
+"""
+Rozgrzewka API i gotowość do przyjmowania ruchu (/ready).
+
+Pierwsze predykcje po starcie są wolniejsze: struktury drzew, bufory NumPy
+i leniwie tworzone obiekty powstają dopiero przy pierwszym użyciu. Rozgrzewka
+wykonuje syntetyczne predykcje pojedyncze i wsadowe z zakresów pól
+`CreditInput`, mierzy opóźnienie rozgrzanej ścieżki i dopiero wtedy zgłasza
+gotowość - o ile opóźnienie mieści się w budżecie. Stan `over_budget` nie jest
+gotowością; pomiar jest wtedy ponawiany, aż opóźnienie zmieści się w budżecie.
+
+Pomiary rozgrzewki wykonywane są w osobnym wątku z wyciszonym histogramem
+etapów, więc nie zniekształcają metryk ruchu produkcyjnego.
+"""
+
+from __future__ import annotations
+
+import random
+import statistics
+import threading
+import time
+
+from app.metrics import STAGE_SECONDS
+
+# Górne granice losowania pól bez ograniczenia `le` w CreditInput
+UNBOUNDED_MAX = {
+    "person_income": 300_000.0,
+    "person_emp_length": 40.0,
+    "loan_amnt": 35_000.0,
+    "cb_person_cred_hist_length": 30.0,
+}
+
+
+def synthetic_record(specs: dict[str, dict], rng: random.Random) -> dict:
+    """Losowy rekord zgodny z ograniczeniami pól (`columnar.field_specs`)"""
+    record = {}
+    for name, spec in specs.items():
+        if spec["kind"] == "category":
+            record[name] = rng.choice(spec["choices"])
+            continue
+        low = spec["ge"] if spec["ge"] is not None else 0.0
+        high = spec["le"] if spec["le"] is not None else UNBOUNDED_MAX.get(name, 100.0)
+        if spec["kind"] == "int":
+            record[name] = rng.randint(int(low), int(high))
+        else:
+            record[name] = round(rng.uniform(low, high), 2)
+    return record
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def measure_warmup(score_one, score_batch, records: list, batch_size: int) -> dict:
+    """
+    Predykcje pojedyncze (każdy rekord) i jedna wsadowa; zwraca opóźnienia w ms.
+
+    Wykonywane w nowym wątku z wyciszonym `STAGE_SECONDS`.
+    """
+    result = {}
+
+    def run():
+        STAGE_SECONDS.mute_current_thread()
+        try:
+            single = []
+            for record in records:
+                started = time.perf_counter()
+                score_one(record)
+                single.append((time.perf_counter() - started) * 1000)
+            started = time.perf_counter()
+            score_batch((records * (batch_size // max(len(records), 1) + 1))[:batch_size])
+            batch_ms = (time.perf_counter() - started) * 1000
+            result.update(
+                single_p50_ms=round(statistics.median(single), 3),
+                single_p99_ms=round(_percentile(single, 0.99), 3),
+                batch_size=batch_size,
+                batch_ms=round(batch_ms, 3),
+            )
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+
+    thread = threading.Thread(target=run, name="warmup", daemon=True)
+    thread.start()
+    thread.join()
+    return result
+
+
+class Readiness:
+    """
+    Stan gotowości API: starting -> warming -> ready / over_budget / failed.
+
+    Gotowość tylko w stanie `ready`; z `over_budget` można do niego przejść
+    po ponownym pomiarze w budżecie.
+    """
+
+    def __init__(self):
+        self.state = "starting"
+        self.report = {}
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def set(self, state: str, report: dict | None = None) -> None:
+        with self._lock:
+            self.state = state
+            if report is not None:
+                self.report = report
+
+    def info(self) -> dict:
+        with self._lock:
+            return {"status": self.state, "warmup": dict(self.report)}
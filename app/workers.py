@@ -0,0 +1,107 @@
+"""
+Pula procesów do inferencji modelu.
+
+Każdy proces roboczy wczytuje model raz (initializer), a proces główny
+przesyła do niego tylko gotowe macierze cech (NumPy). Dzięki temu walidacja
+i routing żądań w procesie API nie konkurują o GIL z obliczeniami modelu.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import threading
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from app.artifacts import load_model_file
+
+# Model wczytany w procesie roboczym
+_worker_model = None
+
+
+def _init_worker(model_path: str) -> None:
+    """Initializer procesu roboczego - jednorazowe wczytanie modelu"""
+    global _worker_model
+    warnings.filterwarnings("ignore")
+    _worker_model = load_model_file(model_path)
+    # równoległość zapewnia pula procesów - bez dodatkowych wątków joblib
+    if hasattr(_worker_model, "n_jobs"):
+        _worker_model.n_jobs = 1
+
+
+def _predict_proba(X: np.ndarray) -> np.ndarray:
+    return _worker_model.predict_proba(X)
+
+
+class PoolSaturated(RuntimeError):
+    """Kolejka puli procesów jest pełna"""
+
+
+class InferencePool:
+    """ProcessPoolExecutor z ograniczoną liczbą zadań w toku"""
+
+    def __init__(self, model_path, workers: int, queue_depth: int | None = None,
+                 start_method: str = "spawn"):
+        self.model_path = str(model_path)
+        self.workers = max(int(workers), 1)
+        self.queue_depth = int(queue_depth) if queue_depth else 4 * self.workers
+        self.pending = 0
+        self.rejected = 0
+        self.completed = 0
+        self._lock = threading.Lock()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=_init_worker,
+            initargs=(self.model_path,),
+        )
+
+    def warm_up(self, n_features: int) -> None:
+        """Uruchomienie wszystkich procesów i wczytanie w nich modelu"""
+        X = np.zeros((1, n_features))
+        futures = [self._executor.submit(_predict_proba, X) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def submit(self, X: np.ndarray):
+        """Zleca predict_proba; zwraca concurrent.futures.Future"""
+        with self._lock:
+            if self.pending >= self.queue_depth:
+                self.rejected += 1
+                raise PoolSaturated(
+                    f"Kolejka inferencji pełna ({self.pending}/{self.queue_depth})"
+                )
+            self.pending += 1
+        try:
+            future = self._executor.submit(_predict_proba, X)
+        except Exception:
+            with self._lock:
+                self.pending -= 1
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Wersja blokująca (dla wywołań z puli wątków)"""
+        return self.submit(X).result()
+
+    def _done(self, _future) -> None:
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": True,
+                "workers": self.workers,
+                "queue_depth": self.queue_depth,
+                "pending": self.pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
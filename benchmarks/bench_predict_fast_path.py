@@ -0,0 +1,68 @@
+"""
+Mikro-benchmark pojedynczej predykcji: FastPath (NumPy) vs ścieżka DataFrame.
+
+Wywołuje funkcje z app/main.py bezpośrednio (bez HTTP), żeby zmierzyć
+sam koszt przygotowania cech i wywołania modelu.
+
+Uruchomienie: python benchmarks/bench_predict_fast_path.py --iterations 2000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import main  # noqa: E402
+
+
+def measure(fn, data, iterations: int) -> np.ndarray:
+    """Czasy pojedynczych wywołań w mikrosekundach"""
+    timings = np.empty(iterations)
+    for i in range(iterations):
+        start = time.perf_counter_ns()
+        fn(data)
+        timings[i] = (time.perf_counter_ns() - start) / 1000
+    return timings
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200)
+    args = parser.parse_args()
+
+    main.load_model_and_scaler()
+    if main.fast_path is None:
+        sys.exit("Załadowany model nie obsługuje FastPath")
+
+    example = main.CreditInput.model_json_schema()["examples"][0]
+    data = main.CreditInput(**example)
+
+    # Obie ścieżki muszą dawać ten sam wynik
+    assert main.fast_path.score(data) == main.predict_dataframe(data)
+
+    paths = {
+        "dataframe": main.predict_dataframe,
+        "fast_path": main.fast_path.score,
+    }
+    for fn in paths.values():
+        measure(fn, data, args.warmup)
+
+    results = {name: measure(fn, data, args.iterations) for name, fn in paths.items()}
+
+    print(f"\nModel: {type(main.model).__name__}, iteracje: {args.iterations}")
+    print(f"{'ścieżka':<12} {'p50 [µs]':>10} {'p99 [µs]':>10}")
+    for name, timings in results.items():
+        p50, p99 = np.percentile(timings, [50, 99])
+        print(f"{name:<12} {p50:>10.1f} {p99:>10.1f}")
+
+    speedup = np.median(results["dataframe"]) / np.median(results["fast_path"])
+    print(f"\nPrzyspieszenie p50: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main_cli()
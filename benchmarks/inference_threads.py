@@ -0,0 +1,147 @@
+"""
+Przepustowość inferencji przy współbieżnych żądaniach: n_jobs z treningu vs n_jobs=1.
+
+Wczytuje model API (jak `load_model_version`) i wywołuje `predict_proba`
+bezpośrednio (bez HTTP) z wielu wątków naraz - tak jak pula wątków FastAPI
+przy równoległych żądaniach /predict:
+
+- "przed" - model z `n_jobs` zapisanym przy treningu (domyślnie -1, każde
+  wywołanie uruchamia wątki joblib na wszystkich rdzeniach),
+- "po" - model szeregowy (`n_jobs=1`), jak w API po `InferenceParallelism`.
+
+Dodatkowo mierzy czas jednego dużego wsadu liczonego szeregowo i na wielu
+wątkach (wariant równoległy API dla wsadów od PARALLEL_INFERENCE_MIN_ROWS).
+
+Uruchomienie:
+    python benchmarks/inference_threads.py --concurrency 1,8,32 --seconds 5
+"""
+
+import argparse
+import copy
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app import main  # noqa: E402
+from app.artifacts import load_model_file  # noqa: E402
+
+DEFAULT_OUTPUT = ROOT / "benchmarks" / "results" / "inference_threads.json"
+
+
+def with_n_jobs(model, n_jobs: int):
+    variant = copy.copy(model)
+    variant.n_jobs = n_jobs
+    return variant
+
+
+def throughput(model, rows: np.ndarray, concurrency: int, seconds: float) -> dict:
+    """Pojedyncze predykcje z `concurrency` wątków przez `seconds` sekund"""
+    stop = threading.Event()
+    counts = [0] * concurrency
+    latencies = [[] for _ in range(concurrency)]
+
+    def run(worker: int):
+        i = worker
+        while not stop.is_set():
+            started = time.perf_counter()
+            model.predict_proba(rows[i % len(rows)][None, :])
+            latencies[worker].append(time.perf_counter() - started)
+            counts[worker] += 1
+            i += concurrency
+
+    threads = [threading.Thread(target=run, args=(w,)) for w in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    all_latencies = np.concatenate([np.asarray(thread_latencies) for thread_latencies in latencies]) * 1000
+    p50, p99 = np.percentile(all_latencies, [50, 99])
+    return {
+        "concurrency": concurrency,
+        "requests_per_second": round(sum(counts) / elapsed, 1),
+        "p50_ms": round(float(p50), 3),
+        "p99_ms": round(float(p99), 3),
+    }
+
+
+def batch_seconds(model, X: np.ndarray, repeats: int) -> float:
+    """Najlepszy z `repeats` czasów jednego wywołania dla całego wsadu"""
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        model.predict_proba(X)
+        best = min(best, time.perf_counter() - started)
+    return round(best, 4)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", default="1,8,32", help="Liczby wątków, np. 1,8,32")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Czas pomiaru dla każdej konfiguracji")
+    parser.add_argument("--trained-n-jobs", type=int, default=None,
+                        help="n_jobs modelu 'przed' (domyślnie wartość z pliku modelu albo -1)")
+    parser.add_argument("--batch-rows", type=int, default=main.PARALLEL_INFERENCE_MIN_ROWS * 4)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    model = load_model_file(main.find_model_path())
+    if not hasattr(model, "n_jobs"):
+        sys.exit(f"Model {type(model).__name__} nie ma n_jobs - brak wątków joblib do porównania")
+    trained_n_jobs = args.trained_n_jobs
+    if trained_n_jobs is None:
+        trained_n_jobs = model.n_jobs if model.n_jobs not in (None, 1) else -1
+
+    n_features = int(getattr(model, "n_features_in_", len(getattr(model, "feature_names_in_", []))))
+    rng = np.random.default_rng(0)
+    rows = rng.standard_normal((1024, n_features))
+    X = rng.standard_normal((args.batch_rows, n_features))
+
+    variants = {"before": with_n_jobs(model, trained_n_jobs), "after": with_n_jobs(model, 1)}
+    for variant in variants.values():
+        variant.predict_proba(rows[:1])
+
+    levels = [int(c) for c in args.concurrency.split(",")]
+    results = {
+        "model": type(model).__name__,
+        "trained_n_jobs": trained_n_jobs,
+        "single_row": {
+            name: [throughput(variant, rows, c, args.seconds) for c in levels]
+            for name, variant in variants.items()
+        },
+        "large_batch": {
+            "rows": args.batch_rows,
+            "serial_seconds": batch_seconds(variants["after"], X, 3),
+            "parallel_seconds": batch_seconds(
+                with_n_jobs(model, main.PARALLEL_INFERENCE_THREADS), X, 3
+            ),
+        },
+    }
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    print(f"\nModel: {results['model']}, n_jobs przed: {trained_n_jobs}, po: 1")
+    print(f"{'wątki':>6} {'przed [req/s]':>14} {'po [req/s]':>11} {'p99 przed':>10} {'p99 po':>8}")
+    for before, after in zip(results["single_row"]["before"], results["single_row"]["after"]):
+        print(f"{before['concurrency']:>6} {before['requests_per_second']:>14.1f} "
+              f"{after['requests_per_second']:>11.1f} {before['p99_ms']:>8.2f}ms {after['p99_ms']:>6.2f}ms")
+    batch = results["large_batch"]
+    print(f"\nWsad {batch['rows']} wierszy: szeregowo {batch['serial_seconds']:.3f} s, "
+          f"równolegle {batch['parallel_seconds']:.3f} s")
+    print(f"Wyniki zapisane w {args.output}")
+
+
+if __name__ == "__main__":
+    main_cli()
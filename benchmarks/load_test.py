@@ -0,0 +1,253 @@
+"""
+Test obciążeniowy API: przepustowość i opóźnienia p50 / p95 / p99 przez HTTP.
+
+Uruchamia lokalnie `app.main:app` w uvicorn (albo używa `--url`), wysyła
+żądania z zadaną współbieżnością i mieszanką endpointów, zapisuje wyniki
+do pliku JSON i porównuje je z zapisanym wynikiem bazowym. Dane wejściowe
+są losowane z zakresów i kategorii `CreditInput` - test działa offline.
+
+Uruchomienie:
+    python benchmarks/load_test.py --concurrency 16 --duration 30 --mix predict=8,batch=2
+    python benchmarks/load_test.py --save-baseline     # zapis nowego wyniku bazowego
+
+Kod wyjścia 1 - regresja względem wyniku bazowego (p99 lub req/s poza tolerancją).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.columnar import NPZ_CONTENT_TYPE, field_specs, write_npz  # noqa: E402
+from app.main import CreditInput  # noqa: E402
+from app.warmup import synthetic_record  # noqa: E402
+
+DEFAULT_OUTPUT = ROOT / "benchmarks" / "results" / "load_test.json"
+DEFAULT_BASELINE = ROOT / "benchmarks" / "load_test_baseline.json"
+
+# Scenariusz -> ścieżka (POST); batch i columnar wysyłają --batch-size rekordów
+SCENARIOS = {
+    "predict": "/predict",
+    "batch": "/predict/batch",
+    "columnar": "/predict/columnar",
+}
+
+
+class PayloadGenerator:
+    """Losowe rekordy zgodne z ograniczeniami pól CreditInput"""
+
+    def __init__(self, seed: int = 0):
+        self.specs = field_specs(CreditInput)
+        self.rng = random.Random(seed)
+
+    def record(self) -> dict:
+        return synthetic_record(self.specs, self.rng)
+
+    def request(self, scenario: str, batch_size: int) -> dict:
+        """Argumenty `httpx.AsyncClient.post` dla scenariusza"""
+        if scenario == "predict":
+            return {"json": self.record()}
+        records = [self.record() for _ in range(batch_size)]
+        if scenario == "batch":
+            return {"json": records}
+        columns = {name: np.array([r[name] for r in records]) for name in self.specs}
+        return {"content": write_npz(columns), "headers": {"content-type": NPZ_CONTENT_TYPE}}
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    """'predict=8,batch=2' -> udziały scenariuszy"""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise SystemExit(f"Nieznany scenariusz: {name} (dostępne: {', '.join(SCENARIOS)})")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int, workers: int) -> subprocess.Popen:
+    """Uruchomienie uvicorn z app.main:app w osobnym procesie"""
+    command = [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers), "--log-level", "warning",
+    ]
+    return subprocess.Popen(command, cwd=ROOT, env=os.environ.copy())
+
+
+def wait_ready(url: str, server: subprocess.Popen | None, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server is not None and server.poll() is not None:
+            raise SystemExit(f"Serwer zakończył się z kodem {server.returncode}")
+        try:
+            if httpx.get(f"{url}/ready", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit(f"Serwer nie odpowiada po {timeout:.0f} s")
+
+
+async def run_load(url: str, weights: dict[str, float], concurrency: int, duration: float,
+                   warmup: float, batch_size: int, seed: int) -> dict:
+    """Pętle klientów wysyłające żądania; zwraca czasy i błędy per scenariusz"""
+    names, probs = list(weights), list(weights.values())
+    timings = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0) as client:
+        loop = asyncio.get_running_loop()
+        measure_from = loop.time() + warmup
+        stop_at = measure_from + duration
+
+        async def worker(worker_id: int):
+            generator = PayloadGenerator(seed + worker_id)
+            rng = random.Random(seed + worker_id)
+            while loop.time() < stop_at:
+                scenario = rng.choices(names, probs)[0]
+                request = generator.request(scenario, batch_size)
+                started = time.perf_counter()
+                try:
+                    response = await client.post(SCENARIOS[scenario], **request)
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                elapsed = time.perf_counter() - started
+                if loop.time() < measure_from:
+                    continue
+                if ok:
+                    timings[scenario].append(elapsed)
+                else:
+                    errors[scenario] += 1
+
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+
+    return {"timings": timings, "errors": errors}
+
+
+def summarize(timings: list[float], errors: int, duration: float) -> dict:
+    """Liczba żądań, req/s i percentyle opóźnień w milisekundach"""
+    summary = {"requests": len(timings), "errors": errors, "rps": round(len(timings) / duration, 1)}
+    if timings:
+        p50, p95, p99 = np.percentile(np.asarray(timings) * 1000, [50, 95, 99])
+        summary.update(p50_ms=round(p50, 3), p95_ms=round(p95, 3), p99_ms=round(p99, 3))
+    return summary
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Regresje względem wyniku bazowego: wzrost p99 lub spadek req/s o więcej niż `tolerance`"""
+    regressions = []
+    for name, base in baseline.get("scenarios", {}).items():
+        current = results["scenarios"].get(name)
+        if current is None:
+            continue
+        if "p99_ms" in base and current.get("p99_ms", float("inf")) > base["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p99 {current.get('p99_ms')} ms > {base['p99_ms']} ms")
+        if current["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: {current['rps']} req/s < {base['rps']} req/s")
+        if current["errors"] > base.get("errors", 0):
+            regressions.append(f"{name}: błędy {current['errors']} > {base.get('errors', 0)}")
+    return regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="Adres działającego API (domyślnie uruchamiany lokalnie)")
+    parser.add_argument("--server-workers", type=int, default=1, help="Liczba procesów uvicorn")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0, help="Czas pomiaru (s)")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Rozgrzewka bez pomiaru (s)")
+    parser.add_argument("--mix", default="predict=8,batch=2", help="Udziały scenariuszy")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Dopuszczalne pogorszenie względem wyniku bazowego (0.2 = 20%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="Zapisz wynik jako bazowy")
+    args = parser.parse_args()
+
+    weights = parse_mix(args.mix)
+    server = None
+    url = args.url
+    if url is None:
+        port = free_port()
+        url = f"http://127.0.0.1:{port}"
+        server = start_server(port, args.server_workers)
+    try:
+        wait_ready(url, server)
+        raw = asyncio.run(run_load(
+            url, weights, args.concurrency, args.duration, args.warmup, args.batch_size, args.seed
+        ))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    all_timings = [t for timings in raw["timings"].values() for t in timings]
+    results = {
+        "config": {
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "mix": weights,
+            "batch_size": args.batch_size,
+            "server_workers": args.server_workers if server is not None else None,
+        },
+        "scenarios": {
+            name: summarize(raw["timings"][name], raw["errors"][name], args.duration)
+            for name in weights
+        },
+        "total": summarize(all_timings, sum(raw["errors"].values()), args.duration),
+    }
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    print(f"\n{'scenariusz':<10} {'req/s':>9} {'p50 [ms]':>10} {'p95 [ms]':>10} {'p99 [ms]':>10} {'błędy':>7}")
+    for name, s in {**results["scenarios"], "total": results["total"]}.items():
+        print(f"{name:<10} {s['rps']:>9.1f} {s.get('p50_ms', 0):>10.2f} "
+              f"{s.get('p95_ms', 0):>10.2f} {s.get('p99_ms', 0):>10.2f} {s['errors']:>7}")
+    print(f"\nWyniki zapisane w {args.output}")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"Wynik bazowy zapisany w {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"Brak wyniku bazowego ({args.baseline.name}) - porównanie pominięte")
+        return
+    regressions = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+    if regressions:
+        print("\n❌ Regresja względem wyniku bazowego:")
+        for line in regressions:
+            print(f"  - {line}")
+        sys.exit(1)
+    print("\n✅ Brak regresji względem wyniku bazowego")
+
+
+if __name__ == "__main__":
+    main_cli()
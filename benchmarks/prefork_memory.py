@@ -0,0 +1,152 @@
+"""
+Pamięć i czas startu: `uvicorn --workers N` kontra serwer pre-fork (`app/serve.py`).
+
+Dla każdego trybu uruchamia serwer z N workerami, czeka, aż wszystkie workery
+zgłoszą gotowość ("Application startup complete"), wysyła kilka żądań /predict
+i odczytuje pamięć procesów z `/proc/<pid>/smaps_rollup`:
+
+- RSS - strony zmapowane w procesie (współdzielone liczone w każdym procesie),
+- PSS - strony współdzielone podzielone przez liczbę procesów (suma PSS to
+  rzeczywiste zużycie całego serwera),
+- USS - strony prywatne procesu (ile pamięci zwolni zakończenie workera).
+
+Uruchomienie (tylko Linux):
+    python benchmarks/prefork_memory.py --workers 4
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_OUTPUT = ROOT / "benchmarks" / "results" / "prefork_memory.json"
+READY_LINE = "Application startup complete"
+
+EXAMPLE = {
+    "person_age": 25, "person_income": 50000, "person_home_ownership": "RENT",
+    "person_emp_length": 3.0, "loan_intent": "PERSONAL", "loan_grade": "B",
+    "loan_amnt": 10000, "loan_int_rate": 10.5, "loan_percent_income": 0.2,
+    "cb_person_default_on_file": "N", "cb_person_cred_hist_length": 4,
+}
+
+
+def server_command(mode: str, port: int, workers: int) -> list[str]:
+    if mode == "prefork":
+        return [sys.executable, "-m", "app.serve", "--host", "127.0.0.1",
+                "--port", str(port), "--workers", str(workers)]
+    return [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+            "--port", str(port), "--workers", str(workers)]
+
+
+def children(pid: int) -> list[int]:
+    """Bezpośredni potomkowie procesu (z /proc/*/stat)"""
+    result = []
+    for entry in Path("/proc").iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+            cmdline = (entry / "cmdline").read_bytes()
+        except OSError:
+            continue
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        if ppid == pid and b"resource_tracker" not in cmdline:
+            result.append(int(entry.name))
+    return sorted(result)
+
+
+def memory(pid: int) -> dict:
+    """RSS / PSS / USS procesu w MB"""
+    fields = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]:
+        name, value = line.split(":", 1)
+        fields[name] = int(value.split()[0]) / 1024
+    return {
+        "pid": pid,
+        "rss_mb": round(fields["Rss"], 1),
+        "pss_mb": round(fields["Pss"], 1),
+        "uss_mb": round(fields["Private_Clean"] + fields["Private_Dirty"], 1),
+    }
+
+
+def measure(mode: str, port: int, workers: int, requests: int, timeout: float) -> dict:
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        server_command(mode, port, workers), cwd=ROOT,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    ready = threading.Semaphore(0)
+
+    def read_logs():
+        for line in server.stderr:
+            if READY_LINE in line:
+                ready.release()
+
+    threading.Thread(target=read_logs, daemon=True).start()
+    try:
+        for _ in range(workers):
+            if not ready.acquire(timeout=max(timeout - (time.perf_counter() - started), 0)):
+                raise SystemExit(f"{mode}: workery nie wystartowały w {timeout:.0f} s")
+        startup_seconds = time.perf_counter() - started
+
+        body = json.dumps(EXAMPLE).encode()
+        for _ in range(requests):
+            request = urllib.request.Request(
+                f"http://127.0.0.1:{port}/predict", data=body,
+                headers={"Content-Type": "application/json"},
+            )
+            urllib.request.urlopen(request, timeout=10).read()
+
+        parent = memory(server.pid)
+        worker_stats = [memory(pid) for pid in children(server.pid)]
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    total_pss = parent["pss_mb"] + sum(w["pss_mb"] for w in worker_stats)
+    return {
+        "mode": mode,
+        "workers": len(worker_stats),
+        "startup_seconds": round(startup_seconds, 3),
+        "parent": parent,
+        "worker_processes": worker_stats,
+        "mean_worker_rss_mb": round(sum(w["rss_mb"] for w in worker_stats) / len(worker_stats), 1),
+        "mean_worker_uss_mb": round(sum(w["uss_mb"] for w in worker_stats) / len(worker_stats), 1),
+        "total_pss_mb": round(total_pss, 1),
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--requests", type=int, default=50, help="Żądania /predict przed pomiarem")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Limit czasu startu (s)")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    if not Path("/proc/self/smaps_rollup").exists():
+        sys.exit("Pomiar wymaga /proc/<pid>/smaps_rollup (Linux)")
+
+    results = [
+        measure(mode, args.port, args.workers, args.requests, args.timeout)
+        for mode in ("uvicorn", "prefork")
+    ]
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    print(f"\n{'tryb':<10}{'start [s]':>11}{'RSS/worker':>12}{'USS/worker':>12}{'PSS razem':>11}")
+    for r in results:
+        print(f"{r['mode']:<10}{r['startup_seconds']:>11.2f}{r['mean_worker_rss_mb']:>10.1f}MB"
+              f"{r['mean_worker_uss_mb']:>10.1f}MB{r['total_pss_mb']:>9.1f}MB")
+    print(f"\nWyniki zapisane w {args.output}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,120 @@
+"""
+Szczytowa pamięć cleaningu: cała ramka (`fit_clean_data`) vs dwa przebiegi po paczkach.
+
+Zbiór `credit_risk_dataset.csv` jest powielany N razy do pliku tymczasowego,
+a następnie czyszczony:
+
+- "pełny" - `pd.read_csv` całego pliku i `fit_clean_data`, wynik do jednego CSV,
+- "paczki" - `fit_clean_data_chunked` i `clean_data_chunked` na
+  `pd.read_csv(..., chunksize=...)`, wynik jako partycje CSV.
+
+Szczyt pamięci mierzony przez `tracemalloc` (alokacje NumPy / pandas).
+W wariancie paczkami powinien zależeć od `--chunksize`, a nie od N.
+Czasy są mierzone z włączonym `tracemalloc`, więc służą tylko do porównania.
+Paczki używają `quantiles.chunked_mode` (domyślnie approximate - szkice KLL
+z błędem rangi `--rank-error`); `--exact` przełącza na liczności wszystkich
+wartości, których pamięć rośnie z liczbą wierszy.
+
+Uruchomienie:
+    python benchmarks/preprocessing_chunked.py --copies 1,10,30 --chunksize 50000
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from ai_credit_scoring.pipelines.preprocessing.nodes import (  # noqa: E402
+    clean_data_chunked,
+    fit_clean_data,
+    fit_clean_data_chunked,
+)
+
+RAW_PATH = ROOT / "data" / "01_raw" / "credit_risk_dataset.csv"
+DEFAULT_OUTPUT = ROOT / "benchmarks" / "results" / "preprocessing_chunked.json"
+PARAMS = {"target": "loan_status", "id_col": "_row_id"}
+
+
+def measure(fn) -> dict:
+    """Czas i szczyt pamięci (MB) jednego wywołania"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": round(seconds, 3), "peak_mb": round(peak / 2**20, 1)}
+
+
+def clean_full(path: Path, out_dir: Path, params: dict):
+    cleaned, _ = fit_clean_data(pd.read_csv(path), params)
+    cleaned.to_csv(out_dir / "clean_data.csv", index=False)
+
+
+def clean_chunked(path: Path, out_dir: Path, chunksize: int, params: dict):
+    fitted = fit_clean_data_chunked(pd.read_csv(path, chunksize=chunksize), params)
+    parts = clean_data_chunked(pd.read_csv(path, chunksize=chunksize), fitted, params)
+    for part in parts:
+        for name, df in part.items():
+            df.to_csv(out_dir / f"{name}.csv", index=False)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--copies", default="1,10,30", help="Krotności powielenia zbioru")
+    parser.add_argument("--chunksize", type=int, default=50_000)
+    parser.add_argument("--rank-error", type=float, default=0.001, help="Błąd rangi szkicu KLL")
+    parser.add_argument("--exact", action="store_true",
+                        help="Paczki z dokładnymi licznościami wartości (chunked_mode: exact)")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    params = dict(PARAMS)
+    params["clean"] = {"quantiles": {
+        "chunked_mode": "exact" if args.exact else "approximate",
+        "rank_error": args.rank_error,
+    }}
+
+    raw = pd.read_csv(RAW_PATH)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        for copies in (int(c) for c in args.copies.split(",")):
+            path = tmp / f"raw_x{copies}.csv"
+            pd.concat([raw] * copies, ignore_index=True).to_csv(path, index=False)
+            (tmp / "full").mkdir(exist_ok=True)
+            (tmp / "parts").mkdir(exist_ok=True)
+            results.append({
+                "copies": copies,
+                "rows": len(raw) * copies,
+                "file_mb": round(path.stat().st_size / 2**20, 1),
+                "full": measure(lambda: clean_full(path, tmp / "full", params)),
+                "chunked": measure(
+                    lambda: clean_chunked(path, tmp / "parts", args.chunksize, params)
+                ),
+            })
+            path.unlink()
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    mode = "dokładne" if args.exact else f"szkic KLL, błąd rangi {args.rank_error}"
+    print(f"\nPaczka: {args.chunksize} wierszy, kwantyle: {mode}")
+    print(f"{'kopie':>6} {'wiersze':>10} {'plik [MB]':>10} {'pełny [MB]':>11} "
+          f"{'paczki [MB]':>12} {'pełny [s]':>10} {'paczki [s]':>11}")
+    for r in results:
+        print(f"{r['copies']:>6} {r['rows']:>10} {r['file_mb']:>10.1f} {r['full']['peak_mb']:>11.1f} "
+              f"{r['chunked']['peak_mb']:>12.1f} {r['full']['seconds']:>10.2f} {r['chunked']['seconds']:>11.2f}")
+    print(f"\nWyniki zapisane w {args.output}")
+
+
+if __name__ == "__main__":
+    main_cli()
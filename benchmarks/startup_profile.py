@@ -0,0 +1,121 @@
+"""
+Profil zimnego startu API: czas importu `app.main` osobno od wczytania modelu.
+
+Każdy pomiar to nowy proces Pythona (`-X importtime`), więc wynik obejmuje
+pełny koszt importów. Zapisuje medianę z `--runs` uruchomień, najwolniejsze
+importy najwyższego poziomu i porównuje wynik z zapisanym wynikiem bazowym.
+
+Uruchomienie:
+    python benchmarks/startup_profile.py --runs 5
+    python benchmarks/startup_profile.py --save-baseline
+
+Kod wyjścia 1 - regresja importu lub wczytania modelu względem wyniku bazowego.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_OUTPUT = ROOT / "benchmarks" / "results" / "startup_profile.json"
+DEFAULT_BASELINE = ROOT / "benchmarks" / "startup_baseline.json"
+
+# Kod uruchamiany w osobnym procesie
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app.main as api
+imported = time.perf_counter()
+deferred = [m for m in ("pandas", "sklearn.preprocessing") if m not in sys.modules]
+api.load_model_and_scaler()
+loaded = time.perf_counter()
+print(json.dumps({
+    "import_seconds": imported - started,
+    "model_load_seconds": loaded - imported,
+    "model_path": api.model_path_used.name,
+    "deferred_imports": deferred,
+}))
+"""
+
+
+def slowest_imports(importtime: str, top: int) -> list[dict]:
+    """Najwolniejsze importy najwyższego poziomu z wyjścia `-X importtime`"""
+    entries = []
+    for line in importtime.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit() or name.startswith("  "):
+            continue
+        entries.append({"module": name.strip(), "cumulative_ms": int(cumulative) / 1000})
+    return sorted(entries, key=lambda e: e["cumulative_ms"], reverse=True)[:top]
+
+
+def profile_once() -> tuple[dict, str]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Liczba najwolniejszych importów")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Dopuszczalne pogorszenie względem wyniku bazowego (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="Zapisz wynik jako bazowy")
+    args = parser.parse_args()
+
+    runs = [profile_once() for _ in range(max(args.runs, 1))]
+    samples = [sample for sample, _ in runs]
+    results = {
+        "runs": len(samples),
+        "import_seconds": round(statistics.median(s["import_seconds"] for s in samples), 4),
+        "model_load_seconds": round(statistics.median(s["model_load_seconds"] for s in samples), 4),
+        "model_path": samples[-1]["model_path"],
+        "deferred_imports": samples[-1]["deferred_imports"],
+        "slowest_imports": slowest_imports(runs[-1][1], args.top),
+    }
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    print(f"\nImport app.main:   {results['import_seconds'] * 1000:8.1f} ms")
+    print(f"Wczytanie modelu:  {results['model_load_seconds'] * 1000:8.1f} ms ({results['model_path']})")
+    print(f"Odroczone importy: {', '.join(results['deferred_imports']) or '-'}")
+    print("\nNajwolniejsze importy:")
+    for entry in results["slowest_imports"]:
+        print(f"  {entry['cumulative_ms']:8.1f} ms  {entry['module']}")
+    print(f"\nWyniki zapisane w {args.output}")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"Wynik bazowy zapisany w {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"Brak wyniku bazowego ({args.baseline.name}) - porównanie pominięte")
+        return
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions = [
+        f"{key}: {results[key]} s > {baseline[key]} s"
+        for key in ("import_seconds", "model_load_seconds")
+        if key in baseline and results[key] > baseline[key] * (1 + args.tolerance)
+    ]
+    if regressions:
+        print("\n❌ Regresja czasu startu:")
+        for line in regressions:
+            print(f"  - {line}")
+        sys.exit(1)
+    print("\n✅ Brak regresji czasu startu")
+
+
+if __name__ == "__main__":
+    main_cli()
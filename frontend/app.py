@@ -298,6 +298,10 @@ if predict_clicked:
                     st.json(payload)
                     st.json(result)
                     
+            elif response.status_code == 429:
+                # API odrzuca nadmiar żądań zamiast kolejkować je bez limitu
+                retry_after = response.headers.get("Retry-After", "1")
+                st.warning(f"API jest chwilowo przeciążone - spróbuj ponownie za {retry_after} s")
             else:
                 st.error(f"Błąd API: {response.status_code}")
                 st.json(response.json())
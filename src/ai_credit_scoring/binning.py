@@ -0,0 +1,61 @@
+"""
+Binning cech (wiek, dochód) wspólny dla treningu i API.
+
+Specyfikacja binu to słownik w formacie artefaktu preprocessingu
+(`preprocessor.json`, klucz "bins"): `{"source", "edges", "labels"}`.
+Przedziały są prawostronnie domknięte, a skrajne biny otwarte - wartości
+poniżej pierwszej / powyżej ostatniej krawędzi trafiają do pierwszego /
+ostatniego binu. Przypisanie to jedno `np.searchsorted` dla całej kolumny.
+
+Moduł zależy tylko od NumPy (pandas wyłącznie przy tworzeniu etykiet
+w `fit_quantile_bins`), więc API może go używać bez Kedro.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+
+import numpy as np
+
+# Stałe biny wieku (120 "na zapas", po cleaningu wiek <= 90)
+AGE_BINS = {
+    "source": "person_age",
+    "edges": [18, 25, 35, 45, 60, 120],
+    "labels": ["18-25", "26-35", "36-45", "46-60", "60+"],
+}
+
+# Kwantyle krawędzi binów dochodu (mocniejsze rozbicie góry)
+INCOME_QUANTILES = [0.0, 0.2, 0.4, 0.6, 0.8, 0.95, 1.0]
+
+
+def fit_quantile_bins(values, source: str, quantiles=INCOME_QUANTILES) -> dict | None:
+    """
+    Specyfikacja binów o krawędziach w kwantylach `values`.
+
+    Etykiety mają format `pd.cut(..., include_lowest=True)`, np.
+    "(3999.999, 35000.0]". None, gdy kwantyle dają mniej niż dwie krawędzie.
+    """
+    return bins_from_edges(np.quantile(np.asarray(values, dtype=float), quantiles), source)
+
+
+def bins_from_edges(edges, source: str) -> dict | None:
+    """Specyfikacja binów z krawędzi (np. kwantyli policzonych poza `fit_quantile_bins`)"""
+    import pandas as pd
+
+    edges = np.unique(np.asarray(edges, dtype=float))
+    if len(edges) < 2:
+        return None
+    labels = pd.cut(edges, bins=edges, include_lowest=True).categories
+    return {"source": source, "edges": edges.tolist(), "labels": [str(c) for c in labels]}
+
+
+def assign_bins(values, spec: dict) -> np.ndarray:
+    """Etykiety binów dla całej kolumny (tablica object)"""
+    inner = np.asarray(spec["edges"][1:-1], dtype=float)
+    index = np.searchsorted(inner, np.asarray(values, dtype=float), side="left")
+    return np.asarray(spec["labels"], dtype=object)[index]
+
+
+def assign_bin(value: float, spec: dict) -> str:
+    """Etykieta binu dla pojedynczej wartości (bez alokacji tablic)"""
+    return spec["labels"][bisect_left(spec["edges"], value, 1, len(spec["edges"]) - 1) - 1]
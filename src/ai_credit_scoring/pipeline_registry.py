@@ -3,6 +3,9 @@ from __future__ import annotations
 
 from kedro.pipeline import Pipeline
 
+from .pipelines.batch_scoring import (
+    create_pipeline as create_batch_scoring_pipeline,
+)
 from .pipelines.credit_scoring import (
     create_pipeline as create_credit_scoring_pipeline,
 )
@@ -13,6 +16,9 @@ from .pipelines.evaluation import (
 from .pipelines.modeling import (
     create_pipeline as create_modeling_pipeline,
 )
+from .pipelines.preprocessing import (
+    create_chunked_pipeline as create_preprocessing_chunked_pipeline,
+)
 from .pipelines.preprocessing import (
     create_pipeline as create_preprocessing_pipeline,
 )
@@ -33,4 +39,9 @@ def register_pipelines() -> dict[str, Pipeline]:
     }
 
     pipelines["__default__"] = sum(pipelines.values(), Pipeline([]))
+    # Wsadowa ocena to osobne zadanie (kedro run --pipeline batch_scoring),
+    # nie część treningu
+    pipelines["batch_scoring"] = create_batch_scoring_pipeline()
+    # Cleaning paczkami dla plików większych niż pamięć (dwa przebiegi po CSV)
+    pipelines["preprocessing_chunked"] = create_preprocessing_chunked_pipeline()
     return pipelines
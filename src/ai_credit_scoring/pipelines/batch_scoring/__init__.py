@@ -0,0 +1,5 @@
+"""Batch scoring pipeline."""
+
+__all__ = ["create_pipeline"]
+
+from .pipeline import create_pipeline
@@ -0,0 +1,171 @@
+"""Węzły pipeline'u batch_scoring (wsadowa ocena surowego CSV)."""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import warnings
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+# Model i artefakt preprocessingu wczytane w procesie roboczym
+_worker_state: dict[str, Any] = {}
+
+
+# =============================================================================
+# Funkcje pomocnicze
+# =============================================================================
+def _feature_names(model: Any, preprocessor: dict) -> list[str]:
+    """Kolejność cech modelu (feature_names_in_ albo kolumny scalera)."""
+    if hasattr(model, "feature_names_in_"):
+        return [str(c) for c in model.feature_names_in_]
+    return list(preprocessor["scaler"]["columns"])
+
+
+def transform_chunk(
+    chunk: pd.DataFrame, preprocessor: dict, feature_names: list[str]
+) -> np.ndarray:
+    """
+    Macierz cech dla paczki surowych rekordów z dopasowanego artefaktu.
+
+    Kolejność kroków jak w `fit_clean_data` i `scale_data`: imputacja,
+    zakres wieku, clipping domenowy i IQR, skalowanie. Wiersze nie są
+    usuwane (każdy rekord dostaje wynik) - wiek spoza zakresu jest przycinany.
+    Biny są kategoryczne i nie wchodzą do modelu, więc nie są tworzone.
+    """
+    columns: dict[str, np.ndarray] = {}
+    for name in feature_names:
+        if name not in chunk.columns:
+            continue
+        values = pd.to_numeric(chunk[name], errors="coerce").to_numpy(dtype=float, copy=True)
+        fill = preprocessor.get("impute", {}).get(name)
+        if fill is not None:
+            values = np.where(np.isnan(values), float(fill), values)
+        columns[name] = values
+
+    age_range = preprocessor.get("age_range")
+    if age_range and "person_age" in columns:
+        columns["person_age"] = np.round(np.clip(columns["person_age"], *age_range))
+
+    for step in ("domain_clip", "outlier_clip"):
+        for name, (low, high) in preprocessor.get(step, {}).items():
+            if name in columns:
+                np.clip(columns[name], low, high, out=columns[name])
+
+    scaler = preprocessor["scaler"]
+    for name, mean, scale in zip(scaler["columns"], scaler["mean"], scaler["scale"]):
+        if name in columns:
+            columns[name] = (columns[name] - mean) / scale
+
+    # brakujące cechy (np. _row_id) wypełniane zerami - jak reindex w API
+    X = np.zeros((len(chunk), len(feature_names)))
+    for i, name in enumerate(feature_names):
+        if name in columns:
+            X[:, i] = columns[name]
+    return X
+
+
+def score_chunk(
+    chunk: pd.DataFrame,
+    offset: int,
+    model: Any,
+    preprocessor: dict,
+    params: dict,
+) -> pd.DataFrame:
+    """Wyniki dla jednej paczki: identyfikator wiersza, predykcja, ryzyko."""
+    X = transform_chunk(chunk, preprocessor, _feature_names(model, preprocessor))
+    proba = model.predict_proba(X)
+    probability = proba[:, 1]
+
+    thresholds = params.get("risk_thresholds", [0.3, 0.7])
+    labels = np.asarray(params.get("risk_labels", ["niski", "średni", "wysoki"]), dtype=object)
+
+    result = pd.DataFrame(
+        {
+            params.get("id_col", "_row_id"): np.arange(offset, offset + len(chunk)),
+            "prediction": model.classes_[proba.argmax(axis=1)].astype(int),
+            "probability": probability.round(6),
+            "risk_level": labels[np.searchsorted(thresholds, probability, side="right")],
+        }
+    )
+    for name in params.get("keep_columns", []) or []:
+        if name in chunk.columns:
+            result[name] = chunk[name].to_numpy()
+    return result
+
+
+def _init_worker(model: Any, preprocessor: dict, params: dict) -> None:
+    """Initializer procesu roboczego - model przekazywany raz na proces."""
+    warnings.filterwarnings("ignore")
+    # równoległość zapewnia pula procesów - bez dodatkowych wątków joblib
+    if hasattr(model, "n_jobs"):
+        model.n_jobs = 1
+    _worker_state.update(model=model, preprocessor=preprocessor, params=params)
+
+
+def _score_in_worker(chunk: pd.DataFrame, offset: int) -> pd.DataFrame:
+    return score_chunk(
+        chunk,
+        offset,
+        _worker_state["model"],
+        _worker_state["preprocessor"],
+        _worker_state["params"],
+    )
+
+
+def _as_chunks(data: pd.DataFrame | Iterable[pd.DataFrame]) -> Iterable[pd.DataFrame]:
+    """CSVDataset z `chunksize` zwraca iterator paczek, bez niego - DataFrame."""
+    return [data] if isinstance(data, pd.DataFrame) else data
+
+
+# =============================================================================
+# Wsadowa ocena
+# =============================================================================
+def score_batch(
+    raw_chunks: pd.DataFrame | Iterable[pd.DataFrame],
+    best_model: Any,
+    preprocessor: dict,
+    params: dict,
+) -> Iterator[dict[str, pd.DataFrame]]:
+    """
+    Ocena surowego CSV paczkami w puli procesów.
+
+    Węzeł jest generatorem: każda oceniona paczka jest od razu zapisywana
+    jako osobna partycja (`part-00000`, ...), w kolejności wejścia. W toku
+    jest najwyżej `max_in_flight` paczek (domyślnie 2 na proces), więc
+    pamięć zależy od rozmiaru paczki, a nie od rozmiaru pliku.
+    """
+    workers = int(params.get("workers", 0)) or os.cpu_count() or 1
+    max_in_flight = int(params.get("max_in_flight", 0)) or 2 * workers
+
+    offset = 0
+    if workers == 1:
+        for i, chunk in enumerate(_as_chunks(raw_chunks)):
+            yield {f"part-{i:05d}": score_chunk(chunk, offset, best_model, preprocessor, params)}
+            offset += len(chunk)
+        return
+
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(params.get("start_method", "spawn")),
+        initializer=_init_worker,
+        initargs=(best_model, preprocessor, params),
+    )
+    pending: deque = deque()
+    try:
+        for i, chunk in enumerate(_as_chunks(raw_chunks)):
+            pending.append((i, executor.submit(_score_in_worker, chunk, offset)))
+            offset += len(chunk)
+            if len(pending) >= max_in_flight:
+                part, future = pending.popleft()
+                yield {f"part-{part:05d}": future.result()}
+        while pending:
+            part, future = pending.popleft()
+            yield {f"part-{part:05d}": future.result()}
+    finally:
+        executor.shutdown(cancel_futures=True)
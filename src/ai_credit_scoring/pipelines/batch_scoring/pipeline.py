@@ -0,0 +1,25 @@
+"""Batch scoring pipeline: chunked, multi-process scoring of a raw CSV."""
+
+from kedro.pipeline import Pipeline, node
+
+from .nodes import score_batch
+
+
+def create_pipeline(**kwargs) -> Pipeline:
+    """Create batch scoring pipeline."""
+    return Pipeline(
+        [
+            # Score raw CSV chunks in a process pool, one output partition per chunk
+            node(
+                func=score_batch,
+                inputs=[
+                    "batch_scoring_input",
+                    "best_model",
+                    "preprocessor",
+                    "params:batch_scoring",
+                ],
+                outputs="batch_scores",
+                name="score_batch_node",
+            ),
+        ]
+    )
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+
+from .nodes import score_batch, transform_chunk
+
+PREPROCESSOR = {
+    "impute": {"person_age": 30.0, "person_income": 50000.0},
+    "age_range": [18, 90],
+    "domain_clip": {"person_income": [0, 200000.0]},
+    "outlier_clip": {"person_income": [-10000.0, 150000.0]},
+    "scaler": {
+        "columns": ["person_age", "person_income"],
+        "mean": [30.0, 50000.0],
+        "scale": [10.0, 25000.0],
+    },
+}
+
+PARAMS = {"workers": 1, "id_col": "_row_id", "keep_columns": ["person_age"]}
+
+
+def _raw(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "person_age": rng.integers(18, 80, n).astype(float),
+            "person_income": rng.lognormal(10.8, 0.5, n),
+            "loan_intent": rng.choice(["PERSONAL", "EDUCATION"], n),
+        }
+    )
+
+
+def _model() -> LogisticRegression:
+    raw = _raw(200, seed=1)
+    X = pd.DataFrame(
+        transform_chunk(raw, PREPROCESSOR, ["person_age", "person_income"]),
+        columns=["person_age", "person_income"],
+    )
+    y = (raw["person_income"] < 50000).astype(int)
+    return LogisticRegression().fit(X, y)
+
+
+def _chunks(df: pd.DataFrame, size: int):
+    return [df.iloc[i : i + size] for i in range(0, len(df), size)]
+
+
+def test_transform_imputes_clips_and_scales():
+    """Imputacja z artefaktu, przycięcie wieku i dochodu, skalowanie; wejście bez zmian."""
+    raw = pd.DataFrame({"person_age": [np.nan, 120.0], "person_income": [1e6, np.nan]})
+    before = raw.copy()
+    X = transform_chunk(raw, PREPROCESSOR, ["person_age", "person_income", "_row_id"])
+    np.testing.assert_allclose(X, [[0.0, 4.0, 0.0], [6.0, 0.0, 0.0]])
+    pd.testing.assert_frame_equal(raw, before)
+
+
+def test_score_batch_partitions_follow_chunks():
+    """Jedna partycja na paczkę, numeracja wierszy ciągła w całym pliku."""
+    raw = _raw(250)
+    parts = list(score_batch(_chunks(raw, 100), _model(), PREPROCESSOR, PARAMS))
+    assert [list(p) for p in parts] == [["part-00000"], ["part-00001"], ["part-00002"]]
+    scores = pd.concat([df for p in parts for df in p.values()], ignore_index=True)
+    assert scores["_row_id"].tolist() == list(range(250))
+    assert scores["person_age"].tolist() == raw["person_age"].tolist()
+    assert scores["probability"].between(0, 1).all()
+    assert set(scores["risk_level"]) <= {"niski", "średni", "wysoki"}
+
+
+def test_process_pool_matches_single_process():
+    """Wyniki z puli procesów są takie same jak w jednym procesie, w kolejności wejścia."""
+    raw, model = _raw(300), _model()
+    single = list(score_batch(_chunks(raw, 50), model, PREPROCESSOR, PARAMS))
+    pooled = list(
+        score_batch(
+            _chunks(raw, 50), model, PREPROCESSOR, {**PARAMS, "workers": 2, "max_in_flight": 2}
+        )
+    )
+    assert [list(p) for p in pooled] == [list(p) for p in single]
+    for a, b in zip(single, pooled):
+        for key in a:
+            pd.testing.assert_frame_equal(a[key], b[key])
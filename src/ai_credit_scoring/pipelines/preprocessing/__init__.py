@@ -1,2 +1,3 @@
-from .pipeline import create_pipeline
-__all__ = ["create_pipeline"]
\ No newline at end of file
+from .pipeline import create_chunked_pipeline, create_pipeline
+
+__all__ = ["create_pipeline", "create_chunked_pipeline"]
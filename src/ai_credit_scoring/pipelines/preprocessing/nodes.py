@@ -1,7 +1,38 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+
 import numpy as np
 import pandas as pd
-from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from ai_credit_scoring.binning import (
+    AGE_BINS,
+    INCOME_QUANTILES,
+    assign_bins,
+    bins_from_edges,
+    fit_quantile_bins,
+)
+from ai_credit_scoring.quantiles import KLLSketch, weighted_quantile
+
+# Wersja formatu artefaktu preprocessingu (zmiana = niekompatybilny format)
+PREPROCESSOR_VERSION = 1
+
+# Dopuszczalny wiek (wiersze spoza zakresu są usuwane)
+AGE_RANGE = (18, 90)
+
+# Clipping domenowy do [0, 99 percentyl]; wartość = dodatkowy limit górnej granicy
+DOMAIN_CLIP_CAPS = {
+    # dochód: ucinamy skrajne (milionowe) wartości
+    "person_income": None,
+    # długość zatrudnienia: nie może być ujemna
+    "person_emp_length": None,
+    # historia kredytowa w latach
+    "cb_person_cred_hist_length": None,
+    # loan_percent_income: teoretycznie w okolicach 0–1; ograniczamy górę
+    "loan_percent_income": 0.8,
+}
 
 
 # ----------------- Helpery ----------------- #
@@ -16,38 +47,174 @@ def _to_numeric_if_possible(s: pd.Series) -> pd.Series:
     return s
 
 
-def _impute(
+def _dtype_cols(df: pd.DataFrame, numeric: bool, exclude=()) -> list[str]:
+    """Kolumny numeryczne / nienumeryczne (select_dtypes na pustym wycinku - bez kopii danych)."""
+    head = df.iloc[:0]
+    if numeric:
+        cols = head.select_dtypes(include=[np.number]).columns
+    else:
+        cols = head.select_dtypes(exclude=[np.number]).columns
+    return [c for c in cols if c not in exclude]
+
+
+def _sketch_quantile(s: pd.Series, q, rank_error: float):
+    """Przybliżony kwantyl kolumny ze szkicu KLL (bez sortowania całej kolumny)."""
+    return KLLSketch(rank_error).update(s.to_numpy(dtype=np.float64)).quantile(q)
+
+
+def _impute_values(
     df: pd.DataFrame,
     num_strategy: str,
     cat_strategy: str,
     exclude: set[str],
-) -> pd.DataFrame:
-    df = df.copy()
-    num_cols = [
-        c for c in df.select_dtypes(include=[np.number]).columns if c not in exclude
-    ]
-    cat_cols = [
-        c for c in df.select_dtypes(exclude=[np.number]).columns if c not in exclude
-    ]
-
-    if num_strategy == "median":
-        for c in num_cols:
-            df[c] = df[c].fillna(df[c].median())
+    rank_error: float | None = None,
+) -> dict:
+    """Wartości do imputacji per kolumna (mediana/średnia albo moda).
+
+    Statystyki numeryczne liczone jednym wywołaniem na całym bloku kolumn;
+    przy `rank_error` mediana jest przybliżona (szkic KLL).
+    """
+    num_cols = _dtype_cols(df, numeric=True, exclude=exclude)
+    cat_cols = _dtype_cols(df, numeric=False, exclude=exclude)
+
+    values: dict = {}
+    if num_strategy == "median" and rank_error is not None:
+        values.update((c, _sketch_quantile(df[c], 0.5, rank_error)) for c in num_cols)
+    elif num_strategy == "median":
+        values.update(df[num_cols].median().items())
     elif num_strategy == "mean":
-        for c in num_cols:
-            df[c] = df[c].fillna(df[c].mean())
+        values.update(df[num_cols].mean().items())
     else:
         raise ValueError(f"Unknown num_strategy={num_strategy}")
 
     if cat_strategy == "most_frequent":
+        # moda wymaga zliczania wartości (hash) osobno dla każdej kolumny
         for c in cat_cols:
             mode = df[c].mode(dropna=True)
-            fill = mode.iloc[0] if not mode.empty else ""
-            df[c] = df[c].fillna(fill)
+            values[c] = mode.iloc[0] if not mode.empty else ""
     else:
         raise ValueError(f"Unknown cat_strategy={cat_strategy}")
 
-    return df
+    return values
+
+
+def _float_block(df: pd.DataFrame, cols: list[str]) -> np.ndarray:
+    """Kolumny jako jedna zapisywalna macierz float64 (n_wierszy x n_kolumn).
+
+    `copy=True` - przy Copy-on-Write (pandas 3) `to_numpy` może zwrócić widok
+    tylko do odczytu, a macierz jest modyfikowana w miejscu (`np.copyto`, `np.clip`).
+    """
+    return df[cols].to_numpy(dtype=np.float64, copy=True)
+
+
+def _apply_fill(df: pd.DataFrame, values: dict) -> pd.DataFrame:
+    """
+    Imputacja braków wartościami `values` (zwraca nową ramkę).
+
+    Kolumny float64 wypełniane jednym `np.copyto` na wspólnej macierzy,
+    pozostałe jednym `fillna`; przypisywane są tylko kolumny, które miały braki.
+    """
+    out = df.copy()
+    floats = [c for c in values if df[c].dtype == np.float64]
+    others = [c for c in values if c not in floats]
+    if floats:
+        X = _float_block(df, floats)
+        missing = np.isnan(X)
+        fill = np.array([values[c] for c in floats], dtype=np.float64)
+        np.copyto(X, np.broadcast_to(fill, X.shape), where=missing)
+        for j in np.flatnonzero(missing.any(axis=0)):
+            out[floats[j]] = X[:, j]
+    if others:
+        # kolumny całkowite nie mają braków
+        with_na = [c for c in others if df[c].dtype.kind not in "iub" and df[c].isna().any()]
+        if with_na:
+            out[with_na] = df[with_na].fillna({c: values[c] for c in with_na})
+    return out
+
+
+def _impute(
+    df: pd.DataFrame,
+    num_strategy: str,
+    cat_strategy: str,
+    exclude: set[str],
+) -> pd.DataFrame:
+    return _apply_fill(df, _impute_values(df, num_strategy, cat_strategy, exclude))
+
+
+def _outlier_bounds(
+    df: pd.DataFrame,
+    method: str = "iqr",
+    iqr_factor: float = 1.5,
+    zscore_thresh: float = 3.0,
+    exclude: set[str] | None = None,
+    rank_error: float | None = None,
+) -> dict[str, tuple[float, float]]:
+    """
+    Granice clippingu outlierów (IQR / z-score) per kolumna numeryczna.
+
+    Przy `rank_error` kwartyle są przybliżone (szkic KLL per kolumna).
+    """
+    num_cols = _dtype_cols(df, numeric=True, exclude=exclude or set())
+
+    # statystyki wszystkich kolumn jednym wywołaniem na bloku numerycznym
+    block = df[num_cols]
+    if method == "iqr" and rank_error is not None:
+        quartiles = pd.DataFrame(
+            {c: _sketch_quantile(block[c], [0.25, 0.75], rank_error) for c in num_cols},
+            index=[0.25, 0.75],
+            columns=num_cols,
+            dtype=np.float64,
+        )
+        q1, q3 = quartiles.loc[0.25], quartiles.loc[0.75]
+        iqr = q3 - q1
+        low, high = q1 - iqr_factor * iqr, q3 + iqr_factor * iqr
+    elif method == "iqr":
+        quartiles = block.quantile([0.25, 0.75])
+        q1, q3 = quartiles.loc[0.25], quartiles.loc[0.75]
+        iqr = q3 - q1
+        low, high = q1 - iqr_factor * iqr, q3 + iqr_factor * iqr
+    elif method == "zscore":
+        mu, sigma = block.mean(), block.std(ddof=0)
+        # kolumny stałe / puste nie mają granic
+        keep = (sigma != 0) & sigma.notna()
+        mu, sigma = mu[keep], sigma[keep]
+        low, high = mu - zscore_thresh * sigma, mu + zscore_thresh * sigma
+    else:
+        raise ValueError(f"Unknown outlier method={method}")
+
+    return {c: (lo, hi) for c, lo, hi in zip(low.index, low.to_numpy(), high.to_numpy())}
+
+
+def _apply_clip(
+    df: pd.DataFrame, bounds: dict[str, tuple[float, float]]
+) -> pd.DataFrame:
+    """
+    Clipping kolumn do granic jednym `np.clip` na macierzy float64 (zwraca nową ramkę).
+
+    Typy jak w `Series.clip`: kolumna całkowita pozostaje całkowita, o ile
+    przycięte wartości są całkowite; granica NaN oznacza brak ograniczenia.
+    """
+    out = df.copy()
+    cols = [c for c in bounds if df[c].dtype.kind in "iuf"]
+    for c in bounds:
+        if c not in cols:
+            # typy rozszerzone (np. Int64) - clip pandas
+            out[c] = df[c].clip(lower=bounds[c][0], upper=bounds[c][1])
+    if not cols:
+        return out
+
+    low = np.array([bounds[c][0] for c in cols], dtype=np.float64)
+    high = np.array([bounds[c][1] for c in cols], dtype=np.float64)
+    X = _float_block(df, cols)
+    np.clip(X, np.nan_to_num(low, nan=-np.inf), np.nan_to_num(high, nan=np.inf), out=X)
+    for j, c in enumerate(cols):
+        dtype = df[c].dtype
+        col = X[:, j]
+        if dtype.kind in "iu":
+            out[c] = col.astype(dtype) if np.array_equal(col, np.trunc(col)) else col
+        else:
+            out[c] = col.astype(dtype, copy=False)
+    return out
 
 
 def _clip_outliers(
@@ -56,38 +223,86 @@ def _clip_outliers(
     iqr_factor: float = 1.5,
     zscore_thresh: float = 3.0,
     exclude: set[str] | None = None,
+    rank_error: float | None = None,
 ) -> pd.DataFrame:
     """Ogólny clipping outlierów dla kolumn numerycznych z opcją wykluczeń."""
-    df = df.copy()
-    exclude = exclude or set()
-    num_cols = [
-        c for c in df.select_dtypes(include=[np.number]).columns if c not in exclude
-    ]
-
-    if method == "iqr":
-        for c in num_cols:
-            q1, q3 = df[c].quantile([0.25, 0.75])
-            iqr = q3 - q1
-            low, high = q1 - iqr_factor * iqr, q3 + iqr_factor * iqr
-            df[c] = df[c].clip(lower=low, upper=high)
-    elif method == "zscore":
-        for c in num_cols:
-            mu, sigma = df[c].mean(), df[c].std(ddof=0)
-            if sigma == 0 or np.isnan(sigma):
-                continue
-            z = (df[c] - mu) / sigma
-            df.loc[z > zscore_thresh, c] = mu + zscore_thresh * sigma
-            df.loc[z < -zscore_thresh, c] = mu - zscore_thresh * sigma
+    bounds = _outlier_bounds(df, method, iqr_factor, zscore_thresh, exclude, rank_error)
+    return _apply_clip(df, bounds)
+
+
+def _clean_config(params: dict | None, chunked: bool = False) -> dict:
+    """
+    Ustawienia cleaningu z `params:preprocessing` (z wartościami domyślnymi).
+
+    Cleaning paczkami (`chunked`) bierze tryb kwantyli z `quantiles.chunked_mode`
+    (domyślnie approximate) - tryb exact trzyma liczności wszystkich wartości.
+    """
+    p = params or {}
+    clean_p = p.get("clean", {}) or {}
+    out_cfg = clean_p.get("outlier", {}) or {}
+    q_cfg = clean_p.get("quantiles", {}) or {}
+    if chunked:
+        q_mode = q_cfg.get("chunked_mode", "approximate")
     else:
-        raise ValueError(f"Unknown outlier method={method}")
+        q_mode = q_cfg.get("mode", "exact")
+    if q_mode not in ("exact", "approximate"):
+        raise ValueError(f"Unknown quantiles mode={q_mode}")
+    return {
+        "target": p.get("target"),
+        "id_col": p.get("id_col", "_row_id"),
+        "col_missing_thresh": float(clean_p.get("col_missing_thresh", 0.6)),
+        "row_missing_thresh": float(clean_p.get("row_missing_thresh", 0.8)),
+        "num_strategy": clean_p.get("num_imputer", "median"),
+        "cat_strategy": clean_p.get("cat_imputer", "most_frequent"),
+        "out_method": out_cfg.get("method", "iqr"),
+        "iqr_factor": float(out_cfg.get("iqr_factor", 1.5)),
+        "zscore_thresh": float(out_cfg.get("zscore_thresh", 3.0)),
+        # błąd rangi szkicu KLL; None = kwantyle dokładne
+        "rank_error": (
+            float(q_cfg.get("rank_error", 0.001)) if q_mode == "approximate" else None
+        ),
+    }
 
-    return df
+
+def _empty_fitted(target) -> dict:
+    return {
+        "target": target,
+        "dropped_columns": [],
+        "impute": {},
+        "age_range": None,
+        "domain_clip": {},
+        "outlier_clip": {},
+        "bins": {},
+    }
+
+
+def _add_bin_columns(df: pd.DataFrame, bins: dict) -> None:
+    """Kolumny kategoryczne binów (w miejscu) wg specyfikacji z artefaktu."""
+    for name, spec in bins.items():
+        df[name] = pd.Categorical(
+            assign_bins(df[spec["source"]].to_numpy(), spec), categories=spec["labels"]
+        )
+
+
+def _to_builtin(value):
+    """Konwersja typów numpy/pandas na typy wbudowane (serializacja do JSON)."""
+    if isinstance(value, dict):
+        return {str(k): _to_builtin(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_to_builtin(v) for v in value]
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    return value
 
 
 # ----------------- Cleaning ----------------- #
 
 
-def clean_data(df: pd.DataFrame, params: dict | None = None) -> pd.DataFrame:
+def fit_clean_data(
+    df: pd.DataFrame, params: dict | None = None
+) -> tuple[pd.DataFrame, dict]:
     """
     Główne czyszczenie danych:
     - konwersje typów
@@ -97,20 +312,21 @@ def clean_data(df: pd.DataFrame, params: dict | None = None) -> pd.DataFrame:
     - ogólny clipping IQR (z wykluczeniem wieku)
     - proste feature engineering (binning wieku i dochodu)
     - dodanie stabilnego ID wiersza
-    """
-    p = params or {}
-    target = p.get("target")
-    clean_p = p.get("clean", {}) or {}
 
-    col_missing_thresh = float(clean_p.get("col_missing_thresh", 0.6))
-    row_missing_thresh = float(clean_p.get("row_missing_thresh", 0.8))
-    num_strategy = clean_p.get("num_imputer", "median")
-    cat_strategy = clean_p.get("cat_imputer", "most_frequent")
+    Zwraca oczyszczone dane oraz dopasowane parametry transformacji
+    (wartości imputacji, granice clippingu, przedziały binów), które
+    pozwalają odtworzyć cleaning dla nowych rekordów bez danych treningowych.
+    """
+    cfg = _clean_config(params)
+    target = cfg["target"]
+    col_missing_thresh = cfg["col_missing_thresh"]
+    row_missing_thresh = cfg["row_missing_thresh"]
+    num_strategy, cat_strategy = cfg["num_strategy"], cfg["cat_strategy"]
+    out_method = cfg["out_method"]
+    iqr_factor, zscore_thresh = cfg["iqr_factor"], cfg["zscore_thresh"]
+    rank_error = cfg["rank_error"]
 
-    out_cfg = clean_p.get("outlier", {}) or {}
-    out_method = out_cfg.get("method", "iqr")
-    iqr_factor = float(out_cfg.get("iqr_factor", 1.5))
-    zscore_thresh = float(out_cfg.get("zscore_thresh", 3.0))
+    fitted = _empty_fitted(target)
 
     # 1) Konwersja typów (także target, jeśli się da)
     df = df.apply(_to_numeric_if_possible)
@@ -124,6 +340,7 @@ def clean_data(df: pd.DataFrame, params: dict | None = None) -> pd.DataFrame:
         cols_to_drop.remove(target)
     if cols_to_drop:
         df = df.drop(columns=cols_to_drop)
+    fitted["dropped_columns"] = cols_to_drop
 
     row_na_ratio = df.isna().mean(axis=1)
     rows_to_drop = row_na_ratio[row_na_ratio > row_missing_thresh].index
@@ -132,38 +349,31 @@ def clean_data(df: pd.DataFrame, params: dict | None = None) -> pd.DataFrame:
 
     # 3) Imputacja (bez targetu)
     exclude = {target} if target else set()
-    df = _impute(df, num_strategy, cat_strategy, exclude=exclude)
+    impute_values = _impute_values(
+        df, num_strategy, cat_strategy, exclude=exclude, rank_error=rank_error
+    )
+    df = df.fillna(impute_values)
+    fitted["impute"] = impute_values
 
     # 4) Domenowe przycinanie/usuwanie outlierów na podstawie EDA
     num_cols = df.select_dtypes(include=[np.number]).columns
 
     # person_age: usuwamy wiersze poza [18, 90] (zbędne dzieci i ekstremalni "dziadkowie")
     if "person_age" in num_cols:
-        mask = (df["person_age"] >= 18) & (df["person_age"] <= 90)
+        mask = (df["person_age"] >= AGE_RANGE[0]) & (df["person_age"] <= AGE_RANGE[1])
         df = df.loc[mask].copy()
+        fitted["age_range"] = list(AGE_RANGE)
 
-    # person_income: clip do 99 percentyla, minimum 0
-    if "person_income" in num_cols:
-        q_hi = df["person_income"].quantile(0.99)
-        df["person_income"] = df["person_income"].clip(lower=0, upper=q_hi)
-
-    # person_emp_length: długość zatrudnienia, nie może być ujemna, 99 percentyl
-    if "person_emp_length" in num_cols:
-        q_hi = df["person_emp_length"].quantile(0.99)
-        df["person_emp_length"] = df["person_emp_length"].clip(lower=0, upper=q_hi)
-
-    # cb_person_cred_hist_length: historia kredytowa w latach, też [0, 99 percentyl]
-    if "cb_person_cred_hist_length" in num_cols:
-        q_hi = df["cb_person_cred_hist_length"].quantile(0.99)
-        df["cb_person_cred_hist_length"] = df["cb_person_cred_hist_length"].clip(
-            lower=0, upper=q_hi
-        )
-
-    # loan_percent_income: teoretycznie w okolicach 0–1; ograniczamy górę
-    if "loan_percent_income" in num_cols:
-        q_hi = df["loan_percent_income"].quantile(0.99)
-        upper = min(q_hi, 0.8)
-        df["loan_percent_income"] = df["loan_percent_income"].clip(lower=0, upper=upper)
+    # dochód, staż, historia kredytowa, loan_percent_income: clip do [0, 99 percentyl]
+    for col, cap in DOMAIN_CLIP_CAPS.items():
+        if col in num_cols:
+            if rank_error is None:
+                q_hi = df[col].quantile(0.99)
+            else:
+                q_hi = _sketch_quantile(df[col], 0.99, rank_error)
+            upper = q_hi if cap is None else min(q_hi, cap)
+            df[col] = df[col].clip(lower=0, upper=upper)
+            fitted["domain_clip"][col] = [0, upper]
 
     # 5) Ogólny clipping outlierów (IQR / z-score) dla reszty numerycznych
     #    Wiek wykluczamy, żeby nie robić wartości typu 40.5 – wiek będzie int.
@@ -171,13 +381,16 @@ def clean_data(df: pd.DataFrame, params: dict | None = None) -> pd.DataFrame:
     if "person_age" in df.columns:
         extra_exclude.add("person_age")
 
-    df = _clip_outliers(
+    bounds = _outlier_bounds(
         df,
         method=out_method,
         iqr_factor=iqr_factor,
         zscore_thresh=zscore_thresh,
         exclude=extra_exclude,
+        rank_error=rank_error,
     )
+    df = _apply_clip(df, bounds)
+    fitted["outlier_clip"] = {c: list(b) for c, b in bounds.items()}
 
     # 6) Wymuszenie całkowitego wieku (na samym końcu, po wszystkich operacjach)
     if "person_age" in df.columns:
@@ -185,42 +398,378 @@ def clean_data(df: pd.DataFrame, params: dict | None = None) -> pd.DataFrame:
 
     # 7) Feature engineering: binning wieku i dochodu
 
+    #    Biny dopasowywane raz i zapisywane w artefakcie; przypisanie przez
+    #    `assign_bins` (np.searchsorted) - ta sama funkcja działa w API.
+
     #    7.1 person_age_bin: stałe przedziały 18–25, 26–35, 36–45, 46–60, 60+
     if "person_age" in df.columns:
-        df["person_age_bin"] = pd.cut(
-            df["person_age"],
-            bins=[18, 25, 35, 45, 60, 120],  # 120 "na zapas", ale i tak mamy max <= 90
-            labels=["18-25", "26-35", "36-45", "46-60", "60+"],
-            right=True,
-            include_lowest=True,
-        )
-        df["person_age_bin"] = df["person_age_bin"].astype("category")
+        fitted["bins"]["person_age_bin"] = dict(AGE_BINS)
 
     #    7.2 person_income_bin: kwantyle z mocniejszym rozbiciem góry
     if "person_income" in df.columns:
-        try:
-            quantiles = df["person_income"].quantile(
-                [0.0, 0.2, 0.4, 0.6, 0.8, 0.95, 1.0]
-            ).values
-            quantiles = np.unique(quantiles)
-            if len(quantiles) >= 2:
-                df["person_income_bin"] = pd.cut(
-                    df["person_income"],
-                    bins=quantiles,
-                    include_lowest=True,
-                )
-                df["person_income_bin"] = df["person_income_bin"].astype("category")
-        except Exception:
-            # w razie patologii z kwantylami – po prostu nie tworzymy binu dochodu
-            pass
+        if rank_error is None:
+            income_bins = fit_quantile_bins(df["person_income"], "person_income")
+        else:
+            edges = _sketch_quantile(df["person_income"], INCOME_QUANTILES, rank_error)
+            income_bins = bins_from_edges(edges, "person_income")
+        # w razie patologii z kwantylami – po prostu nie tworzymy binu dochodu
+        if income_bins is not None:
+            fitted["bins"]["person_income_bin"] = income_bins
+
+    _add_bin_columns(df, fitted["bins"])
 
     # 8) Stabilny identyfikator wiersza do kontroli przecieków
-    id_col = (params or {}).get("id_col", "_row_id")
+    id_col = cfg["id_col"]
     if id_col not in df.columns:
         df = df.reset_index(drop=True)
         df[id_col] = df.index.astype(int)
+    fitted["id_col"] = id_col
+
+    return df, _to_builtin(fitted)
+
+
+def clean_data(df: pd.DataFrame, params: dict | None = None) -> pd.DataFrame:
+    """Czyszczenie danych (patrz `fit_clean_data`) – zwraca same dane."""
+    cleaned, _ = fit_clean_data(df, params)
+    return cleaned
+
+
+# ----------------- Cleaning paczkami (out-of-core) ----------------- #
+
+#   Dwa przebiegi po pliku czytanym paczkami (CSVDataset z `chunksize`):
+#   1) `fit_clean_data_chunked` - scalane szkice KLL kolumn liczbowych
+#      (albo, w trybie exact, liczności wartości), z których liczone są
+#      parametry jak w `fit_clean_data`,
+#   2) `clean_data_chunked` - transformacje z dopasowanych parametrów,
+#      jedna partycja wyniku na paczkę.
+
+# Klasa wieku w kluczu wiersza: brak (imputowany medianą), w AGE_RANGE, poza
+_AGE_MISSING, _AGE_IN, _AGE_OUT = 0, 1, 2
+
+_KEY_LEVELS = ["pattern", "age"]
+
+
+def _as_chunks(data: pd.DataFrame | Iterable[pd.DataFrame]) -> Iterable[pd.DataFrame]:
+    """CSVDataset z `chunksize` zwraca iterator paczek, bez niego - DataFrame."""
+    return [data] if isinstance(data, pd.DataFrame) else data
+
+
+def _chunk_summary(
+    chunk: pd.DataFrame, rank_error: float | None = None, seed: int = 0
+) -> dict:
+    """
+    Statystyki paczki do scalenia: liczności wartości każdej kolumny
+    pogrupowane po kluczu wiersza (wzorzec braków, klasa wieku).
+
+    Klucz pozwala po całym pliku odtworzyć filtry wierszy z `fit_clean_data`
+    (nadmiar NaN w wierszu, zakres wieku), choć usuwane kolumny i mediana
+    wieku nie są jeszcze znane. Wzorzec braków to liczba całkowita Pythona
+    (bit `i` = brak w kolumnie `i`), więc liczba kolumn nie jest ograniczona.
+
+    Przy `rank_error` kolumny numeryczne mają szkic KLL per klucz (rozmiar
+    niezależny od danych); `seed` (numer paczki) rozdziela losowość szkiców
+    różnych paczek. Bez niego (tryb exact) trzymane są liczności wszystkich
+    wartości - dla kolumn ciągłych rosną z liczbą wierszy, więc ten tryb
+    mieści się w pamięci tylko wtedy, gdy mieści się w niej cały plik.
+    """
+    chunk = chunk.apply(_to_numeric_if_possible)
+    columns = list(chunk.columns)
+
+    # unikalne wzorce braków kodowane raz, wiersze dostają kod swojego wzorca
+    unique, inverse = np.unique(chunk.isna().to_numpy(), axis=0, return_inverse=True)
+    codes = [sum(1 << int(i) for i in np.flatnonzero(row)) for row in unique]
+    pattern = np.array(codes, dtype=object)[inverse.ravel()]
+    age_class = np.full(len(chunk), _AGE_MISSING, dtype=np.int64)
+    numeric = _dtype_cols(chunk, numeric=True)
+    if "person_age" in numeric:
+        age = chunk["person_age"].to_numpy(dtype=np.float64)
+        in_range = (age >= AGE_RANGE[0]) & (age <= AGE_RANGE[1])
+        age_class[~np.isnan(age)] = _AGE_OUT
+        age_class[in_range] = _AGE_IN
+
+    keys = pd.DataFrame({"pattern": pattern, "age": age_class})
+    groups = keys.groupby(_KEY_LEVELS).indices
+    counts: dict = {}
+    for j, c in enumerate(columns):
+        if rank_error is not None and c in numeric:
+            values = chunk[c].to_numpy(dtype=np.float64)
+            counts[c] = {
+                key: KLLSketch(rank_error, seed=[seed, j, *key]).update(values[rows])
+                for key, rows in groups.items()
+            }
+        else:
+            counts[c] = (
+                keys.assign(value=chunk[c].to_numpy())
+                .groupby(_KEY_LEVELS + ["value"])
+                .size()
+            )
+    return {
+        "columns": columns,
+        "numeric": {c: c in numeric for c in columns},
+        "rows": keys.groupby(_KEY_LEVELS).size(),
+        "counts": counts,
+    }
+
+
+def _merge_counts(total, part):
+    """Scalenie liczności (Series) albo szkiców per klucz (dict)."""
+    if isinstance(total, pd.Series) and isinstance(part, pd.Series):
+        return total.add(part, fill_value=0)
+    if isinstance(total, dict) and isinstance(part, dict):
+        for key, sketch in part.items():
+            total[key] = total[key].merge(sketch) if key in total else sketch
+        return total
+    raise ValueError("Kolumna jest liczbowa tylko w części paczek - brak wspólnego szkicu")
 
-    return df
+
+def _merge_summaries(total: dict | None, part: dict) -> dict:
+    """Scalenie statystyk dwóch części pliku (dodawanie liczności)."""
+    if total is None:
+        return part
+    if part["columns"] != total["columns"]:
+        raise ValueError(
+            f"Paczki mają różne kolumny: {total['columns']} vs {part['columns']}"
+        )
+    columns = total["columns"]
+    return {
+        "columns": columns,
+        "numeric": {c: total["numeric"][c] and part["numeric"][c] for c in columns},
+        "rows": total["rows"].add(part["rows"], fill_value=0),
+        "counts": {c: _merge_counts(total["counts"][c], part["counts"][c]) for c in columns},
+    }
+
+
+def _counts_aggregate(values: np.ndarray, counts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Posortowane unikalne wartości i zsumowane liczności."""
+    unique, inverse = np.unique(values, return_inverse=True)
+    return unique, np.bincount(inverse, weights=counts, minlength=len(unique))
+
+
+def _counts_median(values: np.ndarray, counts: np.ndarray) -> float:
+    """Mediana jak `Series.median` (średnia dwóch środkowych przy parzystym n)."""
+    n = int(counts.sum())
+    if n == 0:
+        return np.nan
+    cum = np.cumsum(counts)
+    lo = values[np.searchsorted(cum, (n - 1) // 2, side="right")]
+    hi = values[np.searchsorted(cum, n // 2, side="right")]
+    return (lo + hi) / 2
+
+
+def _counts_mean_std(values: np.ndarray, counts: np.ndarray) -> tuple[float, float]:
+    """Średnia i odchylenie standardowe (ddof=0) - z dokładnością do zaokrągleń."""
+    n = counts.sum()
+    if n == 0:
+        return np.nan, np.nan
+    mu = (values * counts).sum() / n
+    return mu, np.sqrt((((values - mu) ** 2) * counts).sum() / n)
+
+
+def _counts_clip(values, counts, low, high) -> tuple[np.ndarray, np.ndarray]:
+    """Rozkład po clippingu (granica NaN = brak ograniczenia)."""
+    low = -np.inf if pd.isna(low) else low
+    high = np.inf if pd.isna(high) else high
+    return _counts_aggregate(np.clip(values, low, high), counts)
+
+
+def _fit_from_summary(summary: dict, params: dict | None = None) -> dict:
+    """
+    Parametry cleaningu ze scalonych statystyk - kroki i kolejność jak
+    w `fit_clean_data`. Imputacja i clipping zmieniają tylko liczności
+    (braki dochodzą do wartości imputacji, ogony do granic), więc mediany,
+    percentyle, granice IQR i krawędzie binów są identyczne jak przy
+    pełnej ramce; średnie i odchylenia (strategia "mean", z-score) - z
+    dokładnością do zaokrągleń. Ze szkicami (tryb "approximate") te same
+    kroki działają na próbkach szkicu z wagami.
+    """
+    cfg = _clean_config(params)
+    target = cfg["target"]
+    fitted = _empty_fitted(target)
+
+    columns = summary["columns"]
+    rows = summary["rows"]
+    n_rows = int(rows.sum())
+    n_key = rows.to_numpy()
+    pattern = rows.index.get_level_values("pattern").to_numpy()
+    age_class = rows.index.get_level_values("age").to_numpy()
+    is_na = {c: ((pattern >> i) & 1).astype(bool) for i, c in enumerate(columns)}
+
+    # 2) Usuwanie kolumn/wierszy z nadmiarem NaN
+    col_na_ratio = {c: n_key[is_na[c]].sum() / n_rows for c in columns}
+    cols_to_drop = [c for c in columns if col_na_ratio[c] > cfg["col_missing_thresh"]]
+    if target in cols_to_drop:
+        cols_to_drop.remove(target)
+    fitted["dropped_columns"] = cols_to_drop
+    kept = [c for c in columns if c not in cols_to_drop]
+
+    if kept:
+        row_na_ratio = sum(is_na[c].astype(np.int64) for c in kept) / len(kept)
+        keep = ~(row_na_ratio > cfg["row_missing_thresh"])
+    else:
+        keep = np.ones(len(rows), dtype=bool)
+
+    def value_counts(col: str) -> pd.Series:
+        counts = summary["counts"][col]
+        mask = counts.index.droplevel("value").isin(rows.index[keep])
+        return counts[mask].groupby(level="value").sum()
+
+    def distribution(col: str) -> tuple[np.ndarray, np.ndarray]:
+        counts = summary["counts"][col]
+        if isinstance(counts, dict):
+            # szkice: próbki z wagami zamiast liczności wartości
+            sketches = [counts[key] for key in rows.index[keep] if key in counts]
+            if not sketches:
+                return np.empty(0), np.empty(0)
+            merged = KLLSketch(sketches[0].rank_error)
+            for sketch in sketches:
+                merged.merge(sketch)
+            return merged.items()
+        vc = value_counts(col)
+        return vc.index.to_numpy(dtype=np.float64), vc.to_numpy(dtype=np.float64)
+
+    # 3) Imputacja (bez targetu)
+    num_cols = [c for c in kept if summary["numeric"][c]]
+    impute: dict = {}
+    for c in num_cols:
+        if c == target:
+            continue
+        if cfg["num_strategy"] == "median":
+            impute[c] = _counts_median(*distribution(c))
+        elif cfg["num_strategy"] == "mean":
+            impute[c] = _counts_mean_std(*distribution(c))[0]
+        else:
+            raise ValueError(f"Unknown num_strategy={cfg['num_strategy']}")
+    for c in kept:
+        if c == target or c in num_cols:
+            continue
+        if cfg["cat_strategy"] != "most_frequent":
+            raise ValueError(f"Unknown cat_strategy={cfg['cat_strategy']}")
+        vc = value_counts(c)
+        impute[c] = vc.index[vc.to_numpy() == vc.max()][0] if len(vc) else ""
+    fitted["impute"] = impute
+
+    # 4) Zakres wieku - braki wieku mają wartość imputacji
+    if "person_age" in num_cols:
+        age_fill = impute.get("person_age", np.nan)
+        fill_in_range = AGE_RANGE[0] <= age_fill <= AGE_RANGE[1]
+        keep &= (age_class == _AGE_IN) | ((age_class == _AGE_MISSING) & fill_in_range)
+        fitted["age_range"] = list(AGE_RANGE)
+
+    # rozkłady kolumn numerycznych po imputacji (w wierszach, które zostają)
+    dists = {}
+    for c in num_cols:
+        values, counts = distribution(c)
+        fill = impute.get(c, np.nan)
+        n_missing = n_key[keep & is_na[c]].sum()
+        if n_missing and not pd.isna(fill):
+            values, counts = _counts_aggregate(
+                np.append(values, fill), np.append(counts, n_missing)
+            )
+        dists[c] = (values, counts)
+
+    for col, cap in DOMAIN_CLIP_CAPS.items():
+        if col in num_cols:
+            q_hi = weighted_quantile(*dists[col], 0.99)
+            upper = q_hi if cap is None else min(q_hi, cap)
+            dists[col] = _counts_clip(*dists[col], 0, upper)
+            fitted["domain_clip"][col] = [0, upper]
+
+    # 5) Ogólny clipping outlierów (bez targetu i wieku)
+    method = cfg["out_method"]
+    for c in num_cols:
+        if c in (target, "person_age"):
+            continue
+        if method == "iqr":
+            q1, q3 = weighted_quantile(*dists[c], [0.25, 0.75])
+            iqr = q3 - q1
+            low, high = q1 - cfg["iqr_factor"] * iqr, q3 + cfg["iqr_factor"] * iqr
+        elif method == "zscore":
+            mu, sigma = _counts_mean_std(*dists[c])
+            if sigma == 0 or np.isnan(sigma):
+                continue
+            low, high = mu - cfg["zscore_thresh"] * sigma, mu + cfg["zscore_thresh"] * sigma
+        else:
+            raise ValueError(f"Unknown outlier method={method}")
+        dists[c] = _counts_clip(*dists[c], low, high)
+        fitted["outlier_clip"][c] = [low, high]
+
+    # 7) Biny wieku i dochodu
+    if "person_age" in kept:
+        fitted["bins"]["person_age_bin"] = dict(AGE_BINS)
+    if "person_income" in num_cols:
+        edges = weighted_quantile(*dists["person_income"], INCOME_QUANTILES)
+        income_bins = bins_from_edges(edges, "person_income")
+        if income_bins is not None:
+            fitted["bins"]["person_income_bin"] = income_bins
+
+    fitted["id_col"] = cfg["id_col"]
+    fitted["numeric_columns"] = num_cols
+    return _to_builtin(fitted)
+
+
+def _clean_chunk(chunk: pd.DataFrame, fitted: dict, params: dict | None = None) -> pd.DataFrame:
+    """Cleaning jednej paczki dopasowanymi parametrami (kroki jak w `fit_clean_data`)."""
+    cfg = _clean_config(params)
+    df = chunk.drop(columns=fitted["dropped_columns"])
+    for c in fitted["numeric_columns"]:
+        if df[c].dtype == "object":
+            df[c] = pd.to_numeric(df[c])
+
+    row_na_ratio = df.isna().mean(axis=1)
+    df = df.loc[~(row_na_ratio > cfg["row_missing_thresh"])]
+    df = df.fillna(fitted["impute"])
+
+    if fitted["age_range"]:
+        low, high = fitted["age_range"]
+        df = df.loc[(df["person_age"] >= low) & (df["person_age"] <= high)].copy()
+    for col, (low, high) in fitted["domain_clip"].items():
+        df[col] = df[col].clip(lower=low, upper=high)
+    df = _apply_clip(df, {c: tuple(b) for c, b in fitted["outlier_clip"].items()})
+
+    if "person_age" in df.columns:
+        df["person_age"] = df["person_age"].round().astype("int64")
+    _add_bin_columns(df, fitted["bins"])
+    return df.reset_index(drop=True)
+
+
+def fit_clean_data_chunked(
+    raw_chunks: pd.DataFrame | Iterable[pd.DataFrame], params: dict | None = None
+) -> dict:
+    """
+    Pass 1 cleaningu paczkami: parametry jak z `fit_clean_data` (braki,
+    mediany, mody, percentyle, granice IQR, biny dochodu) bez wczytywania
+    całego pliku. W pamięci jest jedna paczka i scalone szkice KLL kolumn
+    liczbowych (`quantiles.chunked_mode: approximate`, domyślnie). Tryb
+    `chunked_mode: exact` scala liczności wszystkich wartości - daje wynik
+    identyczny z `fit_clean_data`, ale tylko dla plików mieszczących się w pamięci.
+    """
+    rank_error = _clean_config(params, chunked=True)["rank_error"]
+    summary = None
+    for i, chunk in enumerate(_as_chunks(raw_chunks)):
+        summary = _merge_summaries(summary, _chunk_summary(chunk, rank_error, seed=i))
+    if summary is None:
+        raise ValueError("[fit_clean_data_chunked] Pusty plik wejściowy")
+    return _fit_from_summary(summary, params)
+
+
+def clean_data_chunked(
+    raw_chunks: pd.DataFrame | Iterable[pd.DataFrame],
+    fitted: dict,
+    params: dict | None = None,
+) -> Iterator[dict[str, pd.DataFrame]]:
+    """
+    Pass 2 cleaningu paczkami: każda paczka po transformacjach z `fitted`
+    jest od razu zapisywana jako osobna partycja (`part-00000`, ...).
+    `_row_id` jest ciągły w całym pliku, jak w `clean_data`.
+    """
+    id_col = fitted.get("id_col", "_row_id")
+    offset = 0
+    for i, chunk in enumerate(_as_chunks(raw_chunks)):
+        part = _clean_chunk(chunk, fitted, params)
+        if id_col not in part.columns:
+            part[id_col] = np.arange(offset, offset + len(part), dtype=np.int64)
+        offset += len(part)
+        yield {f"part-{i:05d}": part}
 
 
 # ----------------- Scaling ----------------- #
@@ -236,10 +785,7 @@ def scale_data(df: pd.DataFrame, params: dict | None = None) -> pd.DataFrame:
     id_col = p.get("id_col", "_row_id")
 
     df = df.copy()
-    num_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-    for col in [target, id_col]:
-        if col in num_cols:
-            num_cols.remove(col)
+    num_cols = _num_cols_excluding(df, [target, id_col])
 
     if num_cols:
         scaler = StandardScaler()
@@ -248,6 +794,38 @@ def scale_data(df: pd.DataFrame, params: dict | None = None) -> pd.DataFrame:
     return df
 
 
+# ----------------- Artefakt preprocessingu ----------------- #
+
+
+def build_preprocessor(
+    df: pd.DataFrame,
+    clean_params: dict,
+    params: dict | None = None,
+) -> dict:
+    """
+    Artefakt z dopasowanymi transformacjami do użycia poza Kedro (API):
+    parametry cleaningu z `fit_clean_data` plus średnie i skale
+    StandardScalera liczone tak samo jak w `scale_data`.
+    """
+    p = params or {}
+    target = p.get("target")
+    id_col = p.get("id_col", "_row_id")
+
+    num_cols = _num_cols_excluding(df, [target, id_col])
+    scaler = StandardScaler()
+    if num_cols:
+        scaler.fit(df[num_cols])
+
+    artifact = dict(clean_params)
+    artifact["scaler"] = {
+        "columns": num_cols,
+        "mean": scaler.mean_.tolist() if num_cols else [],
+        "scale": scaler.scale_.tolist() if num_cols else [],
+    }
+    artifact["version"] = PREPROCESSOR_VERSION
+    return _to_builtin(artifact)
+
+
 # ----------------- Split ----------------- #
 
 
@@ -511,6 +1089,7 @@ def build_preprocessing_report(
     p = params or {}
     target = p.get("target")
     id_col = p.get("id_col", "_row_id")
+    rank_error = _clean_config(params)["rank_error"]
 
     tol_mean = scaled_rep.get("tol_mean", 1e-6)
     tol_std = scaled_rep.get("tol_std", 1e-3)
@@ -538,11 +1117,15 @@ def build_preprocessing_report(
         desc = {}
         for c in cols:
             s = df[c].astype(float)
+            if rank_error is None:
+                p25, median, p75 = np.nanpercentile(s, 25), np.nanmedian(s), np.nanpercentile(s, 75)
+            else:
+                p25, median, p75 = _sketch_quantile(s, [0.25, 0.5, 0.75], rank_error)
             desc[c] = {
                 "min": float(np.nanmin(s)),
-                "p25": float(np.nanpercentile(s, 25)),
-                "median": float(np.nanmedian(s)),
-                "p75": float(np.nanpercentile(s, 75)),
+                "p25": float(p25),
+                "median": float(median),
+                "p75": float(p75),
                 "max": float(np.nanmax(s)),
                 "mean": float(np.nanmean(s)),
                 "std": float(np.nanstd(s)),
@@ -572,6 +1155,12 @@ def build_preprocessing_report(
     md.append("")
     md.append(f"_Generated: {now}_")
     md.append("")
+    if rank_error is not None:
+        md.append(
+            f"_Kwantyle (p25 / median / p75, progi clippingu, biny) przyblizone "
+            f"szkicem KLL, blad rangi <= {rank_error}_"
+        )
+        md.append("")
 
     # 1) Cleaning
     md.append("## 1) Cleaning - braki i zmiany")
@@ -1,6 +1,9 @@
 from kedro.pipeline import Pipeline, node, pipeline
 from .nodes import (
-    clean_data,
+    build_preprocessor,
+    clean_data_chunked,
+    fit_clean_data,
+    fit_clean_data_chunked,
     scale_data,
     split_data,
     validate_clean,
@@ -14,11 +17,17 @@ def create_pipeline(**kwargs) -> Pipeline:
     return pipeline(
         [
             node(
-                clean_data,
+                fit_clean_data,
                 inputs=["credit_raw", "params:preprocessing"],
-                outputs="clean_data",
+                outputs=["clean_data", "clean_params"],
                 name="clean_data_node",
             ),
+            node(
+                build_preprocessor,
+                inputs=["clean_data", "clean_params", "params:preprocessing"],
+                outputs="preprocessor",
+                name="build_preprocessor_node",
+            ),
             node(
                 validate_clean,
                 inputs=["clean_data", "params:preprocessing"],
@@ -65,3 +74,23 @@ def create_pipeline(**kwargs) -> Pipeline:
             ),
         ]
     )
+
+
+def create_chunked_pipeline(**kwargs) -> Pipeline:
+    """Cleaning pliku większego niż pamięć: dwa przebiegi po paczkach CSV."""
+    return pipeline(
+        [
+            node(
+                fit_clean_data_chunked,
+                inputs=["credit_raw_chunks", "params:preprocessing"],
+                outputs="clean_params_chunked",
+                name="fit_clean_data_chunked_node",
+            ),
+            node(
+                clean_data_chunked,
+                inputs=["credit_raw_chunks", "clean_params_chunked", "params:preprocessing"],
+                outputs="clean_data_parts",
+                name="clean_data_chunked_node",
+            ),
+        ]
+    )
@@ -3,7 +3,13 @@ import numpy as np
 import pytest
 
 from .nodes import (
+    _clip_outliers,
+    _impute,
+    build_preprocessor,
     clean_data,
+    clean_data_chunked,
+    fit_clean_data,
+    fit_clean_data_chunked,
     scale_data,
     split_data,
     validate_clean,
@@ -53,6 +59,230 @@ def test_clean_data_person_age_and_bins():
         assert result["person_income_bin"].isna().sum() == 0
 
 
+def test_fit_clean_data_params_reproduce_cleaning():
+    """Dopasowane parametry pozwalaja odtworzyc clipping i biny z clean_data."""
+    df = pd.DataFrame(
+        {
+            "person_age": [20, 25, 30, 40, 50, 60, 70, 22],
+            "person_income": [20000, 30000, np.nan, 50000, 60000, 1e6, 45000, 35000],
+            "person_emp_length": [0, 1, 2, 3, 4, 5, 60, 2],
+            "loan_grade": ["A", "B", None, "B", "C", "B", "A", "D"],
+        }
+    )
+
+    result, fitted = fit_clean_data(df, params={})
+    pd.testing.assert_frame_equal(result, clean_data(df, params={}))
+
+    assert fitted["impute"]["person_income"] == df["person_income"].median()
+    assert fitted["impute"]["loan_grade"] == "B"
+
+    # clipping z artefaktu (domenowy, potem IQR) daje to samo co cleaning
+    income = df["person_income"].fillna(fitted["impute"]["person_income"])
+    for step in ("domain_clip", "outlier_clip"):
+        low, high = fitted[step]["person_income"]
+        income = income.clip(lower=low, upper=high)
+    np.testing.assert_allclose(income.values, result["person_income"].values)
+
+    income_bin = fitted["bins"]["person_income_bin"]
+    assert income_bin["labels"] == [
+        str(c) for c in result["person_income_bin"].cat.categories
+    ]
+
+
+def _mixed_frame():
+    rng = np.random.default_rng(0)
+    n = 200
+    df = pd.DataFrame(
+        {
+            "person_age": rng.integers(18, 90, n),
+            "person_income": rng.lognormal(10, 1, n),
+            "loan_int_rate": rng.normal(11, 3, n),
+            "loan_grade": rng.choice(["A", "B", "C"], n),
+            "loan_status": rng.integers(0, 2, n),
+        }
+    )
+    df.loc[::7, "person_income"] = np.nan
+    df.loc[::11, "loan_grade"] = None
+    return df
+
+
+def _clip_outliers_per_column(df, method, exclude):
+    """
+    Poprzednia implementacja _clip_outliers (petla po kolumnach).
+
+    Z-score przez `mask` zamiast `df.loc[z > 3, c] = ...` - zapis przez `loc`
+    zamienial kolumny calkowite na float64 (pandas 2) albo rzucal TypeError
+    (pandas 3). Typy jak w `Series.clip`: kolumna calkowita bez przycietych
+    wartosci niecalkowitych pozostaje calkowita.
+    """
+    df = df.copy()
+    num_cols = [c for c in df.select_dtypes(include=[np.number]).columns if c not in exclude]
+    for c in num_cols:
+        if method == "iqr":
+            q1, q3 = df[c].quantile([0.25, 0.75])
+            iqr = q3 - q1
+            df[c] = df[c].clip(lower=q1 - 1.5 * iqr, upper=q3 + 1.5 * iqr)
+        else:
+            mu, sigma = df[c].mean(), df[c].std(ddof=0)
+            if sigma == 0 or np.isnan(sigma):
+                continue
+            z = (df[c] - mu) / sigma
+            df[c] = df[c].mask(z > 3.0, mu + 3.0 * sigma).mask(z < -3.0, mu - 3.0 * sigma)
+    return df
+
+
+def test_impute_and_clip_match_per_column():
+    """Imputacja i clipping na bloku daja dokladnie wynik petli po kolumnach."""
+    df = _mixed_frame()
+    exclude = {"loan_status"}
+
+    expected = df.copy()
+    for c in ("person_age", "person_income", "loan_int_rate"):
+        expected[c] = expected[c].fillna(expected[c].median())
+    expected["loan_grade"] = expected["loan_grade"].fillna(
+        expected["loan_grade"].mode().iloc[0]
+    )
+    imputed = _impute(df, "median", "most_frequent", exclude)
+    pd.testing.assert_frame_equal(imputed, expected, check_exact=True)
+
+    for method in ("iqr", "zscore"):
+        expected_clip = _clip_outliers_per_column(imputed, method, exclude)
+        clipped = _clip_outliers(imputed, method, exclude=exclude)
+        pd.testing.assert_frame_equal(
+            clipped, expected_clip, check_dtype=True, check_exact=True
+        )
+
+
+def test_impute_and_clip_return_independent_frames():
+    """Wynik jest nowa ramka - zmiana wyniku nie zmienia wejscia."""
+    df = _mixed_frame()
+    before = df.copy()
+    for result in (
+        _impute(df, "median", "most_frequent", {"loan_status"}),
+        _clip_outliers(df, "iqr", exclude={"loan_status"}),
+    ):
+        result.iloc[0, 0] = -1
+        result.loc[0, "loan_grade"] = "Z"
+    pd.testing.assert_frame_equal(df, before)
+
+
+def _raw_with_gaps():
+    df = _mixed_frame()
+    df["person_age"] = df["person_age"].astype(float)
+    df.loc[[3, 50], "person_age"] = [15.0, 120.0]
+    df.loc[[5, 60], "person_age"] = np.nan
+    df.loc[::13, "loan_int_rate"] = np.nan
+    df.loc[[7, 8], ["person_age", "person_income", "loan_int_rate", "loan_grade"]] = np.nan
+    return df
+
+
+def _chunks(df, size):
+    return (df.iloc[i : i + size] for i in range(0, len(df), size))
+
+
+def test_chunked_cleaning_matches_clean_data():
+    """Dwa przebiegi po paczkach (tryb exact) daja te same parametry i dane co clean_data."""
+    df = _raw_with_gaps()
+    params = {"target": "loan_status", "clean": {"quantiles": {"chunked_mode": "exact"}}}
+    expected, expected_fitted = fit_clean_data(df, params)
+
+    fitted = fit_clean_data_chunked(_chunks(df, 37), params)
+    assert fitted["numeric_columns"] == [
+        "person_age", "person_income", "loan_int_rate", "loan_status"
+    ]
+    assert {k: v for k, v in fitted.items() if k != "numeric_columns"} == expected_fitted
+
+    parts = list(clean_data_chunked(_chunks(df, 37), fitted, params))
+    assert [list(p) for p in parts][:2] == [["part-00000"], ["part-00001"]]
+    result = pd.concat([next(iter(p.values())) for p in parts], ignore_index=True)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False, check_exact=True)
+
+
+def test_chunked_cleaning_drops_columns_and_rows():
+    """Kolumny i wiersze z nadmiarem NaN sa usuwane jak w clean_data."""
+    df = _raw_with_gaps()
+    df["mostly_empty"] = np.nan
+    df.loc[:9, "mostly_empty"] = 1.0
+    params = {
+        "target": "loan_status",
+        "clean": {"row_missing_thresh": 0.5, "quantiles": {"chunked_mode": "exact"}},
+    }
+    expected, expected_fitted = fit_clean_data(df, params)
+
+    fitted = fit_clean_data_chunked(_chunks(df, 64), params)
+    assert fitted["dropped_columns"] == expected_fitted["dropped_columns"] == ["mostly_empty"]
+    result = pd.concat(
+        [next(iter(p.values())) for p in clean_data_chunked(_chunks(df, 64), fitted, params)],
+        ignore_index=True,
+    )
+    assert len(result) == len(expected) < len(df)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+def test_chunked_cleaning_handles_many_columns():
+    """Wzorzec brakow nie ogranicza liczby kolumn (wiecej niz 64 bity)."""
+    df = _raw_with_gaps()
+    for i in range(70):
+        df[f"extra_{i}"] = np.where(np.arange(len(df)) % (i + 2) == 0, np.nan, float(i))
+    params = {"target": "loan_status", "clean": {"quantiles": {"chunked_mode": "exact"}}}
+    _, expected_fitted = fit_clean_data(df, params)
+
+    fitted = fit_clean_data_chunked(_chunks(df, 37), params)
+    assert {k: v for k, v in fitted.items() if k != "numeric_columns"} == expected_fitted
+
+
+def test_approximate_quantiles_close_to_exact():
+    """Tryb approximate (szkic KLL) daje progi w granicach bledu rangi, takze paczkami."""
+    rng = np.random.default_rng(1)
+    n = 20000
+    df = pd.DataFrame(
+        {
+            "person_age": rng.integers(18, 80, n),
+            "person_income": rng.lognormal(11, 0.6, n),
+            "loan_percent_income": rng.uniform(0, 0.9, n),
+            "loan_status": rng.integers(0, 2, n),
+        }
+    )
+    df.loc[::9, "person_income"] = np.nan
+    error = 0.005
+    params = {
+        "target": "loan_status",
+        "clean": {"quantiles": {"mode": "approximate", "rank_error": error}},
+    }
+    _, exact = fit_clean_data(df, {"target": "loan_status"})
+    _, approx = fit_clean_data(df, params)
+    # cleaning paczkami domyślnie używa szkiców
+    chunked = fit_clean_data_chunked(_chunks(df, 3000), {"target": "loan_status"})
+
+    income = df["person_income"].dropna().sort_values().to_numpy()
+    for fitted in (approx, chunked):
+        q_hi = fitted["domain_clip"]["person_income"][1]
+        rank = np.searchsorted(income, q_hi) / len(income)
+        assert abs(rank - 0.99) <= 2 * error
+        edges = fitted["bins"]["person_income_bin"]["edges"]
+        assert len(edges) == len(exact["bins"]["person_income_bin"]["edges"])
+        assert edges[0] == exact["bins"]["person_income_bin"]["edges"][0]
+
+    clipped = _clip_outliers(df, "iqr", exclude={"loan_status"}, rank_error=error)
+    expected = _clip_outliers(df, "iqr", exclude={"loan_status"})
+    np.testing.assert_allclose(clipped.max(), expected.max(), rtol=0.02)
+
+
+def test_build_preprocessor_matches_scale_data():
+    """Parametry scalera w artefakcie odpowiadaja skalowaniu w scale_data."""
+    df = pd.DataFrame(
+        {"x": [1.0, 2.0, 3.0], "y": [10.0, 20.0, 60.0], "_row_id": [0, 1, 2]}
+    )
+    artifact = build_preprocessor(df, {"bins": {}}, params={})
+    assert artifact["scaler"]["columns"] == ["x", "y"]
+    assert artifact["bins"] == {}
+
+    scaled = scale_data(df, params={})
+    mean = np.asarray(artifact["scaler"]["mean"])
+    scale = np.asarray(artifact["scaler"]["scale"])
+    np.testing.assert_allclose((df[["x", "y"]] - mean) / scale, scaled[["x", "y"]])
+
+
 def test_scale_data_stats():
     df = pd.DataFrame({"x": [1, 2, 3], "y": [10, 20, 30]})
     scaled = scale_data(df, params={})
@@ -0,0 +1,135 @@
+"""
+Kwantyle bez sortowania całych kolumn: scalany szkic KLL.
+
+`KLLSketch` przyjmuje wartości paczkami (`update`), szkice z różnych paczek
+lub procesów łączy `merge`, a `quantile` zwraca kwantyle z błędem rangi
+najwyżej ok. `rank_error` (ułamek liczby wartości). Pamięć zależy od
+`rank_error`, a nie od liczby wartości.
+
+Szkic trzyma poziomy posortowanych próbek; próbka z poziomu h reprezentuje
+2^h wartości. Przepełniony poziom jest kompaktowany: co druga wartość (od
+losowego przesunięcia) przechodzi poziom wyżej. Losowość pochodzi z `seed`,
+więc ten sam ciąg wywołań daje ten sam wynik.
+
+`weighted_quantile` liczy kwantyl jak `np.quantile` (interpolacja liniowa)
+z posortowanych wartości i ich wag - dokładnie dla liczności wartości,
+w przybliżeniu dla próbek szkicu.
+
+Moduł zależy tylko od NumPy (jak `binning.py`).
+"""
+
+import numpy as np
+
+# Współczynnik zmniejszania pojemności kolejnych (niższych) poziomów
+_CAPACITY_DECAY = 2 / 3
+
+
+def sketch_k(rank_error: float) -> int:
+    """
+    Pojemność najwyższego poziomu dla zadanego błędu rangi.
+
+    Zależność empiryczna dla KLL (błąd ~ 2.3 / k^0.97, jak w Apache
+    DataSketches), zaokrąglona w górę.
+    """
+    if not 0 < rank_error < 1:
+        raise ValueError(f"rank_error musi być w (0, 1), jest {rank_error}")
+    return max(int(np.ceil((2.296 / rank_error) ** (1 / 0.9723))), 8)
+
+
+def weighted_quantile(values: np.ndarray, weights: np.ndarray, q):
+    """
+    Kwantyl(e) z posortowanych wartości i wag - jak `np.quantile` na
+    kolumnie, w której każda wartość występuje `weight` razy.
+    """
+    n = int(weights.sum())
+    q = np.asarray(q, dtype=np.float64)
+    if n == 0:
+        return np.full(q.shape, np.nan)[()]
+    virtual = (n - 1) * q
+    prev = np.floor(virtual)
+    gamma = virtual - prev
+    cum = np.cumsum(weights)
+    a = values[np.searchsorted(cum, prev, side="right")]
+    b = values[np.searchsorted(cum, np.minimum(prev + 1, n - 1), side="right")]
+    diff = b - a
+    return np.where(gamma >= 0.5, b - diff * (1 - gamma), a + diff * gamma)[()]
+
+
+class KLLSketch:
+    """Scalany szkic kwantyli KLL dla wartości liczbowych (NaN są pomijane)"""
+
+    def __init__(self, rank_error: float = 0.001, seed=0):
+        self.rank_error = float(rank_error)
+        self.k = sketch_k(self.rank_error)
+        self.n = 0
+        self.min = np.nan
+        self.max = np.nan
+        self._levels: list[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        """Liczba przechowywanych próbek (nie wartości)"""
+        return sum(len(level) for level in self._levels)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - level - 1
+        return max(int(np.ceil(self.k * _CAPACITY_DECAY**depth)), 2)
+
+    def _compress(self) -> None:
+        """Kompaktowanie przepełnionych poziomów (od najniższego) do łącznej pojemności"""
+        while len(self) > sum(self._capacity(h) for h in range(len(self._levels))):
+            h = next(h for h, level in enumerate(self._levels) if len(level) >= self._capacity(h))
+            if h + 1 == len(self._levels):
+                self._levels.append(np.empty(0))
+            items = np.sort(self._levels[h])
+            # przy nieparzystej liczbie największa wartość zostaje na poziomie
+            even = len(items) - len(items) % 2
+            promoted = items[int(self._rng.integers(2)):even:2]
+            self._levels[h] = items[even:]
+            self._levels[h + 1] = np.concatenate([self._levels[h + 1], promoted])
+
+    def update(self, values) -> "KLLSketch":
+        """Dodanie paczki wartości; zwraca ten sam szkic"""
+        x = np.asarray(values, dtype=np.float64).ravel()
+        x = x[~np.isnan(x)]
+        if len(x) == 0:
+            return self
+        self.n += len(x)
+        self.min = np.fmin(self.min, x.min())
+        self.max = np.fmax(self.max, x.max())
+        self._levels[0] = np.concatenate([self._levels[0], x])
+        self._compress()
+        return self
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """Dołączenie innego szkicu (np. z innej paczki lub procesu); zwraca ten szkic"""
+        if other.k != self.k:
+            raise ValueError(f"Szkice o różnej dokładności: k={self.k} vs k={other.k}")
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for h, level in enumerate(other._levels):
+            self._levels[h] = np.concatenate([self._levels[h], level])
+        self.n += other.n
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+        self._compress()
+        return self
+
+    def items(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Posortowane próbki i ich wagi (suma wag = n). Skrajne próbki są
+        zastąpione dokładnym minimum i maksimum.
+        """
+        values = np.concatenate(self._levels)
+        weights = np.concatenate(
+            [np.full(len(level), 2.0**h) for h, level in enumerate(self._levels)]
+        )
+        order = np.argsort(values, kind="stable")
+        values, weights = values[order], weights[order]
+        if len(values):
+            values[0], values[-1] = self.min, self.max
+        return values, weights
+
+    def quantile(self, q):
+        """Kwantyl(e) jak `np.quantile`; 0 i 1 to dokładne minimum i maksimum"""
+        return weighted_quantile(*self.items(), q)
@@ -0,0 +1,124 @@
+"""
+Testy jednostkowe kontroli przyjmowania żądań (app/admission.py)
+
+Uruchomienie: pytest tests/test_admission.py -v
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.admission import AdmissionController, AdmissionMiddleware
+from app.metrics import ADMISSION_REJECTED
+
+
+class SlowApp:
+    """Aplikacja ASGI odpowiadająca 200 po zwolnieniu zdarzenia `gate`"""
+
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.started = 0
+
+    async def __call__(self, scope, receive, send):
+        self.started += 1
+        await self.gate.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def call(app, path="/predict"):
+    """Wywołanie aplikacji ASGI; zwraca (status, nagłówki, ciało)"""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    await app({"type": "http", "path": path}, receive, send)
+    return messages[0]["status"], dict(messages[0]["headers"]), messages[-1]["body"]
+
+
+def test_admits_up_to_limit_then_queues():
+    """Test: limit współbieżności, kolejne żądanie czeka i dostaje zwolnione miejsce"""
+    async def main():
+        controller = AdmissionController(max_concurrent=2, max_queue=1, queue_timeout=1.0)
+        assert await controller.acquire() is None
+        assert await controller.acquire() is None
+        waiter = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0)
+        assert controller.queued == 1 and not waiter.done()
+        controller.release()
+        assert await waiter is None
+        assert controller.active == 2 and controller.queued == 0
+
+    asyncio.run(main())
+
+
+def test_rejects_when_queue_full():
+    """Test: pełna kolejka - natychmiastowa odmowa queue_full"""
+    async def main():
+        controller = AdmissionController(max_concurrent=1, max_queue=0)
+        before = ADMISSION_REJECTED.value("queue_full")
+        assert await controller.acquire() is None
+        assert await controller.acquire() == "queue_full"
+        assert ADMISSION_REJECTED.value("queue_full") == before + 1
+        controller.release()
+        assert controller.active == 0
+
+    asyncio.run(main())
+
+
+def test_queue_timeout():
+    """Test: żądanie czekające dłużej niż queue_timeout jest odrzucane"""
+    async def main():
+        controller = AdmissionController(max_concurrent=1, max_queue=5, queue_timeout=0.01)
+        await controller.acquire()
+        assert await controller.acquire() == "timeout"
+        assert controller.queued == 0
+        controller.release()
+        assert controller.active == 0
+
+    asyncio.run(main())
+
+
+def test_middleware_returns_429_with_retry_after():
+    """Test: middleware odrzuca nadmiar 429 z Retry-After i nie ogranicza innych ścieżek"""
+    async def main():
+        inner = SlowApp()
+        controller = AdmissionController(max_concurrent=1, max_queue=0)
+        app = AdmissionMiddleware(inner, controller, paths={"/predict"}, retry_after=3)
+
+        first = asyncio.ensure_future(call(app))
+        await asyncio.sleep(0)
+        status, headers, body = await call(app)
+        assert status == 429
+        assert headers[b"retry-after"] == b"3"
+        assert json.loads(body)["reason"] == "queue_full"
+
+        other = asyncio.ensure_future(call(app, "/health"))
+        await asyncio.sleep(0)
+        assert inner.started == 2
+
+        inner.gate.set()
+        assert (await first)[0] == 200
+        assert (await other)[0] == 200
+        assert controller.active == 0
+
+    asyncio.run(main())
+
+
+def test_disabled_controller_passes_through():
+    """Test: max_concurrent=0 - brak limitu"""
+    async def main():
+        inner = SlowApp()
+        inner.gate.set()
+        app = AdmissionMiddleware(inner, AdmissionController(max_concurrent=0), paths={"/predict"})
+        results = await asyncio.gather(*(call(app) for _ in range(5)))
+        assert [status for status, _, _ in results] == [200] * 5
+
+    asyncio.run(main())
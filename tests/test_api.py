@@ -4,15 +4,33 @@ Testy integracyjne dla Credit Scoring API
 Uruchomienie: pytest tests/test_api.py -v
 """
 
-import pytest
-from fastapi.testclient import TestClient
+import asyncio
+import json
+import subprocess
 import sys
+import threading
+import time
 from pathlib import Path
 
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
 # Dodanie ścieżki do modułu app
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import app.main as api
+import app.streaming as streaming
+from app.columnar import read_npz, write_npz
 from app.main import app, load_model_and_scaler
+from app.metrics import (
+    ERRORS,
+    MODEL_LOAD_SECONDS,
+    REQUESTS,
+    STAGE_SECONDS,
+    WARMUP_OVER_BUDGET,
+)
+from app.serve import parse_args, preload
 
 # Ręczne załadowanie modelu przed testami (lifespan nie uruchamia się automatycznie w TestClient)
 load_model_and_scaler()
@@ -195,6 +213,721 @@ class TestPredictValidation:
         assert response.status_code == 422
 
 
+class TestPredictBatchEndpoint:
+    """Testy endpointu predykcji wsadowej"""
+
+    @pytest.fixture
+    def payloads(self):
+        """Kilka różnych profili wnioskodawców"""
+        base = {
+            "person_age": 25,
+            "person_income": 50000,
+            "person_home_ownership": "RENT",
+            "person_emp_length": 3.0,
+            "loan_intent": "PERSONAL",
+            "loan_grade": "B",
+            "loan_amnt": 10000,
+            "loan_int_rate": 10.5,
+            "loan_percent_income": 0.2,
+            "cb_person_default_on_file": "N",
+            "cb_person_cred_hist_length": 4
+        }
+        return [
+            base,
+            {**base, "person_age": 20, "person_income": 15000, "loan_grade": "E",
+             "loan_int_rate": 18.0, "loan_percent_income": 0.67,
+             "cb_person_default_on_file": "Y"},
+            {**base, "person_age": 70, "person_income": 200000, "loan_grade": "A"},
+        ]
+
+    def test_batch_matches_single_predictions(self, payloads):
+        """Test: wyniki wsadowe są identyczne z pojedynczymi wywołaniami /predict"""
+        response = client.post("/predict/batch", json=payloads)
+        assert response.status_code == 200
+        batch = response.json()
+        assert len(batch) == len(payloads)
+        for payload, result in zip(payloads, batch):
+            single = client.post("/predict", json=payload).json()
+            assert result == single
+
+    def test_batch_empty_list(self):
+        """Test: pusta lista zwraca pustą odpowiedź"""
+        response = client.post("/predict/batch", json=[])
+        assert response.status_code == 200
+        assert response.json() == []
+
+    def test_batch_invalid_record(self, payloads):
+        """Test: niepoprawny rekord w liście powinien zwrócić błąd walidacji"""
+        payloads[1]["loan_grade"] = "Z"
+        response = client.post("/predict/batch", json=payloads)
+        assert response.status_code == 422
+
+
+class TestFastPath:
+    """Testy jednowierszowej ścieżki predykcji bez pandas"""
+
+    def test_fast_path_enabled(self):
+        """Test: dla modelu na cechach numerycznych szybka ścieżka jest aktywna"""
+        assert api.fast_path is not None
+
+    @pytest.mark.parametrize("overrides", [
+        {},
+        {"person_age": 20, "person_income": 15000, "loan_percent_income": 0.67},
+        {"person_age": 90, "person_income": 5_000_000, "person_emp_length": 60.0},
+        {"loan_int_rate": 0.0, "loan_amnt": 0, "cb_person_cred_hist_length": 0},
+    ])
+    def test_fast_path_matches_dataframe_path(self, overrides):
+        """Test: FastPath daje identyczny wynik jak ścieżka DataFrame"""
+        example = api.CreditInput.model_json_schema()["examples"][0]
+        data = api.CreditInput(**{**example, **overrides})
+        assert api.fast_path.score(data) == api.predict_dataframe(data)
+
+
+class TestPredictionCache:
+    """Testy cache predykcji w /predict"""
+
+    @pytest.fixture
+    def cache(self, monkeypatch):
+        """Włączony cache na czas testu"""
+        cache = api.PredictionCache(max_entries=100, ttl_seconds=60)
+        cache.reset(api.registry.active.version)
+        monkeypatch.setattr(api, "prediction_cache", cache)
+        return cache
+
+    def test_repeated_request_served_from_cache(self, cache, monkeypatch):
+        """Test: powtórzone żądanie nie wywołuje modelu i jest liczone na /model-info"""
+        example = api.CreditInput.model_json_schema()["examples"][0]
+        first = client.post("/predict", json=example).json()
+
+        def fail(*args, **kwargs):
+            raise AssertionError("model nie powinien być wywołany")
+
+        monkeypatch.setattr(api.fast_path, "score", fail)
+        second = client.post("/predict", json={**example, "person_income": 50000.0})
+        assert second.json() == first
+
+        stats = client.get("/model-info").json()["cache"]
+        assert stats["enabled"] is True
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+
+class TestMicroBatching:
+    """Testy /predict z włączonym mikro-batchingiem"""
+
+    def test_predict_through_micro_batcher(self, monkeypatch):
+        """Test: wynik przez dyspozytora jest taki sam jak bez niego"""
+        example = api.CreditInput.model_json_schema()["examples"][0]
+        expected = client.post("/predict", json=example).json()
+
+        batcher = api.MicroBatcher(
+            api.predict_micro_batch, max_wait_ms=1, record_stages=api.STAGE_SECONDS.record
+        )
+        monkeypatch.setattr(api, "micro_batcher", batcher)
+        response = client.post("/predict", json=example)
+        assert response.status_code == 200
+        assert response.json() == expected
+        assert batcher.stats()["items"] == 1
+
+    def test_batched_predict_has_stage_timing(self, monkeypatch):
+        """Test: Server-Timing żądania z paczki zawiera etapy liczone w wątku puli"""
+        example = api.CreditInput.model_json_schema()["examples"][0]
+        plain = client.post("/predict", json=example).headers["Server-Timing"]
+
+        batcher = api.MicroBatcher(
+            api.predict_micro_batch, max_wait_ms=1, record_stages=api.STAGE_SECONDS.record
+        )
+        monkeypatch.setattr(api, "micro_batcher", batcher)
+        timing = client.post("/predict", json=example).headers["Server-Timing"]
+        names = [part.split(";")[0] for part in timing.split(", ")]
+        assert names == [part.split(";")[0] for part in plain.split(", ")]
+        assert {"features", "scaling", "model"} <= set(names)
+
+
+class TestInferencePool:
+    """Testy trybu z pulą procesów inferencji"""
+
+    @pytest.fixture
+    def pool(self, monkeypatch):
+        """Pula z jednym procesem roboczym na czas testu"""
+        monkeypatch.setattr(api, "INFERENCE_WORKERS", 1)
+        api.start_inference_pool()
+        yield api.inference_pool
+        api.stop_inference_pool()
+
+    def test_pool_predictions_match_in_process(self, pool):
+        """Test: wyniki z procesu roboczego są identyczne z predykcją w procesie API"""
+        example = api.CreditInput.model_json_schema()["examples"][0]
+        payloads = [example, {**example, "loan_grade": "E", "loan_percent_income": 0.6}]
+        expected = [api.predict_one(api.CreditInput(**p)).model_dump() for p in payloads]
+
+        assert client.post("/predict", json=payloads[0]).json() == expected[0]
+        assert client.post("/predict/batch", json=payloads).json() == expected
+        assert pool.stats()["completed"] >= 2
+
+    def test_pool_rejects_when_queue_full(self, pool, monkeypatch):
+        """Test: przepełniona kolejka puli zwraca 503"""
+        monkeypatch.setattr(pool, "queue_depth", 0)
+        example = api.CreditInput.model_json_schema()["examples"][0]
+        response = client.post("/predict", json=example)
+        assert response.status_code == 503
+        assert pool.stats()["rejected"] == 1
+
+
+class TestPredictStreamEndpoint:
+    """Testy strumieniowej predykcji CSV / NDJSON"""
+
+    RAW_CSV = Path(__file__).parent.parent / "data" / "01_raw" / "credit_risk_dataset.csv"
+
+    @pytest.fixture
+    def raw_csv(self):
+        """Nagłówek i pierwsze 50 wierszy surowego zbioru"""
+        with open(self.RAW_CSV, "rb") as f:
+            return b"".join(f.readline() for _ in range(51))
+
+    def test_stream_csv_scores_every_row(self, raw_csv, monkeypatch):
+        """Test: każdy wiersz CSV dostaje wynik, kolejność jest zachowana między paczkami"""
+        monkeypatch.setattr(api, "STREAM_CHUNK_ROWS", 7)
+        response = client.post("/predict/stream", content=raw_csv, headers={"content-type": "text/csv"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [r["row"] for r in rows] == list(range(50))
+
+        # wiersz 1 surowego zbioru jest kompletny - wynik jak z /predict
+        payload = {
+            "person_age": 21, "person_income": 9600, "person_home_ownership": "OWN",
+            "person_emp_length": 5.0, "loan_intent": "EDUCATION", "loan_grade": "B",
+            "loan_amnt": 1000, "loan_int_rate": 11.14, "loan_percent_income": 0.1,
+            "cb_person_default_on_file": "N", "cb_person_cred_hist_length": 2
+        }
+        expected = client.post("/predict", json=payload).json()
+        assert {k: v for k, v in rows[1].items() if k != "row"} == expected
+
+    def test_stream_csv_reports_malformed_lines(self, raw_csv, monkeypatch):
+        """Test: linia CSV z nadmiarem pól dostaje opis błędu, a strumień jest oceniany dalej"""
+        monkeypatch.setattr(api, "STREAM_CHUNK_ROWS", 7)
+        headers = {"content-type": "text/csv"}
+        clean = client.post("/predict/stream", content=raw_csv, headers=headers)
+        expected = [json.loads(line) for line in clean.text.splitlines()]
+
+        lines = raw_csv.splitlines()
+        lines.insert(10, b"21,9600,OWN,5,EDUCATION,B,1000,11.14,0,0.1,N,2,nadmiarowe,pola")
+        response = client.post("/predict/stream", content=b"\n".join(lines), headers=headers)
+        assert response.status_code == 200
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [r["row"] for r in rows] == list(range(51))
+        assert "niepoprawna linia CSV" in rows[9]["error"]
+
+        # pozostałe wiersze oceniane jak bez błędnej linii (numeracja przesunięta o 1)
+        others = [{**r, "row": r["row"] - (r["row"] > 9)} for r in rows if r["row"] != 9]
+        assert others == expected
+
+    def test_stream_parses_off_event_loop(self, raw_csv, monkeypatch):
+        """Test: paczki CSV są parsowane w puli wątków, poza pętlą zdarzeń"""
+        parse, loops = streaming._parse, []
+
+        def recording_parse(*args):
+            try:
+                loops.append(asyncio.get_running_loop())
+            except RuntimeError:
+                loops.append(None)
+            return parse(*args)
+
+        monkeypatch.setattr(streaming, "_parse", recording_parse)
+        monkeypatch.setattr(api, "STREAM_CHUNK_ROWS", 20)
+        response = client.post("/predict/stream", content=raw_csv, headers={"content-type": "text/csv"})
+        assert len(response.text.splitlines()) == 50
+        assert loops == [None, None, None]
+
+    def test_stream_ndjson_reports_invalid_rows(self):
+        """Test: niepoprawne wiersze NDJSON dostają opis błędu zamiast predykcji"""
+        example = api.CreditInput.model_json_schema()["examples"][0]
+        body = "\n".join([
+            json.dumps(example),
+            json.dumps({**example, "loan_grade": "Z"}),
+            "to nie jest json",
+            json.dumps({**example, "person_age": 17}),
+        ])
+        response = client.post(
+            "/predict/stream", content=body, headers={"content-type": "application/x-ndjson"}
+        )
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert rows[0]["prediction"] in [0, 1]
+        assert "loan_grade" in rows[1]["error"]
+        assert "NDJSON" in rows[2]["error"]
+        assert "person_age" in rows[3]["error"]
+
+    def test_stream_unsupported_content_type(self):
+        """Test: nieobsługiwany typ treści zwraca 415"""
+        response = client.post("/predict/stream", content=b"{}", headers={"content-type": "application/xml"})
+        assert response.status_code == 415
+
+
+class TestPredictColumnarEndpoint:
+    """Testy binarnego formatu kolumnowego (.npz)"""
+
+    def test_columnar_matches_batch(self):
+        """Test: wyniki paczki .npz są zgodne z /predict/batch, błędne wiersze mają opis"""
+        example = api.CreditInput.model_json_schema()["examples"][0]
+        payloads = [example, {**example, "loan_grade": "E", "loan_percent_income": 0.6}]
+        expected = client.post("/predict/batch", json=payloads).json()
+
+        rows = [*payloads, {**example, "loan_grade": "Z"}]
+        body = write_npz({name: np.array([r[name] for r in rows]) for name in example})
+        response = client.post("/predict/columnar", content=body,
+                               headers={"content-type": "application/x-npz"})
+        assert response.status_code == 200
+        result, n_rows = read_npz(response.content)
+        assert n_rows == 3
+        for i, item in enumerate(expected):
+            assert result["prediction"][i] == item["prediction"]
+            assert result["probability"][i] == pytest.approx(item["probability"])
+            assert result["risk_level"][i] == item["risk_level"]
+            assert result["error"][i] == ""
+        assert result["prediction"][2] == -1
+        assert "loan_grade" in result["error"][2]
+
+    def test_columnar_rejects_bad_payloads(self):
+        """Test: niepoprawna paczka zwraca 400, inny typ treści 415"""
+        headers = {"content-type": "application/x-npz"}
+        assert client.post("/predict/columnar", content=b"xyz", headers=headers).status_code == 400
+        assert client.post("/predict/columnar", content=b"{}", headers={"content-type": "application/json"}).status_code == 415
+
+
+class TestModelRegistry:
+    """Testy hot reloadu i przypinania wersji modelu"""
+
+    @pytest.fixture
+    def admin(self, monkeypatch):
+        """Włączone endpointy /admin/*; po teście przywrócona jest pierwotna wersja"""
+        monkeypatch.setattr(api, "ADMIN_TOKEN", "test-token")
+        original = api.registry.active
+        yield {"X-Admin-Token": "test-token"}
+        api.activate_version(original)
+
+    def test_admin_requires_token(self, admin):
+        """Test: przeładowanie bez nagłówka lub ze złym tokenem jest odrzucane"""
+        assert client.post("/admin/reload").status_code == 403
+        assert client.post("/admin/reload", headers={"X-Admin-Token": "wrong-token"}).status_code == 403
+        assert client.post("/admin/activate/brak", headers={"X-Admin-Token": "wrong-token"}).status_code == 403
+
+    def test_admin_rejects_path_outside_data(self, admin):
+        """Test: model spoza katalogu data/ nie jest wczytywany"""
+        response = client.post("/admin/reload", headers=admin, json={"model_path": "app/main.py"})
+        assert response.status_code == 400
+
+    def test_reload_swaps_model_and_allows_pinning(self, admin):
+        """Test: po przeładowaniu odpowiada nowa wersja, a stara jest dostępna przez nagłówek"""
+        example = api.CreditInput.model_json_schema()["examples"][0]
+        before = client.post("/predict", json=example)
+        old_version = before.headers["X-Model-Version"]
+
+        response = client.post(
+            "/admin/reload", headers=admin, json={"model_path": "data/06_models/baseline_model.pkl"}
+        )
+        assert response.status_code == 200
+        new_version = response.json()["active_version"]
+        assert new_version != old_version
+
+        after = client.post("/predict", json=example)
+        assert after.headers["X-Model-Version"] == new_version
+        assert client.get("/model-info").json()["model_version"] == new_version
+
+        pinned = client.post("/predict", json=example, headers={"X-Model-Version": old_version})
+        assert pinned.headers["X-Model-Version"] == old_version
+        assert pinned.json() == before.json()
+
+        rollback = client.post(f"/admin/activate/{old_version}", headers=admin)
+        assert rollback.json()["active_version"] == old_version
+
+    def test_in_flight_request_finishes_on_old_version(self, admin):
+        """Test: żądanie rozpoczęte przed przełączeniem jest oceniane starą wersją"""
+        example = api.CreditInput(**api.CreditInput.model_json_schema()["examples"][0])
+        in_flight = api.registry.acquire()
+        expected = api.predict_one(example, in_flight)
+
+        api.reload_model(api.BASE_DIR / "data" / "06_models" / "baseline_model.pkl")
+        assert api.registry.active is not in_flight
+        assert api.predict_one(example, in_flight) == expected
+        in_flight.release()
+
+    def test_failed_warmup_keeps_active_version(self, admin, monkeypatch):
+        """Test: wersja, której rozgrzewka się nie powiodła, nie zastępuje aktywnej"""
+        original = api.registry.active
+        registry = api.ModelRegistry(max_versions=api.MODEL_REGISTRY_SIZE)
+        registry.add(original)
+        registry.activate(original.version)
+        monkeypatch.setattr(api, "registry", registry)
+
+        def broken_predict(record, version=None):
+            raise ValueError("predict_proba nie działa")
+
+        monkeypatch.setattr(api, "predict_one", broken_predict)
+        response = client.post(
+            "/admin/reload", headers=admin, json={"model_path": "data/06_models/baseline_model.pkl"}
+        )
+        assert response.status_code == 500
+        assert "predict_proba nie działa" in response.json()["detail"]
+        assert api.registry.active is original
+        assert [version.version for version in api.registry] == [original.version]
+
+    def test_admin_rejected_with_several_workers(self, admin, monkeypatch):
+        """Test: przy kilku procesach API przełączanie wersji zwraca 409"""
+        monkeypatch.setattr(api, "WORKER_PROCESSES", 4)
+        active = api.registry.active
+        assert client.post("/admin/reload", headers=admin).status_code == 409
+        assert client.post(f"/admin/activate/{active.version}", headers=admin).status_code == 409
+        assert api.registry.active is active
+
+    def test_unknown_pinned_version(self):
+        """Test: przypięcie do nieistniejącej wersji zwraca 404"""
+        example = api.CreditInput.model_json_schema()["examples"][0]
+        response = client.post("/predict", json=example, headers={"X-Model-Version": "brak"})
+        assert response.status_code == 404
+
+
+class TestShadowScoring:
+    """Testy oceny w cieniu modelem challengera"""
+
+    @pytest.fixture
+    def shadow_log(self, tmp_path, monkeypatch):
+        log_path = tmp_path / "shadow_scores.jsonl"
+        monkeypatch.setattr(api, "SHADOW_LOG_PATH", log_path)
+        api.start_shadow(api.BASE_DIR / "data" / "06_models" / "automl_model.pkl")
+        yield log_path
+        api.stop_shadow()
+
+    def test_shadow_logs_champion_and_challenger(self, shadow_log):
+        """Test: odpowiedź pochodzi od championa, a oba wyniki trafiają do logu"""
+        example = api.CreditInput.model_json_schema()["examples"][0]
+        response = client.post("/predict", json=example)
+        assert response.status_code == 200
+        assert client.get("/model-info").json()["shadow"]["enabled"] is True
+
+        api.stop_shadow()
+        rows = [json.loads(line) for line in shadow_log.read_text(encoding="utf-8").splitlines()]
+        assert len(rows) == 1
+        assert rows[0]["champion"] == response.headers["X-Model-Version"]
+        assert rows[0]["champion_probability"] == response.json()["probability"]
+        assert 0 <= rows[0]["challenger_probability"] <= 1
+
+    def test_challenger_load_time_has_own_label(self, tmp_path, monkeypatch):
+        """Test: wczytanie challengera nie nadpisuje czasu wczytania championa"""
+        monkeypatch.setattr(api, "SHADOW_LOG_PATH", tmp_path / "shadow_scores.jsonl")
+        champion = MODEL_LOAD_SECONDS.value("champion")
+        api.start_shadow(api.BASE_DIR / "data" / "06_models" / "automl_model.pkl")
+        api.stop_shadow()
+        assert MODEL_LOAD_SECONDS.value("champion") == champion
+        assert MODEL_LOAD_SECONDS.value("challenger") > 0
+        assert 'credit_api_model_load_seconds{role="challenger"}' in client.get("/metrics").text
+
+
+class TestExplainEndpoint:
+    """Testy wyjaśnień decyzji (reason codes)"""
+
+    @pytest.fixture
+    def example(self):
+        return api.CreditInput.model_json_schema()["examples"][0]
+
+    def test_explain_matches_predict(self, example):
+        """Test: /explain zwraca tę samą predykcję co /predict i top_k cech"""
+        response = client.post("/explain?top_k=2", json=example)
+        assert response.status_code == 200
+        data = response.json()
+        single = client.post("/predict", json=example).json()
+        assert {key: data[key] for key in single} == single
+        assert len(data["reasons"]) == 2
+        magnitudes = [abs(reason["contribution"]) for reason in data["reasons"]]
+        assert magnitudes == sorted(magnitudes, reverse=True)
+
+    def test_explain_batch_order_and_cached_explainer(self, example):
+        """Test: wsad zachowuje kolejność, a explainer jest zapamiętany w wersji modelu"""
+        payloads = [example, {**example, "loan_grade": "E", "loan_percent_income": 0.6}]
+        response = client.post("/explain/batch", json=payloads)
+        assert response.status_code == 200
+        batch = response.json()
+        assert len(batch) == 2
+        assert batch[0] == client.post("/explain", json=example).json()
+        assert all(len(item["reasons"]) == api.EXPLAIN_TOP_K for item in batch)
+
+        explainer = api.registry.active.explainer
+        client.post("/explain", json=example)
+        assert api.registry.active.explainer is explainer
+
+    def test_explain_invalid_top_k(self, example):
+        """Test: top_k spoza zakresu zwraca błąd walidacji"""
+        assert client.post("/explain?top_k=0", json=example).status_code == 422
+
+
+class TestAdmissionControl:
+    """Testy kontroli przyjmowania żądań (429 + Retry-After)"""
+
+    def test_saturated_scoring_endpoint_returns_429(self, monkeypatch):
+        """Test: przy zajętych miejscach i pełnej kolejce /predict odpowiada 429"""
+        monkeypatch.setattr(api.admission, "max_concurrent", 1)
+        monkeypatch.setattr(api.admission, "max_queue", 0)
+        monkeypatch.setattr(api.admission, "active", 1)
+        example = api.CreditInput.model_json_schema()["examples"][0]
+
+        response = client.post("/predict", json=example)
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == str(api.ADMISSION_RETRY_AFTER)
+        assert client.get("/health").status_code == 200
+
+        metrics = client.get("/metrics").text
+        assert 'credit_api_admission_rejected_total{reason="queue_full"}' in metrics
+        assert 'credit_api_requests_total{path="/predict",status="429"}' in metrics
+
+    def test_admitted_request_releases_slot(self, monkeypatch):
+        """Test: po obsłużeniu żądania miejsce jest zwalniane"""
+        monkeypatch.setattr(api.admission, "max_concurrent", 1)
+        example = api.CreditInput.model_json_schema()["examples"][0]
+        for _ in range(3):
+            assert client.post("/predict", json=example).status_code == 200
+        assert api.admission.active == 0
+
+
+class TestPreforkServing:
+    """Testy trybu pre-fork (app/serve.py)"""
+
+    def test_lifespan_keeps_preloaded_model(self):
+        """Test: lifespan w workerze nie wczytuje ponownie modelu wczytanego przed fork"""
+        active = api.registry.active
+        with TestClient(app) as worker_client:
+            assert worker_client.get("/health").status_code == 200
+        assert api.registry.active is active
+
+    def test_workers_default_from_web_concurrency(self, monkeypatch):
+        """Test: liczba workerów i port z WEB_CONCURRENCY / PORT"""
+        monkeypatch.setenv("WEB_CONCURRENCY", "3")
+        monkeypatch.setenv("PORT", "9000")
+        args = parse_args([])
+        assert (args.workers, args.port) == (3, 9000)
+
+    def test_preload_disables_admin_with_several_workers(self, monkeypatch):
+        """Test: proces nadrzędny przekazuje workerom liczbę procesów (409 na /admin/*)"""
+        monkeypatch.setattr(api, "WORKER_PROCESSES", api.WORKER_PROCESSES)
+        monkeypatch.setattr(api, "load_model_and_scaler", lambda: api.registry.active)
+        preload(workers=4)
+        assert api.WORKER_PROCESSES == 4
+
+
+class TestResponseEncoding:
+    """Testy szybkiej serializacji i kompresji dużych odpowiedzi"""
+
+    @pytest.fixture
+    def payloads(self):
+        example = api.CreditInput.model_json_schema()["examples"][0]
+        return [{**example, "loan_amnt": 1000 + i} for i in range(200)]
+
+    def test_large_batch_is_gzipped(self, payloads):
+        """Test: duży wsad jest kompresowany, gdy klient akceptuje gzip"""
+        response = client.post("/predict/batch", json=payloads, headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()) == len(payloads)
+        assert response.headers["X-Model-Version"] == api.registry.active.version
+
+    def test_no_gzip_without_accept_encoding(self, payloads):
+        """Test: bez Accept-Encoding: gzip odpowiedź nie jest kompresowana"""
+        response = client.post("/predict/batch", json=payloads, headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+
+    def test_serialization_stage_is_measured(self, payloads):
+        """Test: czas serializacji jest osobnym etapem w metrykach"""
+        before = api.STAGE_SECONDS.count("serialization")
+        client.post("/predict/batch", json=payloads[:5])
+        assert api.STAGE_SECONDS.count("serialization") == before + 1
+
+
+class TestReadiness:
+    """Testy rozgrzewki przy starcie i endpointu /ready"""
+
+    @pytest.fixture(autouse=True)
+    def fresh_readiness(self, monkeypatch):
+        monkeypatch.setattr(api, "readiness", api.Readiness())
+        monkeypatch.setattr(api, "WARMUP_ROUNDS", 5)
+        monkeypatch.setattr(api, "WARMUP_BATCH_SIZE", 16)
+
+    def test_not_ready_before_warmup(self):
+        """Test: przed rozgrzewką /ready zwraca 503, a /health działa"""
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["status"] == "starting"
+        assert client.get("/health").status_code == 200
+
+    def test_ready_after_warmup_within_budget(self, monkeypatch):
+        """Test: po rozgrzewce w budżecie /ready zwraca 200 z raportem opóźnień"""
+        monkeypatch.setattr(api, "WARMUP_LATENCY_BUDGET_MS", 10_000)
+        before = api.STAGE_SECONDS.count("model")
+        api.run_startup_warmup()
+        response = client.get("/ready")
+        assert response.status_code == 200
+        warmup = response.json()["warmup"]
+        assert warmup["version"] == api.registry.active.version
+        assert warmup["batch_size"] == 16 and warmup["single_p99_ms"] > 0
+        assert api.STAGE_SECONDS.count("model") == before
+
+    def test_over_budget_is_not_ready_until_remeasured(self, monkeypatch):
+        """Test: poza budżetem /ready zwraca 503 over_budget, a ponowny pomiar w budżecie daje 200"""
+        monkeypatch.setattr(api, "WARMUP_LATENCY_BUDGET_MS", 1e-9)
+        monkeypatch.setattr(api, "WARMUP_ATTEMPTS", 2)
+        monkeypatch.setattr(api, "WARMUP_RETRY_SECONDS", 0.01)
+        monkeypatch.setattr(api, "warmup_stop", threading.Event())
+        warmup = threading.Thread(target=api.run_startup_warmup, daemon=True)
+        warmup.start()
+        try:
+            deadline = time.monotonic() + 10
+            while api.readiness.state != "over_budget" and time.monotonic() < deadline:
+                time.sleep(0.005)
+            response = client.get("/ready")
+            assert response.status_code == 503
+            assert response.json()["status"] == "over_budget"
+            assert response.json()["warmup"]["attempt"] >= 2
+            assert WARMUP_OVER_BUDGET.value() == 1
+            assert "credit_api_warmup_over_budget 1" in client.get("/metrics").text
+
+            monkeypatch.setattr(api, "WARMUP_LATENCY_BUDGET_MS", 10_000)
+            warmup.join(10)
+            assert not warmup.is_alive()
+        finally:
+            api.warmup_stop.set()
+        assert client.get("/ready").status_code == 200
+        assert WARMUP_OVER_BUDGET.value() == 0
+
+    def test_over_budget_retry_stops_on_shutdown(self, monkeypatch):
+        """Test: zamknięcie API przerywa ponawianie rozgrzewki poza budżetem"""
+        monkeypatch.setattr(api, "WARMUP_LATENCY_BUDGET_MS", 1e-9)
+        monkeypatch.setattr(api, "WARMUP_ATTEMPTS", 1)
+        monkeypatch.setattr(api, "warmup_stop", threading.Event())
+        api.warmup_stop.set()
+        report = api.run_startup_warmup()
+        assert report["attempt"] == 1
+        assert client.get("/ready").status_code == 503
+
+
+class TestServerTiming:
+    """Testy nagłówków Server-Timing / X-Request-ID i próbkowanych śladów żądań"""
+
+    @pytest.fixture
+    def valid_payload(self):
+        return api.CreditInput.model_json_schema()["examples"][0]
+
+    def test_predict_has_server_timing(self, valid_payload):
+        """Test: odpowiedź /predict ma czasy etapów i identyfikator żądania"""
+        response = client.post("/predict", json=valid_payload)
+        assert response.status_code == 200
+        assert len(response.headers["X-Request-ID"]) == 32
+        timing = response.headers["Server-Timing"]
+        names = [part.split(";")[0] for part in timing.split(", ")]
+        assert names[0] == "validation" and names[-1] == "total"
+        assert {"model", "serialization"} <= set(names)
+
+    def test_request_id_is_echoed(self, valid_payload):
+        """Test: identyfikator przekazany przez klienta wraca w odpowiedzi"""
+        response = client.post("/predict", json=valid_payload, headers={"X-Request-ID": "trace-42"})
+        assert response.headers["X-Request-ID"] == "trace-42"
+
+    def test_other_endpoints_have_no_timing(self):
+        """Test: endpointy poza oceną nie dostają nagłówków"""
+        response = client.get("/health")
+        assert "Server-Timing" not in response.headers
+
+    def test_sampled_requests_are_written(self, valid_payload, tmp_path, monkeypatch):
+        """Test: przy sample_rate=1 każde żądanie oceny trafia do pliku śladów"""
+        writer = api.trace_writer
+        monkeypatch.setattr(writer, "log_path", tmp_path / "traces.jsonl")
+        monkeypatch.setattr(writer, "sample_rate", 1.0)
+        writer.start()
+        try:
+            response = client.post("/predict/batch", json=[valid_payload] * 3)
+        finally:
+            writer.stop()
+        rows = [json.loads(line) for line in (tmp_path / "traces.jsonl").read_text().splitlines()]
+        assert rows[-1]["request_id"] == response.headers["X-Request-ID"]
+        assert rows[-1]["path"] == "/predict/batch" and rows[-1]["status"] == 200
+        assert rows[-1]["model_ms"] is not None
+
+
+class TestInferenceThreads:
+    """Testy kontroli wątków joblib modelu w procesie API"""
+
+    def test_loaded_model_runs_serially(self):
+        """Test: n_jobs z treningu jest zastąpione przez 1"""
+        active = api.registry.active
+        if hasattr(active.model, "n_jobs"):
+            assert active.model.n_jobs == 1
+        info = client.get("/model-info").json()["inference_threads"]
+        assert info["min_rows"] == api.PARALLEL_INFERENCE_MIN_ROWS
+
+    def test_large_batch_uses_parallel_model(self, monkeypatch):
+        """Test: wsad od min_rows wierszy liczy model równoległy z tym samym wynikiem"""
+        parallelism = api.registry.active.parallelism
+        if parallelism.parallel is None:
+            pytest.skip("Model bez n_jobs - brak wariantu równoległego")
+        monkeypatch.setattr(parallelism, "min_rows", 10)
+        example = api.CreditInput.model_json_schema()["examples"][0]
+        before = parallelism.stats()
+        single = client.post("/predict", json=example).json()
+        batch = client.post("/predict/batch", json=[example] * 10).json()
+        after = parallelism.stats()
+        assert after["parallel_calls"] == before["parallel_calls"] + 1
+        assert batch[0] == single
+
+
+class TestStartup:
+    """Testy odroczonych importów i profilu startu"""
+
+    def test_import_defers_pandas(self):
+        """Test: import app.main nie ładuje pandas ani sklearn.preprocessing"""
+        code = "import sys, app.main; print('pandas' in sys.modules, 'sklearn.preprocessing' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parent.parent,
+                                capture_output=True, text=True, check=True)
+        assert result.stdout.split() == ["False", "False"]
+
+    def test_default_model_is_trained_pickle(self):
+        """Test: domyślnie wczytywany jest best_model.pkl z pipeline'u"""
+        assert api.find_model_path().name == "best_model.pkl"
+
+    def test_model_info_reports_startup_profile(self):
+        """Test: /model-info podaje czas importu i wczytania modelu osobno"""
+        startup = client.get("/model-info").json()["startup"]
+        assert startup["import_seconds"] > 0
+        assert startup["model_load_seconds"] > 0
+
+
+class TestMetricsEndpoint:
+    """Testy endpointu /metrics"""
+
+    def test_metrics_count_requests_and_stages(self):
+        """Test: żądanie /predict zwiększa liczniki żądań i histogramy etapów"""
+        example = api.CreditInput.model_json_schema()["examples"][0]
+
+        requests_before = REQUESTS.value(("/predict", 200))
+        stages_before = {s: STAGE_SECONDS.count(s) for s in ("validation", "features", "scaling", "model")}
+        assert client.post("/predict", json=example).status_code == 200
+
+        assert REQUESTS.value(("/predict", 200)) == requests_before + 1
+        for stage, count in stages_before.items():
+            assert STAGE_SECONDS.count(stage) == count + 1
+
+    def test_metrics_text_format(self):
+        """Test: /metrics zwraca format tekstowy Prometheusa"""
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "# TYPE credit_api_stage_duration_seconds histogram" in response.text
+        assert "credit_api_model_load_seconds" in response.text
+        assert 'credit_api_requests_in_flight{path="/metrics"} 1' in response.text
+
+    def test_metrics_count_errors(self):
+        """Test: odrzucone żądanie trafia do licznika błędów"""
+        before = ERRORS.value(("/predict", 422))
+        client.post("/predict", json={"person_age": 25})
+        assert ERRORS.value(("/predict", 422)) == before + 1
+
+
 class TestModelInfoEndpoint:
     """Testy endpointu informacji o modelu"""
     
@@ -209,6 +942,12 @@ class TestModelInfoEndpoint:
         data = response.json()
         assert "model_type" in data
 
+    def test_model_info_uses_preprocessor_artifact(self):
+        """Test: scaler pochodzi z artefaktu preprocessingu, a nie z clean_data.csv"""
+        response = client.get("/model-info")
+        data = response.json()
+        assert data["preprocessor"] == "preprocessor.json"
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,132 @@
+"""
+Testy jednostkowe mikro-batchingu (app/batching.py)
+
+Uruchomienie: pytest tests/test_batching.py -v
+"""
+
+import asyncio
+import contextvars
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.batching import BatcherStopped, MicroBatcher
+
+
+class RecordingScorer:
+    """Funkcja oceniająca zapamiętująca rozmiary otrzymanych paczek"""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def __call__(self, items):
+        self.batch_sizes.append(len(items))
+        return [item * 10 for item in items], {"model": 0.001}
+
+
+def run_concurrently(batcher, items):
+    async def main():
+        results = await asyncio.gather(*(batcher.submit(i) for i in items))
+        await batcher.stop()
+        return results
+
+    return asyncio.run(main())
+
+
+def test_concurrent_requests_share_one_batch():
+    """Test: współbieżne żądania są oceniane jedną paczką, wyniki trafiają do właściwych wywołujących"""
+    scorer = RecordingScorer()
+    batcher = MicroBatcher(scorer, max_batch_size=64, max_wait_ms=50)
+    results = run_concurrently(batcher, list(range(20)))
+    assert results == [i * 10 for i in range(20)]
+    assert scorer.batch_sizes == [20]
+    assert batcher.stats()["mean_batch_size"] == 20
+
+
+def test_batch_size_limit():
+    """Test: paczka nie przekracza max_batch_size"""
+    scorer = RecordingScorer()
+    batcher = MicroBatcher(scorer, max_batch_size=8, max_wait_ms=50)
+    results = run_concurrently(batcher, list(range(20)))
+    assert results == [i * 10 for i in range(20)]
+    assert max(scorer.batch_sizes) <= 8
+    assert sum(scorer.batch_sizes) == 20
+
+
+def test_errors_propagate_to_every_caller():
+    """Test: błąd funkcji oceniającej trafia do wszystkich żądań z paczki"""
+    def failing(items):
+        raise ValueError("boom")
+
+    batcher = MicroBatcher(failing, max_wait_ms=10)
+
+    async def main():
+        results = await asyncio.gather(
+            *(batcher.submit(i) for i in range(3)), return_exceptions=True
+        )
+        await batcher.stop()
+        return results
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+def test_stop_fails_queued_and_finishes_in_flight():
+    """Test: stop() kończy paczkę w toku, a rekordy z kolejki dostają BatcherStopped"""
+    started, release = threading.Event(), threading.Event()
+
+    def slow(items):
+        started.set()
+        release.wait(5)
+        return [item * 10 for item in items], {}
+
+    batcher = MicroBatcher(slow, max_batch_size=2, max_wait_ms=0, max_concurrent_batches=1)
+
+    async def main():
+        in_flight = [asyncio.ensure_future(batcher.submit(i)) for i in range(2)]
+        while not started.is_set():
+            await asyncio.sleep(0.001)
+        # paczka w toku zajmuje jedyny slot - kolejne rekordy czekają
+        queued = [asyncio.ensure_future(batcher.submit(i)) for i in range(2, 5)]
+        await asyncio.sleep(0.01)
+        stopping = asyncio.ensure_future(batcher.stop())
+        await asyncio.sleep(0.01)
+        release.set()
+        await asyncio.wait_for(stopping, 5)
+        return (
+            await asyncio.gather(*in_flight),
+            await asyncio.gather(*queued, return_exceptions=True),
+        )
+
+    done, failed = asyncio.run(main())
+    assert done == [0, 10]
+    assert len(failed) == 3 and all(isinstance(r, BatcherStopped) for r in failed)
+
+
+def test_batch_stages_are_recorded_for_every_caller():
+    """Test: czasy etapów paczki trafiają do kontekstu każdego oczekującego żądania"""
+    stages = contextvars.ContextVar("stages")
+    batcher = MicroBatcher(
+        RecordingScorer(), max_wait_ms=50,
+        record_stages=lambda batch: stages.get().update(batch),
+    )
+
+    async def request(item):
+        stages.set({})
+        result = await batcher.submit(item)
+        return result, stages.get()
+
+    async def main():
+        results = await asyncio.gather(*(request(i) for i in range(3)))
+        await batcher.stop()
+        return results
+
+    assert asyncio.run(main()) == [(i * 10, {"model": 0.001}) for i in range(3)]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,46 @@
+"""
+Testy wspólnego binningu treningu i API (ai_credit_scoring/binning.py)
+
+Uruchomienie: pytest tests/test_binning.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from ai_credit_scoring.binning import (
+    AGE_BINS,
+    assign_bin,
+    assign_bins,
+    fit_quantile_bins,
+)
+
+
+def test_assign_bins_matches_pd_cut():
+    """Test: przypisanie przez searchsorted daje te same etykiety co pd.cut z treningu"""
+    incomes = np.random.default_rng(0).lognormal(11, 0.5, 5000)
+    spec = fit_quantile_bins(incomes, "person_income")
+    expected = pd.cut(incomes, bins=spec["edges"], include_lowest=True).astype(str)
+    assert list(assign_bins(incomes, spec)) == list(expected)
+    assert spec["labels"] == [str(c) for c in pd.cut(incomes, bins=spec["edges"], include_lowest=True).categories]
+
+
+def test_edges_are_right_closed_and_outer_bins_open():
+    """Test: wartość na krawędzi trafia do niższego binu, wartości spoza zakresu do skrajnych"""
+    values = np.array([10, 18, 25, 26, 60, 61, 200])
+    assert list(assign_bins(values, AGE_BINS)) == ["18-25", "18-25", "18-25", "26-35", "46-60", "60+", "60+"]
+
+
+def test_single_value_matches_vectorized():
+    """Test: ścieżka jednowierszowa zgodna z wektorową"""
+    values = [17, 18, 24.5, 25, 35, 35.01, 59, 60, 90, 150]
+    assert [assign_bin(v, AGE_BINS) for v in values] == list(assign_bins(values, AGE_BINS))
+
+
+def test_constant_column_has_no_bins():
+    """Test: kolumna stała nie daje binów kwantylowych"""
+    assert fit_quantile_bins(np.full(10, 5.0), "person_income") is None
@@ -0,0 +1,92 @@
+"""
+Testy jednostkowe cache predykcji (app/cache.py)
+
+Uruchomienie: pytest tests/test_cache.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.cache import PredictionCache
+from app.main import CreditInput
+
+
+class FakeClock:
+    """Sterowany zegar do testów TTL"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def example():
+    return CreditInput.model_json_schema()["examples"][0]
+
+
+def test_key_is_canonical(example):
+    """Test: ten sam rekord zapisany inaczej w JSON daje ten sam klucz"""
+    a = CreditInput(**example)
+    b = CreditInput(**{**example, "person_income": 50000.0, "loan_amnt": "10000"})
+    assert PredictionCache.key(a) == PredictionCache.key(b)
+    c = CreditInput(**{**example, "loan_grade": "C"})
+    assert PredictionCache.key(a) != PredictionCache.key(c)
+
+
+def test_hits_and_misses():
+    """Test: liczniki trafień i chybień"""
+    cache = PredictionCache(max_entries=10)
+    assert cache.get(("a",)) is None
+    cache.put(("a",), 1)
+    assert cache.get(("a",)) == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_lru_eviction():
+    """Test: przy przepełnieniu usuwany jest najdawniej używany wpis"""
+    cache = PredictionCache(max_entries=2)
+    cache.put(("a",), 1)
+    cache.put(("b",), 2)
+    cache.get(("a",))
+    cache.put(("c",), 3)
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry():
+    """Test: wpis po upływie TTL jest traktowany jak brak"""
+    clock = FakeClock()
+    cache = PredictionCache(max_entries=10, ttl_seconds=5, clock=clock)
+    cache.put(("a",), 1)
+    clock.now = 4.9
+    assert cache.get(("a",)) == 1
+    clock.now = 5.1
+    assert cache.get(("a",)) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_reset_on_token_change():
+    """Test: zmiana tokenu modelu czyści cache, ten sam token nie"""
+    cache = PredictionCache(max_entries=10)
+    cache.reset("v1")
+    cache.put(("a",), 1)
+    cache.reset("v1")
+    assert cache.get(("a",)) == 1
+    cache.reset("v2")
+    assert cache.get(("a",)) is None
+
+
+def test_disabled_cache_stores_nothing():
+    """Test: max_entries=0 wyłącza cache"""
+    cache = PredictionCache(max_entries=0)
+    assert not cache.enabled
+    cache.put(("a",), 1)
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,81 @@
+"""
+Testy kolumnowej walidacji danych wejściowych (app/columnar.py)
+
+Uruchomienie: pytest tests/test_columnar.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.columnar import field_specs, read_npz, validate_columns, write_npz
+from app.main import CreditInput
+
+SPECS = field_specs(CreditInput)
+
+
+@pytest.fixture
+def columns():
+    """Trzy poprawne wiersze w układzie kolumnowym"""
+    example = CreditInput.model_json_schema()["examples"][0]
+    return {name: np.array([value] * 3, dtype=object) for name, value in example.items()}
+
+
+def test_field_specs_follow_credit_input():
+    """Test: ograniczenia odczytane z CreditInput"""
+    assert SPECS["person_age"] == {"kind": "int", "ge": 18, "le": 90, "choices": None}
+    assert SPECS["loan_grade"]["choices"] == ["A", "B", "C", "D", "E", "F", "G"]
+    assert SPECS["loan_percent_income"]["le"] == 1
+
+
+def test_valid_columns_have_no_errors(columns):
+    """Test: poprawne dane przechodzą walidację i są konwertowane do float"""
+    out, errors = validate_columns(columns, 3, SPECS)
+    assert list(errors) == ["", "", ""]
+    assert out["person_income"].dtype == float
+
+
+def test_errors_match_pydantic_rules(columns):
+    """Test: odrzucane są te same wartości co w CreditInput"""
+    columns["person_age"][0] = 25.5
+    columns["loan_int_rate"][1] = 101
+    columns["person_home_ownership"][2] = "CASTLE"
+    _, errors = validate_columns(columns, 3, SPECS)
+    assert "person_age" in errors[0]
+    assert "loan_int_rate" in errors[1]
+    assert "person_home_ownership" in errors[2]
+
+
+def test_missing_values_imputed_or_rejected(columns):
+    """Test: braki uzupełniane wartością imputacji, bez niej - błąd"""
+    columns["loan_int_rate"][0] = None
+    _, errors = validate_columns(columns, 3, SPECS)
+    assert "brak wartości" in errors[0]
+
+    out, errors = validate_columns(columns, 3, SPECS, impute={"loan_int_rate": 11.0})
+    assert errors[0] == ""
+    assert out["loan_int_rate"][0] == 11.0
+
+
+def test_npz_roundtrip_decodes_bytes():
+    """Test: paczka .npz wraca jako kolumny; napisy bajtowe są dekodowane"""
+    body = write_npz({"person_age": np.array([25, 40]), "loan_grade": np.array([b"A", b"B"])})
+    columns, n_rows = read_npz(body)
+    assert n_rows == 2
+    assert list(columns["loan_grade"]) == ["A", "B"]
+
+
+def test_npz_rejects_bad_bundles():
+    """Test: kolumny różnej długości, pickle i przekroczony limit wierszy są odrzucane"""
+    with pytest.raises(ValueError, match="różne długości"):
+        read_npz(write_npz({"a": np.zeros(2), "b": np.zeros(3)}))
+    with pytest.raises(ValueError, match="niepoprawna paczka"):
+        read_npz(write_npz({"a": np.array([{"x": 1}], dtype=object)}))
+    with pytest.raises(ValueError, match="za dużo wierszy"):
+        read_npz(write_npz({"a": np.zeros(5)}), max_rows=4)
+    with pytest.raises(ValueError):
+        read_npz(b"to nie jest npz")
@@ -0,0 +1,74 @@
+"""
+Testy jednostkowe wyjaśnień decyzji modelu (app/explain.py)
+
+Uruchomienie: pytest tests/test_explain.py -v
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.explain import ExplainerUnavailable, ReasonCodes, explainer_for
+
+
+class LinearModel:
+    """Model liniowy z atrybutem coef_ (jak LogisticRegression)"""
+
+    def __init__(self, coef):
+        self.coef_ = np.asarray([coef], dtype=float)
+
+
+class FakeVersion:
+    def __init__(self, model):
+        self.model = model
+        self.fast_path = None
+        self.feature_columns = ["a", "b", "c"]
+        self.explainer = None
+
+
+def test_linear_contributions_are_coef_times_features():
+    """Test: dla modelu liniowego wkład cechy to coef * x"""
+    codes = ReasonCodes.build(LinearModel([1.0, -2.0, 0.5]), ["a", "b", "c"])
+    X = np.array([[1.0, 1.0, 1.0], [2.0, 0.0, -4.0]])
+    assert codes.kind == "linear"
+    np.testing.assert_allclose(codes.contributions(X), [[1.0, -2.0, 0.5], [2.0, 0.0, -2.0]])
+
+
+def test_top_k_sorted_by_absolute_contribution():
+    """Test: top-k per wiersz malejąco po |wkładzie|, znak wkładu zachowany"""
+    codes = ReasonCodes.build(LinearModel([1.0, -2.0, 0.5]), ["a", "b", "c"])
+    X = np.array([[1.0, 1.0, 1.0], [2.0, 0.0, -4.0]])
+    indices, values = codes.top_k(X, 2)
+    assert codes.feature_names[indices].tolist() == [["b", "a"], ["a", "c"]]
+    np.testing.assert_allclose(values, [[-2.0, 1.0], [2.0, -2.0]])
+
+
+def test_top_k_is_capped_at_feature_count():
+    """Test: k większe niż liczba cech zwraca wszystkie cechy"""
+    codes = ReasonCodes.build(LinearModel([1.0, 2.0]), ["a", "b"])
+    indices, _ = codes.top_k(np.ones((3, 2)), 10)
+    assert indices.shape == (3, 2)
+
+
+def test_unsupported_model_raises():
+    """Test: model bez drzew i bez coef_ nie ma explainera"""
+    with pytest.raises(ExplainerUnavailable):
+        ReasonCodes.build(object(), ["a"])
+
+
+def test_explainer_built_once_per_version():
+    """Test: explainer budowany raz i zapamiętany w wersji modelu (także przy współbieżności)"""
+    version = FakeVersion(LinearModel([1.0, 2.0, 3.0]))
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(explainer_for(version))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(codes is version.explainer for codes in results)
+    assert version.explainer.feature_names.tolist() == ["a", "b", "c"]
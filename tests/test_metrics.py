@@ -0,0 +1,64 @@
+"""
+Testy jednostkowe metryk Prometheusa (app/metrics.py)
+
+Uruchomienie: pytest tests/test_metrics.py -v
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.metrics import Counter, Gauge, Histogram, Registry
+
+
+def test_counter_renders_labels():
+    """Test: licznik z etykietami w formacie tekstowym Prometheusa"""
+    registry = Registry()
+    counter = Counter("requests_total", "Żądania", ("path", "status"), registry=registry)
+    counter.inc(("/predict", 200))
+    counter.inc(("/predict", 200))
+    counter.inc(("/predict", 422))
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{path="/predict",status="200"} 2' in text
+    assert 'requests_total{path="/predict",status="422"} 1' in text
+
+
+def test_gauge_inc_dec_and_set():
+    """Test: wskaźnik rośnie, maleje i może być ustawiony"""
+    registry = Registry()
+    gauge = Gauge("in_flight", "W toku", ("path",), registry=registry)
+    gauge.inc("/predict")
+    gauge.inc("/predict")
+    gauge.dec("/predict")
+    assert gauge.value("/predict") == 1
+
+    load = Gauge("load_seconds", "Wczytanie", registry=registry)
+    load.set(0.25)
+    assert "load_seconds 0.25\n" in registry.render()
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test: kubełki kumulatywne, +Inf równe liczbie pomiarów, poprawna suma"""
+    registry = Registry()
+    histogram = Histogram("stage_seconds", "Etapy", ("stage",), buckets=(0.1, 1.0), registry=registry)
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe("model", value)
+
+    text = registry.render()
+    assert 'stage_seconds_bucket{stage="model",le="0.1"} 2' in text
+    assert 'stage_seconds_bucket{stage="model",le="1.0"} 3' in text
+    assert 'stage_seconds_bucket{stage="model",le="+Inf"} 4' in text
+    assert 'stage_seconds_sum{stage="model"} 3.65' in text
+    assert 'stage_seconds_count{stage="model"} 4' in text
+    assert histogram.count("model") == 4
+
+
+def test_label_values_are_escaped():
+    """Test: cudzysłowy i znaki nowej linii w etykietach są escapowane"""
+    registry = Registry()
+    counter = Counter("c", "C", ("path",), registry=registry)
+    counter.inc('a"b\nc')
+    assert 'c{path="a\\"b\\nc"} 1' in registry.render()
@@ -0,0 +1,75 @@
+"""
+Testy jednostkowe równoległości inferencji (app/parallelism.py)
+
+Uruchomienie: pytest tests/test_parallelism.py -v
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.parallelism import InferenceParallelism, parallel_copy, serial_model
+
+
+class Forest:
+    """Minimalny model z n_jobs i współdzielonymi drzewami"""
+
+    def __init__(self, n_jobs=-1):
+        self.n_jobs = n_jobs
+        self.estimators_ = [object() for _ in range(3)]
+
+
+def test_serial_model_overrides_trained_n_jobs():
+    """Test: n_jobs zapisane w modelu jest zastępowane przez 1 (w miejscu)"""
+    model = Forest(n_jobs=-1)
+    assert serial_model(model) is model
+    assert model.n_jobs == 1
+
+
+def test_model_without_n_jobs_is_untouched():
+    """Test: modele bez n_jobs nie dostają wariantu równoległego"""
+    model = object()
+    assert serial_model(model) is model
+    assert parallel_copy(model, 4) is None
+    assert InferenceParallelism(model, threads=4, min_rows=100).parallel is None
+
+
+def test_parallel_copy_shares_trees():
+    """Test: kopia równoległa współdzieli drzewa i nie zmienia oryginału"""
+    model = Forest(n_jobs=1)
+    parallel = parallel_copy(model, 8)
+    assert parallel.n_jobs == 8 and model.n_jobs == 1
+    assert parallel.estimators_ is model.estimators_
+
+
+def test_small_inputs_run_serially():
+    """Test: pojedyncze rekordy i małe wsady dostają model szeregowy"""
+    parallelism = InferenceParallelism(Forest(), threads=4, min_rows=1000)
+    assert parallelism.trained_n_jobs == -1
+    for n_rows in (1, 64, 999):
+        with parallelism.select(n_rows) as model:
+            assert model is parallelism.serial and model.n_jobs == 1
+    with parallelism.select(1000) as model:
+        assert model is parallelism.parallel and model.n_jobs == 4
+    assert parallelism.stats()["serial_calls"] == 3
+    assert parallelism.stats()["parallel_calls"] == 1
+
+
+def test_only_one_parallel_batch_at_a_time():
+    """Test: drugi duży wsad w trakcie pierwszego liczy szeregowo"""
+    parallelism = InferenceParallelism(Forest(), threads=4, min_rows=10)
+    with parallelism.select(100) as first:
+        with parallelism.select(100) as second:
+            assert first is parallelism.parallel
+            assert second is parallelism.serial
+    with parallelism.select(100) as third:
+        assert third is parallelism.parallel
+
+
+def test_parallel_disabled():
+    """Test: min_rows=0 albo threads=1 - zawsze szeregowo"""
+    for threads, min_rows in ((4, 0), (1, 10), (0, 10)):
+        parallelism = InferenceParallelism(Forest(), threads=threads, min_rows=min_rows)
+        with parallelism.select(1_000_000) as model:
+            assert model is parallelism.serial
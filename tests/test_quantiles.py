@@ -0,0 +1,85 @@
+"""
+Testy jednostkowe szkicu kwantyli KLL (ai_credit_scoring/quantiles.py)
+
+Uruchomienie: pytest tests/test_quantiles.py -v
+"""
+
+import pickle
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from ai_credit_scoring.quantiles import KLLSketch, sketch_k, weighted_quantile
+
+QS = np.linspace(0.01, 0.99, 99)
+
+
+def rank_error(sorted_values: np.ndarray, estimates: np.ndarray) -> float:
+    """Największa odległość rangi oszacowania od żądanego kwantyla"""
+    n = len(sorted_values)
+    lo = np.searchsorted(sorted_values, estimates, side="left") / n
+    hi = np.searchsorted(sorted_values, estimates, side="right") / n
+    return float(np.max(np.maximum(0, np.maximum(lo - QS, QS - hi))))
+
+
+def test_weighted_quantile_matches_np_quantile():
+    """Test: kwantyl z liczności wartości jest identyczny z np.quantile na pełnej kolumnie"""
+    rng = np.random.default_rng(0)
+    values = np.unique(rng.integers(0, 50, 30).astype(float))
+    counts = rng.integers(1, 20, len(values)).astype(float)
+    full = np.repeat(values, counts.astype(int))
+    q = [0.0, 0.01, 0.25, 0.5, 0.75, 0.99, 1.0]
+    np.testing.assert_array_equal(weighted_quantile(values, counts, q), np.quantile(full, q))
+
+
+def test_small_sketch_is_exact():
+    """Test: dopóki wartości mieszczą się w pojemności, kwantyle są dokładne"""
+    values = np.random.default_rng(1).normal(size=500)
+    sketch = KLLSketch(rank_error=0.001).update(values)
+    assert len(sketch) == 500
+    np.testing.assert_array_equal(sketch.quantile(QS), np.quantile(values, QS))
+
+
+@pytest.mark.parametrize("error", [0.01, 0.002])
+def test_rank_error_within_bound_after_chunks_and_merge(error):
+    """Test: aktualizacje paczkami i scalanie szkiców z różnych "procesów" mieszczą się w błędzie"""
+    values = np.random.default_rng(2).lognormal(10, 1, 300_000)
+    parts = [KLLSketch(error, seed=i) for i in range(8)]
+    for i, chunk in enumerate(np.array_split(values, 120)):
+        parts[i % 8].update(chunk)
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+
+    assert merged.n == len(values)
+    assert len(merged) < 3 * sketch_k(error) + 64
+    assert rank_error(np.sort(values), merged.quantile(QS)) <= error
+    assert merged.quantile(0.0) == values.min() and merged.quantile(1.0) == values.max()
+
+
+def test_nan_skipped_and_empty_sketch():
+    """Test: NaN są pomijane, pusty szkic zwraca NaN"""
+    assert np.isnan(KLLSketch().quantile(0.5))
+    assert np.isnan(KLLSketch().update([np.nan, np.nan]).quantile([0.5])).all()
+    sketch = KLLSketch().update([1.0, np.nan, 3.0])
+    assert sketch.n == 2 and sketch.quantile(0.5) == 2.0
+
+
+def test_same_seed_same_result_and_pickle():
+    """Test: ten sam seed daje ten sam wynik; szkic przechodzi przez pickle (między procesami)"""
+    values = np.random.default_rng(3).normal(size=50_000)
+    a = KLLSketch(0.01, seed=7).update(values)
+    b = pickle.loads(pickle.dumps(KLLSketch(0.01, seed=7).update(values)))
+    np.testing.assert_array_equal(a.quantile(QS), b.quantile(QS))
+
+
+def test_merge_requires_same_accuracy():
+    """Test: scalanie szkiców o różnym rank_error jest błędem"""
+    with pytest.raises(ValueError):
+        KLLSketch(0.01).merge(KLLSketch(0.001))
+    with pytest.raises(ValueError):
+        KLLSketch(0.0)
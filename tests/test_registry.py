@@ -0,0 +1,101 @@
+"""
+Testy jednostkowe rejestru wersji modelu (app/registry.py)
+
+Uruchomienie: pytest tests/test_registry.py -v
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.registry import ModelRegistry, ModelVersion
+
+
+def make_version(name: str) -> ModelVersion:
+    return ModelVersion(name, model=object(), scaler=None, feature_columns=[],
+                        preprocessor=None, model_path=None)
+
+
+class FakePool:
+    def __init__(self):
+        self.closed = False
+
+    def shutdown(self):
+        self.closed = True
+
+
+def test_activate_returns_previous():
+    """Test: przełączenie wersji zwraca poprzednią aktywną"""
+    registry = ModelRegistry()
+    registry.add(make_version("v1"))
+    registry.add(make_version("v2"))
+    assert registry.activate("v1") is None
+    assert registry.activate("v2").version == "v1"
+    assert registry.active.version == "v2"
+    with pytest.raises(KeyError):
+        registry.activate("v3")
+
+
+def test_add_same_version_returns_existing():
+    """Test: ta sama wersja (ten sam odcisk plików) nie jest dodawana ponownie"""
+    registry = ModelRegistry()
+    first, _ = registry.add(make_version("v1"))
+    second, evicted = registry.add(make_version("v1"))
+    assert second is first
+    assert evicted == []
+
+
+def test_eviction_keeps_active_version():
+    """Test: przy przekroczeniu limitu usuwana jest najstarsza nieaktywna wersja"""
+    registry = ModelRegistry(max_versions=2)
+    registry.add(make_version("v1"))
+    registry.activate("v1")
+    registry.add(make_version("v2"))
+    _, evicted = registry.add(make_version("v3"))
+    assert [v.version for v in evicted] == ["v2"]
+    assert "v1" in registry and "v3" in registry
+
+
+def test_acquire_pinned_and_active():
+    """Test: żądanie dostaje wersję aktywną albo przypiętą i zwiększa licznik w toku"""
+    registry = ModelRegistry()
+    registry.add(make_version("v1"))
+    registry.add(make_version("v2"))
+    registry.activate("v2")
+
+    pinned = registry.acquire("v1")
+    active = registry.acquire()
+    assert (pinned.version, active.version) == ("v1", "v2")
+    assert pinned.in_flight == 1
+    pinned.release()
+    active.release()
+    assert pinned.in_flight == active.in_flight == 0
+    with pytest.raises(KeyError):
+        registry.acquire("missing")
+
+
+def test_retire_pool_waits_for_in_flight():
+    """Test: pula starej wersji jest zamykana dopiero po zakończeniu żądań w toku"""
+    registry = ModelRegistry()
+    old = make_version("v1")
+    old.pool = pool = FakePool()
+    registry.add(old)
+    registry.activate("v1")
+
+    in_flight = registry.acquire()
+    registry.add(make_version("v2"))
+    registry.activate("v2")
+
+    retire = threading.Thread(target=old.retire_pool, args=(5,))
+    retire.start()
+    retire.join(timeout=0.1)
+    assert retire.is_alive() and not pool.closed
+
+    in_flight.release()
+    retire.join(timeout=5)
+    assert pool.closed
+    assert old.pool is None
@@ -0,0 +1,47 @@
+"""
+Testy jednostkowe szybkiej serializacji odpowiedzi (app/serialization.py)
+
+Uruchomienie: pytest tests/test_serialization.py -v
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app import serialization
+from app.serialization import dumps, encode_ndjson, prediction_rows
+
+
+def test_prediction_rows_from_arrays():
+    """Test: wiersze w formacie PredictionResponse z typami wbudowanymi"""
+    rows = prediction_rows(
+        np.array([0, 1]), np.array([0.123456, 0.87654321]), np.array(["niski", "wysoki"], dtype=object)
+    )
+    assert rows == [
+        {"prediction": 0, "probability": 0.1235, "risk_level": "niski"},
+        {"prediction": 1, "probability": 0.8765, "risk_level": "wysoki"},
+    ]
+    assert all(type(row["prediction"]) is int and type(row["probability"]) is float for row in rows)
+
+
+def test_dumps_matches_json_fallback(monkeypatch):
+    """Test: orjson i fallback json dają ten sam dokument"""
+    rows = prediction_rows(np.array([1]), np.array([0.5]), np.array(["średni"], dtype=object))
+    fast = dumps(rows)
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert json.loads(dumps(rows)) == json.loads(fast) == rows
+    assert "średni".encode() in dumps(rows)
+
+
+def test_encode_ndjson():
+    """Test: jedna linia na wiersz, pusta lista - puste bajty"""
+    body = encode_ndjson([{"row": 0, "error": "x"}, {"row": 1, "prediction": 0}])
+    assert [json.loads(line) for line in body.decode().splitlines()] == [
+        {"row": 0, "error": "x"}, {"row": 1, "prediction": 0}
+    ]
+    assert body.endswith(b"\n")
+    assert encode_ndjson([]) == b""
@@ -0,0 +1,77 @@
+"""
+Testy jednostkowe oceny w cieniu (app/shadow.py)
+
+Uruchomienie: pytest tests/test_shadow.py -v
+"""
+
+import json
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.shadow import ShadowScorer
+
+
+def read_log(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_scores_and_logs_both_probabilities(tmp_path):
+    """Test: każdy rekord trafia do logu z prawdopodobieństwem championa i challengera"""
+    log_path = tmp_path / "shadow.jsonl"
+    scorer = ShadowScorer(lambda records: [r / 10 for r in records], log_path, challenger="c1")
+    scorer.start()
+    scorer.submit([1, 2, 3], "v1", [0.5, 0.6, 0.7])
+    scorer.stop()
+
+    rows = read_log(log_path)
+    assert [(r["champion_probability"], r["challenger_probability"]) for r in rows] == [
+        (0.5, 0.1), (0.6, 0.2), (0.7, 0.3)
+    ]
+    assert {(r["champion"], r["challenger"]) for r in rows} == {("v1", "c1")}
+    assert scorer.stats()["scored"] == 3
+
+
+def test_log_is_append_only(tmp_path):
+    """Test: kolejne uruchomienia dopisują linie do istniejącego logu"""
+    log_path = tmp_path / "shadow.jsonl"
+    for _ in range(2):
+        scorer = ShadowScorer(lambda records: [0.0] * len(records), log_path, challenger="c1")
+        scorer.start()
+        scorer.submit([1], "v1", [0.5])
+        scorer.stop()
+    assert len(read_log(log_path)) == 2
+
+
+def test_full_queue_drops_without_blocking(tmp_path):
+    """Test: przy pełnej kolejce rekordy są pomijane, a submit nie czeka"""
+    release = threading.Event()
+
+    def slow_score(records):
+        release.wait(5)
+        return [0.0] * len(records)
+
+    scorer = ShadowScorer(slow_score, tmp_path / "shadow.jsonl", challenger="c1",
+                          queue_size=2, max_batch_size=1)
+    scorer.start()
+    scorer.submit(list(range(10)), "v1", [0.5] * 10)
+    assert scorer.stats()["dropped"] >= 7
+
+    release.set()
+    scorer.stop()
+    assert scorer.scored + scorer.dropped == 10
+
+
+def test_failed_batch_is_counted(tmp_path):
+    """Test: błąd challengera nie zatrzymuje wątku oceny"""
+    def failing(records):
+        raise ValueError("zły model")
+
+    scorer = ShadowScorer(failing, tmp_path / "shadow.jsonl", challenger="c1")
+    scorer.start()
+    scorer.submit([1, 2], "v1", [0.5, 0.5])
+    scorer.stop()
+    assert scorer.failed == 2
+    assert not (tmp_path / "shadow.jsonl").exists()
@@ -0,0 +1,157 @@
+"""
+Testy jednostkowe czasów etapów i identyfikatorów żądań (app/tracing.py)
+
+Uruchomienie: pytest tests/test_tracing.py -v
+"""
+
+import asyncio
+import json
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.metrics import REQUEST_STAGES, Registry, StageHistogram
+from app.tracing import TraceWriter, TracingMiddleware, request_id_from, server_timing
+
+
+def make_histogram():
+    return StageHistogram("stage_seconds", "Etapy", ("stage",), buckets=(0.1, 1.0),
+                          registry=Registry())
+
+
+def call(middleware, path="/predict", headers=()):
+    """Wywołanie middleware ASGI; zwraca wysłane komunikaty"""
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "path": path, "headers": list(headers)}
+    asyncio.run(middleware(scope, receive, send))
+    return sent
+
+
+def response_headers(sent) -> dict:
+    return {k.decode(): v.decode() for k, v in sent[0]["headers"]}
+
+
+def endpoint(histogram):
+    """Aplikacja ASGI mierząca etapy w pętli i w wątku (jak endpoint synchroniczny)"""
+
+    async def app(scope, receive, send):
+        histogram.observe("validation", 0.002)
+        await asyncio.to_thread(histogram.observe, "model", 0.010)
+        histogram.observe("serialization", 0.001)
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"x-model-version", b"v1")]})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    return app
+
+
+def test_stage_histogram_sums_current_request_stages():
+    """Test: etapy trafiają do słownika żądania tylko, gdy jest ustawiony"""
+    histogram = make_histogram()
+    histogram.observe("model", 0.5)
+    stages = {}
+    token = REQUEST_STAGES.set(stages)
+    try:
+        histogram.observe("model", 0.25)
+        histogram.observe("model", 0.25)
+    finally:
+        REQUEST_STAGES.reset(token)
+    assert stages == {"model": 0.5}
+    assert histogram.count("model") == 3
+
+
+def test_muted_thread_does_not_record_stages():
+    """Test: wyciszony wątek nie zapisuje ani histogramu, ani etapów żądania"""
+    histogram = make_histogram()
+    stages = {}
+
+    def run():
+        token = REQUEST_STAGES.set(stages)
+        histogram.mute_current_thread()
+        histogram.observe("model", 0.1)
+        REQUEST_STAGES.reset(token)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    assert stages == {}
+    assert histogram.count("model") == 0
+
+
+def test_server_timing_format_and_order():
+    """Test: etapy w stałej kolejności, czasy w ms, total na końcu"""
+    value = server_timing({"model": 0.0105, "validation": 0.002, "custom": 0.001}, total=0.02)
+    assert value == ("validation;dur=2.000, model;dur=10.500, custom;dur=1.000, "
+                     "total;dur=20.000")
+
+
+def test_request_id_is_propagated_or_generated():
+    """Test: poprawny identyfikator klienta jest zachowany, niepoprawny zastąpiony"""
+    assert request_id_from([(b"x-request-id", b"abc-123")]) == "abc-123"
+    generated = request_id_from([(b"x-request-id", b"bad\r\nheader")])
+    assert len(generated) == 32 and generated != request_id_from([])
+
+
+def test_middleware_adds_request_id_and_server_timing():
+    """Test: odpowiedź ma X-Request-ID i Server-Timing z etapami z pętli i z wątku"""
+    histogram = make_histogram()
+    sent = call(TracingMiddleware(endpoint(histogram), paths=["/predict"]),
+                headers=[(b"x-request-id", b"req-1")])
+    headers = response_headers(sent)
+    assert headers["x-request-id"] == "req-1"
+    names = [part.split(";")[0] for part in headers["server-timing"].split(", ")]
+    assert names == ["validation", "model", "serialization", "total"]
+    assert "model;dur=10.000" in headers["server-timing"]
+    assert REQUEST_STAGES.get() is None
+
+
+def test_middleware_skips_other_paths():
+    """Test: ścieżki spoza listy nie dostają nagłówków"""
+    histogram = make_histogram()
+    sent = call(TracingMiddleware(endpoint(histogram), paths=["/predict"]), path="/health")
+    assert "server-timing" not in response_headers(sent)
+
+
+def test_sampled_traces_are_written_as_flat_ndjson(tmp_path):
+    """Test: próbkowane ślady trafiają do pliku jako płaskie linie JSON"""
+    writer = TraceWriter(tmp_path / "traces.jsonl", sample_rate=1.0)
+    writer.start()
+    middleware = TracingMiddleware(endpoint(make_histogram()), paths=["/predict"], writer=writer)
+    for _ in range(3):
+        call(middleware)
+    writer.stop()
+
+    rows = [json.loads(line) for line in (tmp_path / "traces.jsonl").read_text().splitlines()]
+    assert len(rows) == 3 and writer.stats()["written"] == 3
+    assert rows[0]["status"] == 200 and rows[0]["model_version"] == "v1"
+    assert rows[0]["model_ms"] == 10.0 and rows[0]["features_ms"] is None
+    assert rows[0]["total_ms"] > 0
+
+
+def test_trace_file_rotates(tmp_path):
+    """Test: po przekroczeniu max_bytes plik jest rotowany, starsze kopie są ograniczone"""
+    writer = TraceWriter(tmp_path / "traces.jsonl", sample_rate=1.0, max_bytes=200, backups=2)
+    writer.start()
+    for i in range(50):
+        writer.write({"request_id": f"r{i}", "total_ms": 1.0})
+    writer.stop()
+    files = sorted(p.name for p in tmp_path.iterdir())
+    assert files == ["traces.jsonl", "traces.jsonl.1", "traces.jsonl.2"]
+
+
+def test_zero_sample_rate_disables_writer(tmp_path):
+    """Test: sample_rate=0 - brak próbkowania i brak pliku"""
+    writer = TraceWriter(tmp_path / "traces.jsonl", sample_rate=0.0)
+    writer.start()
+    assert not writer.enabled and not writer.sampled()
+    writer.stop()
+    assert not (tmp_path / "traces.jsonl").exists()
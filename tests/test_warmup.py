@@ -0,0 +1,67 @@
+"""
+Testy jednostkowe rozgrzewki i gotowości (app/warmup.py)
+
+Uruchomienie: pytest tests/test_warmup.py -v
+"""
+
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.metrics import STAGE_SECONDS
+from app.warmup import Readiness, measure_warmup, synthetic_record
+
+SPECS = {
+    "age": {"kind": "int", "ge": 18, "le": 90, "choices": None},
+    "person_income": {"kind": "float", "ge": 0, "le": None, "choices": None},
+    "grade": {"kind": "category", "ge": None, "le": None, "choices": ["A", "B"]},
+}
+
+
+def test_synthetic_record_respects_specs():
+    """Test: wartości w zakresach pól, kategorie z listy, wynik powtarzalny dla ziarna"""
+    rng = random.Random(0)
+    records = [synthetic_record(SPECS, rng) for _ in range(200)]
+    assert all(18 <= r["age"] <= 90 and isinstance(r["age"], int) for r in records)
+    assert all(0 <= r["person_income"] <= 300_000 for r in records)
+    assert {r["grade"] for r in records} == {"A", "B"}
+    assert synthetic_record(SPECS, random.Random(1)) == synthetic_record(SPECS, random.Random(1))
+
+
+def test_measure_warmup_reports_latency_without_metrics():
+    """Test: raport opóźnień, wsad o zadanym rozmiarze, histogram etapów bez pomiarów rozgrzewki"""
+    batches = []
+
+    def score_one(record):
+        STAGE_SECONDS.observe("model", 0.001)
+
+    before = STAGE_SECONDS.count("model")
+    report = measure_warmup(score_one, batches.append, [1, 2, 3], batch_size=7)
+    assert STAGE_SECONDS.count("model") == before
+    assert batches == [[1, 2, 3, 1, 2, 3, 1]]
+    assert report["batch_size"] == 7
+    assert 0 <= report["single_p50_ms"] <= report["single_p99_ms"]
+
+
+def test_measure_warmup_captures_errors():
+    """Test: wyjątek w rozgrzewce trafia do raportu zamiast przerywać start"""
+    def fail(record):
+        raise ValueError("zły model")
+
+    report = measure_warmup(fail, lambda batch: None, [1], batch_size=1)
+    assert report == {"error": "ValueError: zły model"}
+
+
+def test_readiness_states():
+    """Test: gotowość tylko w stanie ready (nie over_budget ani failed)"""
+    readiness = Readiness()
+    assert not readiness.ready and readiness.info()["status"] == "starting"
+    readiness.set("ready", {"single_p99_ms": 1.0})
+    assert readiness.ready
+    assert readiness.info() == {"status": "ready", "warmup": {"single_p99_ms": 1.0}}
+    readiness.set("over_budget")
+    assert not readiness.ready
+    readiness.set("failed")
+    assert not readiness.ready